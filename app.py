@@ -1,35 +1,33 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, g, has_app_context
+import click
 from flask_cors import CORS
 import sqlite3
 import hashlib
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 import requests
 import json
 import re
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
 from werkzeug.security import generate_password_hash, check_password_hash
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 import time
-import google.generativeai as genai
-
-# RAG sistemi için gerekli importlar
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_chroma import Chroma
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import create_retrieval_chain
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.chains.combine_documents import create_stuff_documents_chain
+import threading
+import queue
+import gzip
+import bisect
+import uuid
+import atexit
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from collections import OrderedDict, deque
+
+# Ağır bağımlılıklar (Selenium, webdriver_manager, BeautifulSoup, LangChain,
+# google.generativeai) modül seviyesinde değil, ilk kullanıldıkları fonksiyonda
+# yüklenir. Sadece turnuva/liderlik uçlarını sunan worker'lar bu maliyeti ödemez.
 
 # SSL uyarılarını kapatma
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -40,43 +38,171 @@ load_dotenv()
 
 # Gemini API konfigürasyonu
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "your_gemini_api_key_here")
-if GEMINI_API_KEY != "your_gemini_api_key_here":
-    genai.configure(api_key=GEMINI_API_KEY)
+genai_module = None
+genai_lock = threading.Lock()
+
+def get_genai():
+    """google.generativeai modülünü ilk kullanımda yükle ve yapılandır"""
+    global genai_module
+    if genai_module is None:
+        with genai_lock:
+            if genai_module is None:
+                import google.generativeai as genai
+                if GEMINI_API_KEY != "your_gemini_api_key_here":
+                    genai.configure(api_key=GEMINI_API_KEY)
+                genai_module = genai
+    return genai_module
 
 # RAG sistemi için global değişkenler
 rag_vectorstore = None
 rag_chain = None
+rag_embeddings = None
+
+# RAG arka plan ısınma durumu: idle, warming_up, ready, failed
+rag_status = 'idle'
+rag_error = None
+rag_status_changed_at = None
+rag_warmup_pid = None
+rag_warmup_lock = threading.Lock()
+RAG_RETRY_SECONDS = 60
+# RAG import anında değil, sunucu ilk isteği alınca arka planda ısınır (start_background_services);
+# böylece --preload ana süreci ve import eden araçlar LangChain yüklemez.
+# 0 ise RAG (ve LangChain importları) ilk /api/chat çağrısına kadar yüklenmez
+RAG_WARMUP_ON_START = os.getenv("RAG_WARMUP_ON_START", "1") != "0"
+
+# RAG indeks ayarları - manifest bu değerlerle anahtarlanır
+RAG_PDF_PATH = "mypdf.pdf"
+RAG_CHROMA_DIR = "./chroma_db"
+RAG_MANIFEST_PATH = os.path.join(RAG_CHROMA_DIR, "index_manifest.json")
+RAG_CHUNK_SIZE = 1000
+RAG_CHUNK_OVERLAP = 100
+RAG_EMBEDDING_MODEL = "models/embedding-001"
+
+def file_sha256(path):
+    """Dosyanın SHA-256 özetini hesapla"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_rag_manifest():
+    """Chroma indeks manifestini oku, yoksa None döndür"""
+    try:
+        with open(RAG_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def save_rag_manifest(manifest):
+    """Chroma indeks manifestini atomik olarak yaz"""
+    tmp_path = RAG_MANIFEST_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, RAG_MANIFEST_PATH)
+
+def rag_index_params():
+    """İndeksin geçerliliğini belirleyen parçalama ve embedding ayarları"""
+    return {
+        'chunk_size': RAG_CHUNK_SIZE,
+        'chunk_overlap': RAG_CHUNK_OVERLAP,
+        'embedding_model': RAG_EMBEDDING_MODEL
+    }
+
+def chunk_id(doc):
+    """Parçanın içeriğinden ve konumundan kararlı bir kimlik üret"""
+    key = f"{doc.metadata.get('source', '')}|{doc.metadata.get('page', '')}|{doc.page_content}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def build_rag_vectorstore(embeddings):
+    """Kalıcı Chroma indeksini aç; sadece değişen veya yeni parçaları embed et"""
+    from langchain_chroma import Chroma
+    
+    pdf_hash = file_sha256(RAG_PDF_PATH)
+    params = rag_index_params()
+    manifest = load_rag_manifest()
+    
+    vectorstore = Chroma(
+        embedding_function=embeddings,
+        persist_directory=RAG_CHROMA_DIR
+    )
+    
+    # PDF ve ayarlar aynıysa mevcut koleksiyonu embedding çağrısı yapmadan kullan
+    if manifest and manifest.get('pdf_sha256') == pdf_hash and manifest.get('params') == params:
+        print(f"RAG indeksi güncel, {len(manifest.get('chunk_ids', []))} parça diskten yüklendi")
+        return vectorstore
+    
+    # Ayarlar değiştiyse veya manifest yoksa eski vektörler uyumsuzdur, koleksiyonu sıfırla
+    if not manifest or manifest.get('params') != params:
+        print("RAG indeks manifesti yok veya ayarlar değişmiş, koleksiyon sıfırlanıyor")
+        vectorstore.delete_collection()
+        vectorstore = Chroma(
+            embedding_function=embeddings,
+            persist_directory=RAG_CHROMA_DIR
+        )
+        existing_ids = set()
+    else:
+        existing_ids = set(manifest.get('chunk_ids', []))
+    
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    
+    loader = PyPDFLoader(RAG_PDF_PATH)
+    data = loader.load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=RAG_CHUNK_SIZE, chunk_overlap=RAG_CHUNK_OVERLAP)
+    docs = text_splitter.split_documents(data)
+    
+    # Aynı içerikli parçalar tek kimliğe düşer
+    docs_by_id = {}
+    for doc in docs:
+        docs_by_id.setdefault(chunk_id(doc), doc)
+    
+    removed_ids = [doc_id for doc_id in existing_ids if doc_id not in docs_by_id]
+    added_ids = [doc_id for doc_id in docs_by_id if doc_id not in existing_ids]
+    
+    if removed_ids:
+        vectorstore.delete(ids=removed_ids)
+    if added_ids:
+        vectorstore.add_documents(documents=[docs_by_id[doc_id] for doc_id in added_ids], ids=added_ids)
+    
+    print(f"RAG indeksi güncellendi: {len(added_ids)} parça eklendi, {len(removed_ids)} parça silindi")
+    
+    save_rag_manifest({
+        'pdf_sha256': pdf_hash,
+        'params': params,
+        'chunk_ids': list(docs_by_id.keys()),
+        'updated_at': datetime.now().isoformat()
+    })
+    return vectorstore
 
 def initialize_rag_system():
     """RAG sistemini başlat"""
-    global rag_vectorstore, rag_chain
+    global rag_vectorstore, rag_chain, rag_embeddings
     
     try:
         # Chroma DB klasörünü otomatik oluştur
-        chroma_dir = "./chroma_db"
-        if not os.path.exists(chroma_dir):
-            os.makedirs(chroma_dir)
-            print(f"Chroma DB klasörü oluşturuldu: {chroma_dir}")
-        
-        # PDF'den veri yükleme ve parçalama
-        pdf_path = "mypdf.pdf"
-        if os.path.exists(pdf_path):
-            loader = PyPDFLoader(pdf_path)
-            data = loader.load()
-            
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-            docs = text_splitter.split_documents(data)
+        if not os.path.exists(RAG_CHROMA_DIR):
+            os.makedirs(RAG_CHROMA_DIR)
+            print(f"Chroma DB klasörü oluşturuldu: {RAG_CHROMA_DIR}")
+        
+        if os.path.exists(RAG_PDF_PATH):
+            # RAG sistemi için gerekli importlar (ilk kullanımda yüklenir)
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
+            from langchain.chains import create_retrieval_chain
+            from langchain.chains.combine_documents import create_stuff_documents_chain
+            from langchain_core.prompts import ChatPromptTemplate
             
             # Embedding ve Vectorstore - Gemini API anahtarı ile
             embeddings = GoogleGenerativeAIEmbeddings(
-                model="models/embedding-001",
+                model=RAG_EMBEDDING_MODEL,
                 google_api_key=GEMINI_API_KEY
             )
-            rag_vectorstore = Chroma.from_documents(
-                documents=docs,
-                embedding=embeddings,
-                persist_directory=chroma_dir
-            )
+            rag_vectorstore = build_rag_vectorstore(embeddings)
+            rag_embeddings = embeddings
+            
+            # PDF veya indeks ayarları değiştiyse önbellekteki eski yanıtlar geçersizdir
+            manifest = load_rag_manifest() or {}
+            chat_cache.reset(f"{manifest.get('pdf_sha256')}:{json.dumps(manifest.get('params'), sort_keys=True)}")
             
             retriever = rag_vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 10})
             
@@ -108,29 +234,266 @@ def initialize_rag_system():
             print("RAG sistemi başarıyla başlatıldı!")
             return True
         else:
-            print(f"PDF dosyası bulunamadı: {pdf_path}")
+            print(f"PDF dosyası bulunamadı: {RAG_PDF_PATH}")
             return False
             
     except Exception as e:
         print(f"RAG sistemi başlatma hatası: {e}")
         return False
 
-# RAG sistemini başlatma
-rag_success = initialize_rag_system()
-if not rag_success:
-    print("RAG sistemi başlatılamadı! Uygulama çalışmayacak.")
-    print("Lütfen Google Cloud kimlik doğrulama ayarlarını kontrol edin.")
-    exit(1)
-else:
-    print("RAG sistemi başarıyla başlatıldı, uygulama çalışıyor...")
+def set_rag_status(status, error=None):
+    """RAG ısınma durumunu güncelle"""
+    global rag_status, rag_error, rag_status_changed_at
+    rag_status = status
+    rag_error = error
+    rag_status_changed_at = datetime.now()
+
+def rag_warmup_worker():
+    """RAG sistemini arka planda başlat"""
+    started = time.time()
+    try:
+        success = initialize_rag_system()
+    except Exception as e:
+        print(f"RAG ısınma hatası: {e}")
+        success = False
+    
+    if success:
+        set_rag_status('ready')
+        print(f"RAG sistemi {time.time() - started:.1f} saniyede hazır oldu")
+    else:
+        set_rag_status('failed', 'RAG sistemi başlatılamadı, ayarları kontrol edin')
+        print("RAG sistemi başlatılamadı! Sohbet dışındaki özellikler çalışmaya devam ediyor.")
+
+def ensure_rag_warmup():
+    """RAG ısınma thread'ini bu süreç için bir kez başlat (hata sonrası belli aralıkla tekrar dener)"""
+    global rag_warmup_pid
+    
+    # Fork edilen worker'lar ebeveynin thread'ini devralmaz, süreç başına başlat
+    if rag_warmup_pid == os.getpid():
+        if rag_status != 'failed':
+            return
+        if (datetime.now() - rag_status_changed_at).total_seconds() < RAG_RETRY_SECONDS:
+            return
+    
+    with rag_warmup_lock:
+        if rag_warmup_pid == os.getpid() and rag_status in ('warming_up', 'ready'):
+            return
+        rag_warmup_pid = os.getpid()
+        set_rag_status('warming_up')
+        threading.Thread(target=rag_warmup_worker, name='rag-warmup', daemon=True).start()
+
+# Sohbet için anlamsal yanıt önbelleği: aynı/benzer sorular LLM'e gitmeden yanıtlanır
+# Süreç içidir; PDF indeksi değişince (farklı index_version) tamamen temizlenir
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "1") != "0"
+CHAT_CACHE_THRESHOLD = float(os.getenv("CHAT_CACHE_THRESHOLD", "0.92"))
+CHAT_CACHE_TTL_SECONDS = int(os.getenv("CHAT_CACHE_TTL_SECONDS", str(24 * 3600)))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "500"))
+
+class SemanticChatCache:
+    """Soru embedding'lerine göre benzerlik aramalı sohbet önbelleği (TTL + LRU)"""
+    
+    def __init__(self, max_entries, ttl_seconds, threshold):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.entries = OrderedDict()
+        self.index_version = None
+        self.lock = threading.Lock()
+        self.metrics = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0, 'stores': 0}
+    
+    def reset(self, index_version):
+        """İndeks değiştiyse eski yanıtları at"""
+        with self.lock:
+            if index_version != self.index_version:
+                self.entries.clear()
+                self.index_version = index_version
+    
+    def expired(self, entry):
+        return time.time() - entry['created_at'] > self.ttl_seconds
+    
+    def get_exact(self, key):
+        """Normalize edilmiş metni birebir aynı olan soru (embedding çağrısı gerektirmez)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or self.expired(entry):
+                self.entries.pop(key, None)
+                return None
+            self.entries.move_to_end(key)
+            self.metrics['exact_hits'] += 1
+            return entry['answer']
+    
+    def get_similar(self, vector):
+        """Benzerliği eşiğin üzerindeki en yakın sorunun yanıtı"""
+        import numpy as np
+        
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if self.expired(entry)]:
+                del self.entries[key]
+            candidates = [(key, entry) for key, entry in self.entries.items() if entry['vector'] is not None]
+            if not candidates:
+                self.metrics['misses'] += 1
+                return None
+            
+            # Vektörler birim uzunlukta saklanır; iç çarpım kosinüs benzerliğidir
+            scores = np.stack([entry['vector'] for _, entry in candidates]) @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.metrics['misses'] += 1
+                return None
+            
+            key, entry = candidates[best]
+            self.entries.move_to_end(key)
+            self.metrics['semantic_hits'] += 1
+            return entry['answer']
+    
+    def put(self, key, vector, answer):
+        with self.lock:
+            self.entries[key] = {'vector': vector, 'answer': answer, 'created_at': time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.metrics['stores'] += 1
+    
+    def stats(self):
+        with self.lock:
+            return {**self.metrics, 'entries': len(self.entries), 'index_version': self.index_version}
+
+chat_cache = SemanticChatCache(CHAT_CACHE_MAX_ENTRIES, CHAT_CACHE_TTL_SECONDS, CHAT_CACHE_THRESHOLD)
+
+def embed_chat_message(message):
+    """Mesajı birim uzunlukta embedding vektörüne çevir (başarısızsa None)"""
+    import numpy as np
+    
+    try:
+        vector = np.asarray(rag_embeddings.embed_query(message), dtype=np.float32)
+    except Exception as e:
+        print(f"Sohbet önbelleği embedding hatası: {e}")
+        return None
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+def lookup_chat_cache(message):
+    """Önbellekteki yanıtı ve (ıskalamada kaydetmek için) mesaj vektörünü döndür"""
+    key = normalize_cache_text(message)
+    answer = chat_cache.get_exact(key)
+    if answer is not None:
+        return answer, None
+    
+    vector = embed_chat_message(message) if rag_embeddings is not None else None
+    if vector is None:
+        return None, None
+    return chat_cache.get_similar(vector), vector
+
+def store_chat_cache(message, vector, answer):
+    chat_cache.put(normalize_cache_text(message), vector, answer)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'btk-auth-secret-key-2024'
 CORS(app)
 
+@app.before_request
+def start_background_services():
+    """İlk istekte (veya fork sonrası) arka plan servislerini başlat"""
+    if RAG_WARMUP_ON_START:
+        ensure_rag_warmup()
+    if SELENIUM_WARMUP_ON_START:
+        ensure_selenium_warmup()
+    elif CHROMEDRIVER_RESOLVE_ON_START:
+        ensure_chromedriver_resolve()
+
+# Veritabanı erişim katmanı
+DB_PATH = os.getenv("DATABASE_PATH", "database.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # okuyucular yazıcıları beklemez
+    "PRAGMA synchronous=NORMAL",      # WAL ile güvenli ve fsync sayısı az
+    "PRAGMA busy_timeout=5000",       # kilitli veritabanında hemen hata verme
+    "PRAGMA mmap_size=268435456",     # 256 MB bellek eşlemeli okuma
+    "PRAGMA cache_size=-16000",       # bağlantı başına ~16 MB sayfa önbelleği
+    "PRAGMA temp_store=MEMORY",
+)
+db_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def open_db_connection():
+    """Ayarlı yeni bir SQLite bağlantısı aç"""
+    conn = sqlite3.connect(DB_PATH, timeout=5, check_same_thread=False)
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class PooledConnection:
+    """Havuzdan alınan bağlantı; close() bağlantıyı kapatmaz, havuza iade eder"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.released = False
+    
+    def cursor(self):
+        return self.conn.cursor()
+    
+    def execute(self, sql, parameters=()):
+        return self.conn.execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.conn.executemany(sql, seq_of_parameters)
+    
+    def commit(self):
+        self.conn.commit()
+    
+    def rollback(self):
+        self.conn.rollback()
+    
+    @property
+    def total_changes(self):
+        return self.conn.total_changes
+    
+    def close(self):
+        release_db(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        release_db(self)
+        return False
+
+def get_db():
+    """Havuzdan bir veritabanı bağlantısı al (yoksa yeni aç)"""
+    try:
+        conn = db_pool.get_nowait()
+    except queue.Empty:
+        conn = open_db_connection()
+    
+    pooled = PooledConnection(conn)
+    # İstek içinde close() unutulursa teardown'da iade edilir
+    if has_app_context():
+        g.setdefault('db_connections', []).append(pooled)
+    return pooled
+
+def release_db(pooled):
+    """Bağlantıyı havuza iade et; commit edilmemiş değişiklikler geri alınır"""
+    if pooled.released:
+        return
+    pooled.released = True
+    conn = pooled.conn
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        db_pool.put_nowait(conn)
+    except (queue.Full, sqlite3.Error):
+        conn.close()
+
+@app.teardown_appcontext
+def release_request_connections(exception=None):
+    """İstek sonunda iade edilmemiş bağlantıları havuza geri ver"""
+    for pooled in g.pop('db_connections', []):
+        release_db(pooled)
+
 # Veritabanı oluşturma
 def init_db():
-    conn = sqlite3.connect('database.db')
+    conn = get_db()
     cursor = conn.cursor()
     
     # Users tablosu
@@ -243,46 +606,531 @@ def init_db():
     conn.commit()
     conn.close()
 
+def migrate_add_missing_columns(cursor):
+    """v1: Eski veritabanlarında eksik sütunları ekle"""
+    cursor.execute("PRAGMA table_info(tournaments)")
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    if 'question_count' not in columns:
+        cursor.execute('ALTER TABLE tournaments ADD COLUMN question_count INTEGER DEFAULT 15')
+        print("question_count sütunu eklendi")
+        
+    if 'duration_minutes' not in columns:
+        cursor.execute('ALTER TABLE tournaments ADD COLUMN duration_minutes INTEGER DEFAULT 45')
+        print("duration_minutes sütunu eklendi")
+    
+    cursor.execute("PRAGMA table_info(user_courses)")
+    user_courses_columns = [column[1] for column in cursor.fetchall()]
+    
+    if 'status' not in user_courses_columns:
+        cursor.execute('ALTER TABLE user_courses ADD COLUMN status TEXT DEFAULT "active"')
+        print("user_courses status sütunu eklendi")
+        
+    if 'completed_at' not in user_courses_columns:
+        cursor.execute('ALTER TABLE user_courses ADD COLUMN completed_at TIMESTAMP NULL')
+        print("user_courses completed_at sütunu eklendi")
+
+def migrate_hot_path_indexes(cursor):
+    """v2: Turnuva ve profil sorgularının sıcak yolları için indeksler"""
+    # UNIQUE indeksler öncesi mükerrer kayıtları temizle. Katılımlarda tamamlanmış ve en yüksek
+    # puanlı kayıt korunur (boş bir ilk kayıt, puanlanmış katılımın yerine geçmesin)
+    cursor.execute('''
+        DELETE FROM tournament_participants WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, tournament_id
+                    ORDER BY completed_at IS NULL, correct_answers DESC, total_questions DESC, id
+                ) AS position
+                FROM tournament_participants
+            ) WHERE position > 1
+        )
+    ''')
+    print(f"v2: {cursor.rowcount} mükerrer turnuva katılımı silindi")
+    # Aynı soruya verilen cevaplarda ilk cevap geçerlidir
+    cursor.execute('''
+        DELETE FROM user_answers WHERE id NOT IN (
+            SELECT MIN(id) FROM user_answers GROUP BY user_id, tournament_id, question_id
+        )
+    ''')
+    print(f"v2: {cursor.rowcount} mükerrer cevap silindi")
+    
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_participants_user_tournament
+        ON tournament_participants (user_id, tournament_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_participants_tournament_completed
+        ON tournament_participants (tournament_id, completed_at, correct_answers)
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_answers_user_tournament_question
+        ON user_answers (user_id, tournament_id, question_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_questions_tournament
+        ON questions (tournament_id, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_user_courses_user_status_added
+        ON user_courses (user_id, status, added_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_user_profiles_user_created
+        ON user_profiles (user_id, created_at)
+    ''')
+    cursor.execute('ANALYZE')
+
+def refresh_user_stats(cursor, user_ids=None):
+    """user_stats özet tablosunu tamamlanan katılımlardan yeniden hesapla (None ise tüm kullanıcılar)"""
+    user_filter = ''
+    params = ()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        user_filter = f"AND user_id IN ({','.join('?' * len(user_ids))})"
+        params = tuple(user_ids)
+        cursor.execute(f'DELETE FROM user_stats WHERE 1 = 1 {user_filter}', params)
+    else:
+        cursor.execute('DELETE FROM user_stats')
+    
+    cursor.execute(f'''
+        INSERT INTO user_stats (user_id, total_correct, total_questions, total_score_sum,
+                                tournaments_completed, avg_score, updated_at)
+        SELECT user_id,
+               SUM(correct_answers),
+               SUM(total_questions),
+               SUM(total_score),
+               COUNT(*),
+               AVG(total_score),
+               CURRENT_TIMESTAMP
+        FROM tournament_participants
+        WHERE completed_at IS NOT NULL {user_filter}
+        GROUP BY user_id
+    ''', params)
+
+def migrate_user_stats(cursor):
+    """v3: Genel sıralama için kullanıcı başına özet tablo"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_correct INTEGER NOT NULL DEFAULT 0,
+            total_questions INTEGER NOT NULL DEFAULT 0,
+            total_score_sum INTEGER NOT NULL DEFAULT 0,
+            tournaments_completed INTEGER NOT NULL DEFAULT 0,
+            avg_score REAL NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_user_stats_rank
+        ON user_stats (total_correct DESC, avg_score DESC)
+    ''')
+    refresh_user_stats(cursor)
+
+def migrate_tournament_start_index(cursor):
+    """v4: Haftalık takvimin tarih aralığı sorgusu için indeks"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_tournaments_start_time
+        ON tournaments (start_time)
+    ''')
+
+def refresh_tournament_summary(cursor, tournament_ids=None):
+    """tournament_summary tablosunu tamamlanan katılımlardan yeniden hesapla (None ise tümü)"""
+    tournament_filter = ''
+    params = ()
+    if tournament_ids is not None:
+        tournament_ids = list(tournament_ids)
+        if not tournament_ids:
+            return
+        tournament_filter = f"AND tournament_id IN ({','.join('?' * len(tournament_ids))})"
+        params = tuple(tournament_ids)
+        cursor.execute(f'DELETE FROM tournament_summary WHERE 1 = 1 {tournament_filter}', params)
+    else:
+        cursor.execute('DELETE FROM tournament_summary')
+    
+    cursor.execute(f'''
+        INSERT INTO tournament_summary (tournament_id, best_correct, completed_count, updated_at)
+        SELECT tournament_id, MAX(correct_answers), COUNT(*), CURRENT_TIMESTAMP
+        FROM tournament_participants
+        WHERE completed_at IS NOT NULL {tournament_filter}
+        GROUP BY tournament_id
+    ''', params)
+
+def migrate_tournament_summary(cursor):
+    """v5: Kazanan tespiti için turnuva başına en iyi skor ve tamamlayan sayısı"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tournament_summary (
+            tournament_id INTEGER PRIMARY KEY,
+            best_correct INTEGER NOT NULL DEFAULT 0,
+            completed_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_participants_user_completed
+        ON tournament_participants (user_id, completed_at)
+    ''')
+    refresh_tournament_summary(cursor)
+
+def migrate_question_jobs(cursor):
+    """v6: Arka planda çalışan soru üretim işleri"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            topic TEXT NOT NULL,
+            question_count INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            generated_count INTEGER NOT NULL DEFAULT 0,
+            questions TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_question_jobs_status_created
+        ON question_jobs (status, created_at)
+    ''')
+
+def migrate_llm_cache(cursor):
+    """v7: LLM yanıt önbelleği"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            last_used_at TIMESTAMP NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used
+        ON llm_cache (last_used_at)
+    ''')
+
+def migrate_question_bank(cursor):
+    """v8: Alıştırma testleri için konu/zorluk bazlı soru bankası ve kullanıcıya sunulan sorular"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_bank (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            question TEXT NOT NULL,
+            option_a TEXT NOT NULL,
+            option_b TEXT NOT NULL,
+            option_c TEXT NOT NULL,
+            option_d TEXT NOT NULL,
+            correct_option TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # (topic, difficulty) ile başlayan benzersiz indeks hem örneklemeyi hem tekrar kontrolünü karşılar
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_question_bank_topic_fingerprint
+        ON question_bank (topic, difficulty, fingerprint)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_bank_served (
+            user_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            served_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, question_id),
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (question_id) REFERENCES question_bank(id)
+        )
+    ''')
+
+def migrate_course_sections(cursor):
+    """v9: Kurs URL'sine göre kazınan bölüm başlıkları önbelleği"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS course_sections (
+            url TEXT PRIMARY KEY,
+            sections TEXT NOT NULL,
+            source TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at TIMESTAMP NOT NULL,
+            checked_at TIMESTAMP NOT NULL
+        )
+    ''')
+
+def migrate_roadmap_build_status(cursor):
+    """v10: Yol haritası arka planda hazırlanırken kurs satırının durumu"""
+    cursor.execute("PRAGMA table_info(user_courses)")
+    if 'build_status' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE user_courses ADD COLUMN build_status TEXT DEFAULT 'ready'")
+
+# Sıralı şema migrasyonları: (versiyon, açıklama, fonksiyon)
+# Uygulanan son versiyon PRAGMA user_version içinde tutulur
+SCHEMA_MIGRATIONS = [
+    (1, 'eksik sütunlar', migrate_add_missing_columns),
+    (2, 'sıcak yol indeksleri', migrate_hot_path_indexes),
+    (3, 'genel sıralama özet tablosu', migrate_user_stats),
+    (4, 'turnuva başlangıç zamanı indeksi', migrate_tournament_start_index),
+    (5, 'turnuva özet tablosu', migrate_tournament_summary),
+    (6, 'soru üretim işleri', migrate_question_jobs),
+    (7, 'LLM yanıt önbelleği', migrate_llm_cache),
+    (8, 'soru bankası', migrate_question_bank),
+    (9, 'kurs bölümleri önbelleği', migrate_course_sections),
+    (10, 'yol haritası hazırlama durumu', migrate_roadmap_build_status),
+]
+
 def update_database_schema():
-    """Mevcut veritabanı şemasını güncelle"""
+    """Mevcut veritabanı şemasını bekleyen migrasyonlarla güncelle"""
     try:
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
+        cursor.execute("PRAGMA user_version")
+        current_version = cursor.fetchone()[0]
         
-        cursor.execute("PRAGMA table_info(tournaments)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'question_count' not in columns:
-            cursor.execute('ALTER TABLE tournaments ADD COLUMN question_count INTEGER DEFAULT 15')
-            print("question_count sütunu eklendi")
-            
-        if 'duration_minutes' not in columns:
-            cursor.execute('ALTER TABLE tournaments ADD COLUMN duration_minutes INTEGER DEFAULT 45')
-            print("duration_minutes sütunu eklendi")
-        
-        cursor.execute("PRAGMA table_info(user_courses)")
-        user_courses_columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'status' not in user_courses_columns:
-            cursor.execute('ALTER TABLE user_courses ADD COLUMN status TEXT DEFAULT "active"')
-            print("user_courses status sütunu eklendi")
+        for version, description, migrate in SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
             
-        if 'completed_at' not in user_courses_columns:
-            cursor.execute('ALTER TABLE user_courses ADD COLUMN completed_at TIMESTAMP NULL')
-            print("user_courses completed_at sütunu eklendi")
+            # Her migrasyon kendi transaction'ında uygulanır
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                migrate(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+                print(f"Şema migrasyonu v{version} uygulandı: {description}")
+            except Exception:
+                conn.rollback()
+                raise
         
-        conn.commit()
         conn.close()
         print("Veritabanı şeması güncellendi")
         
     except Exception as e:
         print(f"Veritabanı güncelleme hatası: {e}")
 
+# Sıcak yol sorguları: EXPLAIN QUERY PLAN ile tam tablo taraması kontrol edilir
+HOT_QUERIES = {
+    'join_tournament_duplicate': (
+        'SELECT id FROM tournament_participants WHERE user_id = ? AND tournament_id = ?', (1, 1)),
+    'answer_question_duplicate': (
+        'SELECT id FROM user_answers WHERE user_id = ? AND tournament_id = ? AND question_id = ?', (1, 1, 1)),
+    'answer_question_score_update': (
+        'UPDATE tournament_participants SET total_questions = total_questions + 1 WHERE user_id = ? AND tournament_id = ? AND completed_at IS NULL', (1, 1)),
+    'tournament_questions': (
+        'SELECT id, question, option_a, option_b, option_c, option_d FROM questions WHERE tournament_id = ? ORDER BY id', (1,)),
+    'leaderboard': (
+        '''SELECT tp.user_id, u.first_name, u.last_name, tp.correct_answers, tp.total_questions, tp.total_score, tp.completed_at
+           FROM tournament_participants tp JOIN users u ON tp.user_id = u.id
+           WHERE tp.tournament_id = ? AND tp.completed_at IS NOT NULL
+           ORDER BY tp.correct_answers DESC, tp.completed_at ASC LIMIT 10''', (1,)),
+    'participant_count': (
+        'SELECT COUNT(*) FROM tournament_participants WHERE tournament_id = ? AND completed_at IS NOT NULL', (1,)),
+    'active_course': (
+        '''SELECT id, course_title FROM user_courses WHERE user_id = ? AND status = 'active'
+           ORDER BY added_at DESC LIMIT 1''', (1,)),
+    'global_leaderboard': (
+        '''SELECT us.user_id, u.first_name, u.last_name, us.total_correct, us.total_questions,
+                  us.avg_score, us.tournaments_completed
+           FROM user_stats us JOIN users u ON us.user_id = u.id
+           WHERE us.total_correct > 0
+           ORDER BY us.total_correct DESC, us.avg_score DESC LIMIT 10''', ()),
+    'weekly_calendar': (
+        '''SELECT id, title, status, start_time FROM tournaments
+           WHERE start_time >= ? AND start_time < ? ORDER BY start_time ASC''', ('2024-01-01', '2024-01-08')),
+    'user_tournament_wins': (
+        '''SELECT t.id, t.title, tp.total_score, tp.correct_answers, tp.total_questions,
+                  tp.completed_at, ts.completed_count
+           FROM tournament_participants tp
+           JOIN tournament_summary ts ON ts.tournament_id = tp.tournament_id
+           JOIN tournaments t ON tp.tournament_id = t.id
+           WHERE tp.user_id = ? AND tp.completed_at IS NOT NULL AND tp.correct_answers = ts.best_correct
+           ORDER BY tp.completed_at DESC LIMIT 4''', (1,)),
+    'latest_profile': (
+        'SELECT skill, level FROM user_profiles WHERE user_id = ? ORDER BY created_at DESC LIMIT 1', (1,)),
+    'llm_cache_lookup': (
+        'SELECT response FROM llm_cache WHERE cache_key = ? AND created_at >= ?', ('x', '2024-01-01 00:00:00')),
+    'question_bank_sample': (
+        '''SELECT qb.id, qb.question, qb.option_a, qb.option_b, qb.option_c, qb.option_d, qb.correct_option
+           FROM question_bank qb
+           WHERE qb.topic = ? AND qb.difficulty = ?
+             AND NOT EXISTS (SELECT 1 FROM question_bank_served s WHERE s.user_id = ? AND s.question_id = qb.id)
+           ORDER BY RANDOM() LIMIT ?''', ('python', 'medium', 1, 15)),
+    'course_sections_lookup': (
+        'SELECT sections, source, etag, last_modified, checked_at FROM course_sections WHERE url = ?', ('https://x',)),
+    'question_jobs_expire': (
+        '''UPDATE question_jobs SET status = 'failed'
+           WHERE status IN ('queued', 'running') AND created_at < ?''', ('2024-01-01 00:00:00',)),
+}
+
+def explain_hot_queries():
+    """Sıcak sorguların planlarını döndür; tam tablo taraması yapanları işaretle"""
+    conn = get_db()
+    cursor = conn.cursor()
+    results = []
+    
+    for name, (sql, params) in HOT_QUERIES.items():
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        details = [row[3] for row in cursor.fetchall()]
+        # "SCAN tablo" tam tarama demektir; "SEARCH ... USING INDEX" beklenir
+        full_scans = [detail for detail in details if detail.startswith('SCAN ')]
+        results.append({'name': name, 'plan': details, 'full_scans': full_scans})
+    
+    conn.close()
+    return results
+
 # Veritabanını başlatma
 init_db()
 update_database_schema()
 
+# Dış HTTP çağrıları: host başına kalıcı bağlantı havuzu, zaman aşımı, üstel geri çekilmeli
+# yeniden deneme ve devre kesici. Devre açıkken çağıran demo veriye düşer
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3.05"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.3"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("HTTP_CIRCUIT_FAILURE_THRESHOLD", "5"))
+HTTP_CIRCUIT_RESET_SECONDS = int(os.getenv("HTTP_CIRCUIT_RESET_SECONDS", "30"))
+# Kurs sayfası isteğinin arkasında Selenium yedeği var; yeniden deneme yerine hızlı vazgeç
+HTTP_SCRAPE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_SCRAPE_CONNECT_TIMEOUT_SECONDS", "1.5"))
+HTTP_SCRAPE_MAX_RETRIES = int(os.getenv("HTTP_SCRAPE_MAX_RETRIES", "0"))
+
+class CircuitOpenError(requests.RequestException):
+    """Host devre kesici açıkken istek gönderilmez"""
+
+class OutboundHTTPClient:
+    """Host başına requests.Session, devre kesici ve gecikme metrikleri (süreç başına)"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.sessions = {}
+        self.circuits = {}
+        self.metrics = {}
+    
+    def create_session(self, retries):
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def get_session(self, host, retries):
+        """Host ve yeniden deneme sayısı başına oturum; devre ve metrikler host başına"""
+        with self.lock:
+            # Fork sonrası üst sürecin soketleri paylaşılmasın
+            if self.pid != os.getpid():
+                self.sessions = {}
+                self.circuits = {}
+                self.metrics = {}
+                self.pid = os.getpid()
+            if (host, retries) not in self.sessions:
+                self.sessions[(host, retries)] = self.create_session(retries)
+            if host not in self.circuits:
+                self.circuits[host] = {'failures': 0, 'open_until': 0.0, 'probing': False}
+                self.metrics[host] = {
+                    'requests': 0, 'errors': 0, 'rejected': 0, 'total_seconds': 0.0,
+                    'max_seconds': 0.0, 'latencies': deque(maxlen=200), 'last_status': None
+                }
+            return self.sessions[(host, retries)]
+    
+    def is_open(self, url):
+        """Host devresi açık mı (yeni istek reddedilecek mi)"""
+        host = urlparse(url).netloc
+        with self.lock:
+            circuit = self.circuits.get(host)
+            return bool(circuit and circuit['open_until'] > time.monotonic())
+    
+    def allow_request(self, host):
+        with self.lock:
+            circuit = self.circuits[host]
+            if circuit['failures'] < HTTP_CIRCUIT_FAILURE_THRESHOLD:
+                return True
+            if circuit['open_until'] > time.monotonic() or circuit['probing']:
+                self.metrics[host]['rejected'] += 1
+                return False
+            # Yarı açık: süre doldu, tek bir deneme isteğine izin ver
+            circuit['probing'] = True
+            return True
+    
+    def record(self, host, elapsed, status_code=None, failed=False):
+        with self.lock:
+            metrics = self.metrics[host]
+            metrics['requests'] += 1
+            metrics['total_seconds'] += elapsed
+            metrics['max_seconds'] = max(metrics['max_seconds'], elapsed)
+            metrics['latencies'].append(elapsed)
+            metrics['last_status'] = status_code
+            
+            circuit = self.circuits[host]
+            circuit['probing'] = False
+            if failed:
+                metrics['errors'] += 1
+                circuit['failures'] += 1
+                if circuit['failures'] >= HTTP_CIRCUIT_FAILURE_THRESHOLD:
+                    circuit['open_until'] = time.monotonic() + HTTP_CIRCUIT_RESET_SECONDS
+                    print(f"HTTP devre kesici açıldı: {host} ({circuit['failures']} ardışık hata)")
+            else:
+                circuit['failures'] = 0
+                circuit['open_until'] = 0.0
+    
+    def get(self, url, retries=None, **kwargs):
+        """Zaman aşımı ve yeniden denemeli GET; devre açıksa CircuitOpenError"""
+        host = urlparse(url).netloc
+        session = self.get_session(host, HTTP_MAX_RETRIES if retries is None else retries)
+        if not self.allow_request(host):
+            raise CircuitOpenError(f"{host} için devre kesici açık")
+        
+        kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_READ_TIMEOUT_SECONDS))
+        started = time.perf_counter()
+        try:
+            response = session.get(url, **kwargs)
+        except Exception:
+            self.record(host, time.perf_counter() - started, failed=True)
+            raise
+        # 429 da hata sayılır: hız sınırına takılan hosta istek yağdırmaya devam etme
+        failed = response.status_code >= 500 or response.status_code == 429
+        self.record(host, time.perf_counter() - started, response.status_code, failed=failed)
+        return response
+    
+    def stats(self):
+        with self.lock:
+            hosts = {}
+            for host, metrics in self.metrics.items():
+                latencies = sorted(metrics['latencies'])
+                circuit = self.circuits[host]
+                hosts[host] = {
+                    'requests': metrics['requests'],
+                    'errors': metrics['errors'],
+                    'rejected': metrics['rejected'],
+                    'avg_ms': round(metrics['total_seconds'] / metrics['requests'] * 1000, 1) if metrics['requests'] else None,
+                    'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                    'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+                    'max_ms': round(metrics['max_seconds'] * 1000, 1),
+                    'last_status': metrics['last_status'],
+                    'circuit': 'open' if circuit['open_until'] > time.monotonic() else (
+                        'half-open' if circuit['failures'] >= HTTP_CIRCUIT_FAILURE_THRESHOLD else 'closed'),
+                    'consecutive_failures': circuit['failures']
+                }
+            return hosts
+
+http_client = OutboundHTTPClient()
+
 # BTK Akademi entegrasyonu için fonksiyonlar
 def search_btk_courses(query):
     """BTK Akademi'de kurs arama"""
@@ -296,7 +1144,7 @@ def search_btk_courses(query):
             print("API keys not configured, returning demo data")
             return get_demo_courses(query)
         
-        response = requests.get(
+        response = http_client.get(
             "https://www.googleapis.com/customsearch/v1",
             params={
                 "key": google_api_key,
@@ -411,8 +1259,266 @@ def recommend_best_course(profile, courses, skill):
         "reason": f"Bu kurs {profile['seviye']} seviyesinde {skill} öğrenmek için en uygun seçenektir."
     }
 
-def scrape_btk_course_sections(course_url):
-    """BTK Akademi kurs sayfasından bölümleri çek - Hibrit versiyon"""
+# Selenium yedek yolu için uzun ömürlü headless tarayıcı havuzu
+# Havuz boyutu aynı anda açık Chrome sayısını (ve belleğini) sınırlar; sürücü N sayfadan sonra yenilenir
+SELENIUM_POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "2"))
+SELENIUM_MAX_PAGES_PER_DRIVER = int(os.getenv("SELENIUM_MAX_PAGES_PER_DRIVER", "50"))
+SELENIUM_PAGE_TIMEOUT_SECONDS = int(os.getenv("SELENIUM_PAGE_TIMEOUT_SECONDS", "10"))
+SELENIUM_ACQUIRE_TIMEOUT_SECONDS = 15
+# Sürücü yolu (gerekirse indirme) varsayılan olarak worker ilk isteği alınca arka planda çözülür.
+# Import anında çözülmez (--preload ana süreci ve CLI komutları indirme yapmasın); o sırada gelen
+# ilk scrape aynı kilitte çözümün bitmesini bekler, ikinci bir indirme başlatmaz.
+# Dağıtımda `flask --app app resolve-chromedriver` ile önceden indirilebilir. 0 ise ilk kullanımda çözülür
+CHROMEDRIVER_RESOLVE_ON_START = os.getenv("CHROMEDRIVER_RESOLVE_ON_START", "1") != "0"
+# 1 ise ilk tarayıcı da önceden başlatılır; Chrome belleği (~150 MB) scraping hiç
+# kullanılmayan worker'larda harcanmasın diye bilerek kapalı
+SELENIUM_WARMUP_ON_START = os.getenv("SELENIUM_WARMUP_ON_START", "0") != "0"
+COURSE_SECTION_SELECTOR = 'span.font-medium.text-base'
+chromedriver_path = None
+chromedriver_lock = threading.Lock()
+
+def get_chromedriver_path():
+    """chromedriver yolunu süreç ömrü boyunca bir kez çöz (CHROMEDRIVER_PATH varsa onu kullan)"""
+    global chromedriver_path
+    if chromedriver_path is None:
+        with chromedriver_lock:
+            if chromedriver_path is None:
+                path = os.getenv("CHROMEDRIVER_PATH")
+                if not path:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    path = ChromeDriverManager().install()
+                chromedriver_path = path
+    return chromedriver_path
+
+def create_chrome_driver():
+    """Yeni headless Chrome oturumu başlat"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--ignore-ssl-errors")
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--allow-running-insecure-content")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    # DOM hazır olunca dön; bölümler zaten açık bekleme ile beklenir
+    chrome_options.page_load_strategy = 'eager'
+    
+    driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=chrome_options)
+    driver.set_page_load_timeout(SELENIUM_PAGE_TIMEOUT_SECONDS)
+    return driver
+
+class BrowserPool:
+    """Sınırlı sayıda yeniden kullanılan headless tarayıcı oturumu"""
+    
+    def __init__(self, size, max_pages):
+        self.size = size
+        self.max_pages = max_pages
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def is_healthy(entry):
+        try:
+            entry['driver'].execute_script('return 1')
+            return True
+        except Exception:
+            return False
+    
+    def discard(self, entry):
+        """Oturumu kapat ve havuzdaki yerini boşalt"""
+        try:
+            entry['driver'].quit()
+        except Exception as e:
+            print(f"Tarayıcı kapatma hatası: {e}")
+        with self.lock:
+            self.created -= 1
+        # idle.get ile bekleyen varsa uyandır; boşalan yere yeni oturum açabilir
+        self.idle.put(None)
+    
+    def acquire(self):
+        # Önce boşta bekleyen sağlıklı bir oturum, yoksa sınır dolmadıysa yenisi
+        while True:
+            try:
+                entry = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                continue
+            if self.is_healthy(entry):
+                return entry
+            self.discard(entry)
+        
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            try:
+                return {'driver': create_chrome_driver(), 'pages': 0}
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+        
+        # Sınır dolu: bir oturumun geri gelmesini bekle
+        entry = self.idle.get(timeout=SELENIUM_ACQUIRE_TIMEOUT_SECONDS)
+        if entry is None:
+            # Bir oturum kapatıldı: yer açıldı, baştan dene
+            return self.acquire()
+        if self.is_healthy(entry):
+            return entry
+        self.discard(entry)
+        return self.acquire()
+    
+    def release(self, entry, healthy=True):
+        entry['pages'] += 1
+        if not healthy or entry['pages'] >= self.max_pages:
+            self.discard(entry)
+            return
+        try:
+            # Önceki sayfanın belleğini bırak
+            entry['driver'].get('about:blank')
+        except Exception:
+            self.discard(entry)
+            return
+        self.idle.put(entry)
+    
+    @contextmanager
+    def session(self):
+        """Oturumu ödünç al; hata olursa tarayıcı kapatılır, yoksa havuza döner"""
+        entry = self.acquire()
+        healthy = False
+        try:
+            yield entry['driver']
+            healthy = True
+        finally:
+            self.release(entry, healthy)
+    
+    def close(self):
+        while True:
+            try:
+                entry = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not None:
+                self.discard(entry)
+
+browser_pool = None
+browser_pool_pid = None
+browser_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Tarayıcı havuzunu süreç başına ilk kullanımda oluştur"""
+    global browser_pool, browser_pool_pid
+    if browser_pool_pid != os.getpid():
+        with browser_pool_lock:
+            if browser_pool_pid != os.getpid():
+                browser_pool = BrowserPool(SELENIUM_POOL_SIZE, SELENIUM_MAX_PAGES_PER_DRIVER)
+                browser_pool_pid = os.getpid()
+                atexit.register(browser_pool.close)
+    return browser_pool
+
+def selenium_warmup_worker():
+    """Sürücü yolunu çöz ve ilk tarayıcıyı havuza hazırla"""
+    try:
+        pool = get_browser_pool()
+        pool.release(pool.acquire())
+        print("Selenium tarayıcı havuzu hazır")
+    except Exception as e:
+        print(f"Selenium ısınma hatası: {e}")
+
+def chromedriver_resolve_worker():
+    """Sürücü yolunu arka planda çöz (gerekirse indir)"""
+    try:
+        print(f"chromedriver hazır: {get_chromedriver_path()}")
+    except Exception as e:
+        print(f"chromedriver çözme hatası: {e}")
+
+chromedriver_resolve_pid = None
+
+def ensure_chromedriver_resolve():
+    global chromedriver_resolve_pid
+    if chromedriver_resolve_pid == os.getpid():
+        return
+    with chromedriver_lock:
+        if chromedriver_resolve_pid == os.getpid():
+            return
+        chromedriver_resolve_pid = os.getpid()
+    threading.Thread(target=chromedriver_resolve_worker, name='chromedriver-resolve', daemon=True).start()
+
+selenium_warmup_pid = None
+
+def ensure_selenium_warmup():
+    global selenium_warmup_pid
+    if selenium_warmup_pid == os.getpid():
+        return
+    with browser_pool_lock:
+        if selenium_warmup_pid == os.getpid():
+            return
+        selenium_warmup_pid = os.getpid()
+    threading.Thread(target=selenium_warmup_worker, name='selenium-warmup', daemon=True).start()
+
+def extract_course_sections(html):
+    """Kurs sayfası HTML'inden numaralı bölüm başlıklarını çıkar"""
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    sections = []
+    span_elements = soup.find_all('span', class_='font-medium text-base')
+    print(f"font-medium text-base ile {len(span_elements)} span bulundu")
+    
+    for span in span_elements:
+        text = span.get_text().strip()
+        if re.match(r'^\d+\.', text):
+            sections.append(text)
+            print(f"Bölüm bulundu: {text}")
+    return sections
+
+def scrape_course_sections_with_selenium(course_url):
+    """Havuzdaki tarayıcıyla sayfayı aç, bölümler görünene kadar bekle"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    
+    with get_browser_pool().session() as driver:
+        driver.get(course_url)
+        try:
+            WebDriverWait(driver, SELENIUM_PAGE_TIMEOUT_SECONDS).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, COURSE_SECTION_SELECTOR))
+            )
+        except TimeoutException:
+            print(f"{SELENIUM_PAGE_TIMEOUT_SECONDS} saniyede bölüm elementi görünmedi")
+        page_source = driver.page_source
+    
+    print("Selenium ile HTML alındı, bölümler aranıyor...")
+    return extract_course_sections(page_source)
+
+def demo_course_sections(course_url):
+    """Bölümler alınamadığında gösterilecek örnek başlıklar"""
+    if 'git' in course_url.lower():
+        return ["1. Git Temelleri", "2. Repository Yönetimi", "3. Branch ve Merge", "4. GitHub Kullanımı", "5. İleri Git Teknikleri"]
+    elif 'python' in course_url.lower():
+        return ["1. Python Giriş", "2. Temel Syntax", "3. Veri Yapıları", "4. Fonksiyonlar", "5. OOP"]
+    else:
+        return ["1. Tanıtım", "2. Temel Kavramlar", "3. Uygulama", "4. Test", "5. Proje"]
+
+def fetch_course_sections(course_url, etag=None, last_modified=None):
+    """Kurs sayfasını kazı; etag/last_modified verilirse koşullu GET ile yeniden doğrula
+    
+    Dönen sözlük: sections, source (requests/selenium/demo), etag, last_modified, not_modified
+    """
+    result = {'sections': [], 'source': 'demo', 'etag': None, 'last_modified': None, 'not_modified': False}
     try:
         print(f"Kurs sayfasına gidiliyor: {course_url}")
         
@@ -426,86 +1532,162 @@ def scrape_btk_course_sections(course_url):
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
             }
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
             
-            response = requests.get(course_url, headers=headers, timeout=2, verify=False)
+            response = http_client.get(
+                course_url, headers=headers, timeout=(HTTP_SCRAPE_CONNECT_TIMEOUT_SECONDS, 2),
+                retries=HTTP_SCRAPE_MAX_RETRIES, verify=False)
+            if response.status_code == 304:
+                print("Kurs sayfası değişmemiş (304)")
+                result['not_modified'] = True
+                return result
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
             print("Requests ile HTML alındı, bölümler aranıyor...")
-            
-            # Bölümleri bul
-            sections = []
-            span_elements = soup.find_all('span', class_='font-medium text-base')
-            print(f"font-medium text-base ile {len(span_elements)} span bulundu")
-            
-            for span in span_elements:
-                text = span.get_text().strip()
-                if re.match(r'^\d+\.', text):
-                    sections.append(text)
-                    print(f"Bölüm bulundu: {text}")
+            sections = extract_course_sections(response.content)
             
             if sections:
                 print(f"Requests başarılı! Toplam {len(sections)} bölüm bulundu")
-                return sections
+                result.update(
+                    sections=sections,
+                    source='requests',
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+                return result
                 
         except Exception as e:
             print(f"Requests başarısız: {e}")
         
-        # Requests başarısızsa Selenium kullan (yavaş ama güvenilir)
-        print("Selenium ile deneniyor...")
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--ignore-ssl-errors")
-        chrome_options.add_argument("--ignore-certificate-errors")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--allow-running-insecure-content")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        driver.get(course_url)
-        time.sleep(3)  # Daha kısa bekleme
-        
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        print("Selenium ile HTML alındı, bölümler aranıyor...")
-        
-        sections = []
-        span_elements = soup.find_all('span', class_='font-medium text-base')
-        print(f"font-medium text-base ile {len(span_elements)} span bulundu")
+        # Site art arda hata veriyorsa tarayıcıyı da yorma, doğrudan demo verilere düş
+        if http_client.is_open(course_url):
+            print("Kurs sitesi için devre kesici açık, demo veriler döndürülüyor")
+            result['sections'] = demo_course_sections(course_url)
+            return result
         
-        for span in span_elements:
-            text = span.get_text().strip()
-            if re.match(r'^\d+\.', text):
-                sections.append(text)
-                print(f"Bölüm bulundu: {text}")
-        
-        driver.quit()
+        # Requests başarısızsa havuzdaki tarayıcıyla dene
+        print("Selenium ile deneniyor...")
+        sections = scrape_course_sections_with_selenium(course_url)
         
         if sections:
             print(f"Selenium başarılı! Toplam {len(sections)} bölüm bulundu")
-            return sections
-        else:
-            print("Hiç bölüm bulunamadı, demo veriler döndürülüyor")
-            if 'git' in course_url.lower():
-                return ["1. Git Temelleri", "2. Repository Yönetimi", "3. Branch ve Merge", "4. GitHub Kullanımı", "5. İleri Git Teknikleri"]
-            elif 'python' in course_url.lower():
-                return ["1. Python Giriş", "2. Temel Syntax", "3. Veri Yapıları", "4. Fonksiyonlar", "5. OOP"]
-            else:
-                return ["1. Tanıtım", "2. Temel Kavramlar", "3. Uygulama", "4. Test", "5. Proje"]
+            result.update(sections=sections, source='selenium')
+            return result
+        
+        print("Hiç bölüm bulunamadı, demo veriler döndürülüyor")
             
     except Exception as e:
         print(f"Scraping hatası: {e}")
-        if 'git' in course_url.lower():
-            return ["1. Git Temelleri", "2. Repository Yönetimi", "3. Branch ve Merge", "4. GitHub Kullanımı", "5. İleri Git Teknikleri"]
-        else:
-            return ["1. Tanıtım", "2. Temel Kavramlar", "3. Uygulama", "4. Test", "5. Proje"]
+    
+    result['sections'] = demo_course_sections(course_url)
+    return result
+
+def scrape_btk_course_sections(course_url):
+    """BTK Akademi kurs sayfasından bölümleri çek - Hibrit versiyon (önbelleksiz)"""
+    return fetch_course_sections(course_url)['sections']
+
+# Kurs bölümleri önbelleği: taze kayıt doğrudan, bayat kayıt hemen döndürülüp arka planda yenilenir
+# (stale-while-revalidate); çok eski veya hiç olmayan kayıt için istek sırasında kazınır
+COURSE_SECTIONS_FRESH_SECONDS = int(os.getenv("COURSE_SECTIONS_FRESH_SECONDS", str(7 * 24 * 3600)))
+COURSE_SECTIONS_STALE_SECONDS = int(os.getenv("COURSE_SECTIONS_STALE_SECONDS", str(30 * 24 * 3600)))
+# Demo veri bir hata sonucudur; kısa süre sonra yeniden denenir
+COURSE_SECTIONS_DEMO_SECONDS = 3600
+course_sections_refreshing = set()
+course_sections_lock = threading.Lock()
+course_sections_executor = None
+course_sections_executor_pid = None
+
+def get_course_sections_executor():
+    """Arka plan yenileme havuzunu süreç başına ilk kullanımda oluştur"""
+    global course_sections_executor, course_sections_executor_pid
+    if course_sections_executor_pid != os.getpid():
+        with course_sections_lock:
+            if course_sections_executor_pid != os.getpid():
+                course_sections_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='course-sections')
+                course_sections_executor_pid = os.getpid()
+    return course_sections_executor
+
+def load_course_sections_row(course_url):
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT sections, source, etag, last_modified, checked_at
+        FROM course_sections WHERE url = ?
+    ''', (course_url,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+def refresh_course_sections(course_url):
+    """Kaydı kaynağından yenile (mümkünse koşullu GET ile) ve güncel bölümleri döndür"""
+    row = load_course_sections_row(course_url)
+    cached_sections, cached_source = (json.loads(row[0]), row[1]) if row else (None, None)
+    
+    # Koşullu GET sadece requests ile alınmış kayıtlar için anlamlıdır
+    if cached_source == 'requests':
+        result = fetch_course_sections(course_url, etag=row[2], last_modified=row[3])
+    else:
+        result = fetch_course_sections(course_url)
+    
+    now = utc_timestamp()
+    conn = get_db()
+    cursor = conn.cursor()
+    if result['not_modified'] or (result['source'] == 'demo' and cached_sections and cached_source != 'demo'):
+        # Değişmemiş veya kaynak şu an erişilemiyor: eldeki gerçek bölümleri korumaya devam et
+        cursor.execute('UPDATE course_sections SET checked_at = ? WHERE url = ?', (now, course_url))
+        sections = cached_sections
+    else:
+        cursor.execute('''
+            INSERT INTO course_sections (url, sections, source, etag, last_modified, fetched_at, checked_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                sections = excluded.sections,
+                source = excluded.source,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                fetched_at = excluded.fetched_at,
+                checked_at = excluded.checked_at
+        ''', (course_url, json.dumps(result['sections'], ensure_ascii=False), result['source'],
+              result['etag'], result['last_modified'], now, now))
+        sections = result['sections']
+    conn.commit()
+    conn.close()
+    return sections
+
+def refresh_course_sections_in_background(course_url):
+    with course_sections_lock:
+        if course_url in course_sections_refreshing:
+            return
+        course_sections_refreshing.add(course_url)
+    
+    def refresh():
+        try:
+            refresh_course_sections(course_url)
+        except Exception as e:
+            print(f"Kurs bölümleri yenileme hatası ({course_url}): {e}")
+        finally:
+            with course_sections_lock:
+                course_sections_refreshing.discard(course_url)
+    
+    get_course_sections_executor().submit(refresh)
+
+def get_course_sections(course_url):
+    """Kurs bölümlerini önbellekten getir; gerekirse yenile"""
+    row = load_course_sections_row(course_url)
+    if row:
+        sections, source, checked_at = json.loads(row[0]), row[1], row[4]
+        fresh_seconds = COURSE_SECTIONS_DEMO_SECONDS if source == 'demo' else COURSE_SECTIONS_FRESH_SECONDS
+        if checked_at >= utc_timestamp(-fresh_seconds):
+            return sections
+        if checked_at >= utc_timestamp(-COURSE_SECTIONS_STALE_SECONDS):
+            # Bayat ama kullanılabilir: hemen döndür, arka planda yenile
+            refresh_course_sections_in_background(course_url)
+            return sections
+    
+    return refresh_course_sections(course_url)
 
 def generate_project_suggestion(skill, level):
     """Gemini API ile proje önerisi oluştur"""
@@ -520,7 +1702,13 @@ def generate_project_suggestion(skill, level):
                 'status': 'locked'
             }
         
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        cache_key = llm_cache_key('project', 'gemini-2.5-flash', PROJECT_PROMPT_VERSION, skill, level)
+        if LLM_CACHE_ENABLED:
+            cached_project = llm_cache_get(cache_key)
+            if cached_project:
+                return cached_project
+        
+        model = get_genai().GenerativeModel('gemini-2.5-flash')
         
         prompt = f"""
 {skill} programlama dili için {level} seviyesinde bir proje önerisi oluştur.
@@ -547,46 +1735,11 @@ KURALLAR:
         
         response = model.generate_content(prompt)
         
-        # JSON parse et
-        import json
-        import re
+        # Yanıttaki ilk geçerli proje nesnesini al (kod bloğu ve fazladan metin yok sayılır)
+        result = next(iter_json_objects([response.text], ('title', 'description')), None)
         
-        try:
-            response_text = response.text.strip()
-            
-            # Markdown kod bloğu varsa temizle
-            if response_text.startswith('```json'):
-                # ```json ile başlayıp ``` ile bitenleri bul
-                json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1).strip()
-                else:
-                    # ```json varsa ama ``` yoksa, ```json'dan sonrasını al
-                    response_text = response_text[7:].strip()  # ```json kısmını çıkar
-            elif response_text.startswith('```'):
-                # Sadece ``` ile başlıyorsa
-                json_match = re.search(r'```\s*(.*?)\s*```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1).strip()
-                else:
-                    response_text = response_text[3:].strip()  # ``` kısmını çıkar
-            
-            # JSON'u temizle ve tamamla
-            response_text = clean_and_fix_json(response_text)
-            
-            # JSON parse et
-            result = json.loads(response_text)
-            
-            return {
-                'title': result.get('title', f'{skill} ile Proje'),
-                'description': result.get('description', f'{skill} öğrendiklerinizi pekiştirmek için bir proje yapın.'),
-                'icon': result.get('icon', '🚀'),
-                'status': 'locked'
-            }
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON parse hatası: {e}")
-            print(f"AI yanıtı: {response_text[:200]}...")
+        if result is None:
+            print(f"Proje önerisi JSON olarak ayrıştırılamadı: {response.text[:200]}...")
             
             # JSON parse edilemezse varsayılan proje döndür
             return {
@@ -595,6 +1748,16 @@ KURALLAR:
                 'icon': '🚀',
                 'status': 'locked'
             }
+        
+        project = {
+            'title': result.get('title', f'{skill} ile Proje'),
+            'description': result.get('description', f'{skill} öğrendiklerinizi pekiştirmek için bir proje yapın.'),
+            'icon': result.get('icon', '🚀'),
+            'status': 'locked'
+        }
+        if LLM_CACHE_ENABLED:
+            llm_cache_put(cache_key, 'project', project)
+        return project
             
     except Exception as e:
         print(f"Proje önerisi oluşturma hatası: {e}")
@@ -605,8 +1768,8 @@ KURALLAR:
             'status': 'locked'
         }
 
-def create_dynamic_roadmap(course_title, course_link, sections, skill=None, level=None):
-    """Dinamik yol haritası oluştur"""
+def create_dynamic_roadmap(course_title, course_link, sections, skill=None, level=None, project_suggestion=None):
+    """Dinamik yol haritası oluştur (proje önerisi verilmezse burada üretilir)"""
     roadmap_steps = []
     
     for i, section in enumerate(sections, 1):
@@ -622,7 +1785,8 @@ def create_dynamic_roadmap(course_title, course_link, sections, skill=None, leve
     
     # En sona proje kartı ekle
     if skill and level:
-        project_suggestion = generate_project_suggestion(skill, level)
+        if project_suggestion is None:
+            project_suggestion = generate_project_suggestion(skill, level)
         project_step = {
             'id': len(roadmap_steps) + 1,
             'title': project_suggestion['title'],
@@ -635,6 +1799,189 @@ def create_dynamic_roadmap(course_title, course_link, sections, skill=None, leve
     
     return roadmap_steps
 
+# Yol haritası hazırlama: kurs satırı 'building' durumuyla hemen eklenir, bölümler ve
+# proje kartı sınırlı bir havuzda hazırlanıp satıra yazılır
+ROADMAP_BUILD_WORKERS = int(os.getenv("ROADMAP_BUILD_WORKERS", "4"))
+ROADMAP_BUILD_QUEUE_LIMIT = int(os.getenv("ROADMAP_BUILD_QUEUE_LIMIT", "50"))
+ROADMAP_BUILD_TIMEOUT_SECONDS = 300
+roadmap_build_executor = None
+roadmap_build_executor_pid = None
+roadmap_build_pending = 0
+roadmap_build_lock = threading.Lock()
+
+def get_roadmap_build_executor():
+    """Yol haritası havuzunu süreç başına ilk kullanımda oluştur"""
+    global roadmap_build_executor, roadmap_build_executor_pid, roadmap_build_pending
+    if roadmap_build_executor_pid != os.getpid():
+        with roadmap_build_lock:
+            if roadmap_build_executor_pid != os.getpid():
+                roadmap_build_executor = ThreadPoolExecutor(
+                    max_workers=ROADMAP_BUILD_WORKERS, thread_name_prefix='roadmap-build')
+                roadmap_build_executor_pid = os.getpid()
+                roadmap_build_pending = 0
+    return roadmap_build_executor
+
+# Bölümler ve proje önerisi birbirinden bağımsızdır; aynı anda çalıştırılıp her biri kendi
+# süresiyle beklenir. Süresi dolan görev yerine demo bölümler / varsayılan proje kullanılır
+ROADMAP_SECTIONS_TIMEOUT_SECONDS = float(os.getenv("ROADMAP_SECTIONS_TIMEOUT_SECONDS", "20"))
+ROADMAP_PROJECT_TIMEOUT_SECONDS = float(os.getenv("ROADMAP_PROJECT_TIMEOUT_SECONDS", "20"))
+# Çalışmaya başlamış görev iptal edilemez; süresi dolunca terk edilir ve bitene kadar bir thread tutar.
+# Havuzda terk edilen görevler için bu kadar ek yer ayrılır; dolarsa yeni görev açılmaz, yedek kullanılır
+ROADMAP_TASK_ABANDONED_LIMIT = int(os.getenv("ROADMAP_TASK_ABANDONED_LIMIT", "4"))
+roadmap_task_executor = None
+roadmap_task_executor_pid = None
+roadmap_tasks_abandoned = 0
+
+def get_roadmap_task_executor():
+    """Bölüm/proje görev havuzunu süreç başına ilk kullanımda oluştur
+    
+    Yol haritası işleri bu görevleri beklediği için ayrı bir havuz kullanılır (aynı havuzda kilitlenme olmasın)
+    """
+    global roadmap_task_executor, roadmap_task_executor_pid, roadmap_tasks_abandoned
+    if roadmap_task_executor_pid != os.getpid():
+        with roadmap_build_lock:
+            if roadmap_task_executor_pid != os.getpid():
+                roadmap_task_executor = ThreadPoolExecutor(
+                    max_workers=ROADMAP_BUILD_WORKERS * 2 + ROADMAP_TASK_ABANDONED_LIMIT,
+                    thread_name_prefix='roadmap-task')
+                roadmap_task_executor_pid = os.getpid()
+                roadmap_tasks_abandoned = 0
+    return roadmap_task_executor
+
+def submit_roadmap_task(function, *args):
+    """Görevi havuza gönder; terk edilen görevler ek yeri doldurduysa None döndür"""
+    executor = get_roadmap_task_executor()
+    with roadmap_build_lock:
+        if roadmap_tasks_abandoned >= ROADMAP_TASK_ABANDONED_LIMIT:
+            return None
+    state = {'done': False, 'abandoned': False}
+    
+    def run():
+        global roadmap_tasks_abandoned
+        try:
+            return function(*args)
+        finally:
+            with roadmap_build_lock:
+                state['done'] = True
+                if state['abandoned']:
+                    roadmap_tasks_abandoned -= 1
+    
+    future = executor.submit(run)
+    future.roadmap_state = state
+    return future
+
+def abandon_roadmap_task(future):
+    """Süresi dolan görevi bırak: başlamamışsa iptal et, çalışıyorsa terk edilmiş say"""
+    global roadmap_tasks_abandoned
+    if future.cancel():
+        return
+    with roadmap_build_lock:
+        state = future.roadmap_state
+        if not state['done'] and not state['abandoned']:
+            state['abandoned'] = True
+            roadmap_tasks_abandoned += 1
+
+def default_project_suggestion(skill):
+    return {
+        'title': f"{skill} ile Proje",
+        'description': f"{skill} öğrendiklerinizi pekiştirmek için bir proje yapın.",
+        'icon': '🚀',
+        'status': 'locked'
+    }
+
+def wait_roadmap_task(future, deadline, name, fallback):
+    """Görevi son tarihe kadar bekle; süre dolarsa veya hata olursa yedeği döndür"""
+    if future is None:
+        print(f"Yol haritası görevi açılmadı (zaman aşımına uğramış görevler sürüyor): {name}")
+        return fallback()
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FuturesTimeoutError:
+        # Çalışan görev durdurulamaz: bitene kadar sürer (kazıma sonucu yine önbelleğe yazılır)
+        abandon_roadmap_task(future)
+        print(f"Yol haritası görevi zaman aşımına uğradı: {name}")
+    except Exception as e:
+        print(f"Yol haritası görevi hatası ({name}): {e}")
+    return fallback()
+
+def create_course_roadmap(course_title, course_link, skill=None, level=None):
+    """Bölümleri ve proje önerisini aynı anda hazırlayıp yol haritasını oluştur"""
+    started = time.monotonic()
+    sections_future = submit_roadmap_task(get_course_sections, course_link)
+    has_project = bool(skill and level)
+    project_future = submit_roadmap_task(generate_project_suggestion, skill, level) if has_project else None
+    
+    sections = wait_roadmap_task(
+        sections_future, started + ROADMAP_SECTIONS_TIMEOUT_SECONDS, 'bölümler',
+        lambda: demo_course_sections(course_link))
+    project_suggestion = None
+    if has_project:
+        project_suggestion = wait_roadmap_task(
+            project_future, started + ROADMAP_PROJECT_TIMEOUT_SECONDS, 'proje önerisi',
+            lambda: default_project_suggestion(skill))
+    
+    return create_dynamic_roadmap(course_title, course_link, sections, skill, level, project_suggestion)
+
+def build_course_roadmap(course_id, course_title, course_link, skill=None, level=None):
+    """Bölümleri ve proje kartını hazırlayıp kurs satırına yaz"""
+    try:
+        roadmap_steps = create_course_roadmap(course_title, course_link, skill, level)
+        build_status = 'ready'
+    except Exception as e:
+        print(f"Yol haritası hazırlanamadı (kurs {course_id}): {e}")
+        roadmap_steps, build_status = [], 'failed'
+    
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        UPDATE user_courses SET roadmap_sections = ?, build_status = ?
+        WHERE id = ? AND build_status = 'building'
+    ''', (json.dumps(roadmap_steps), build_status, course_id))
+    conn.commit()
+    conn.close()
+    return build_status
+
+def run_roadmap_build(course_id, course_title, course_link, skill, level):
+    global roadmap_build_pending
+    try:
+        build_course_roadmap(course_id, course_title, course_link, skill, level)
+    except Exception as e:
+        print(f"Yol haritası işi hatası (kurs {course_id}): {e}")
+    finally:
+        with roadmap_build_lock:
+            roadmap_build_pending -= 1
+
+def submit_roadmap_build(course_id, course_title, course_link, skill=None, level=None):
+    """Hazırlamayı havuza gönder; kuyruk doluysa istek içinde hazırla"""
+    global roadmap_build_pending
+    executor = get_roadmap_build_executor()
+    with roadmap_build_lock:
+        queue_full = roadmap_build_pending >= ROADMAP_BUILD_QUEUE_LIMIT
+        if not queue_full:
+            roadmap_build_pending += 1
+    
+    if queue_full:
+        return build_course_roadmap(course_id, course_title, course_link, skill, level)
+    
+    try:
+        executor.submit(run_roadmap_build, course_id, course_title, course_link, skill, level)
+    except Exception:
+        with roadmap_build_lock:
+            roadmap_build_pending -= 1
+        # Satır 'building' kalırsa istemci zaman aşımına kadar boşuna bekler
+        conn = get_db()
+        conn.execute("UPDATE user_courses SET build_status = 'failed' WHERE id = ? AND build_status = 'building'", (course_id,))
+        conn.commit()
+        conn.close()
+        raise
+    return 'building'
+
+def effective_build_status(build_status, added_at):
+    """Zaman aşımına uğrayan hazırlamaları başarısız say (işi yürüten süreç yeniden başlamış olabilir)"""
+    if build_status == 'building' and added_at < utc_timestamp(-ROADMAP_BUILD_TIMEOUT_SECONDS):
+        return 'failed'
+    return build_status or 'ready'
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -693,7 +2040,7 @@ def register():
             return jsonify({'error': 'Şifre en az 6 karakter olmalıdır'}), 400
         
         # Veritabanına kaydet
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Email kontrolü
@@ -719,7 +2066,7 @@ def register():
         token = jwt.encode({
             'user_id': user_id,
             'email': data['email'],
-            'exp': datetime.utcnow() + timedelta(days=7)
+            'exp': datetime.now(timezone.utc) + timedelta(days=7)
         }, app.config['SECRET_KEY'], algorithm='HS256')
         
         return jsonify({
@@ -747,7 +2094,7 @@ def login():
             return jsonify({'error': 'Email ve şifre gereklidir'}), 400
         
         # Kullanıcıyı bul
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -779,7 +2126,7 @@ def login():
         token = jwt.encode({
             'user_id': user[0],
             'email': user[3],
-            'exp': datetime.utcnow() + timedelta(days=7)
+            'exp': datetime.now(timezone.utc) + timedelta(days=7)
         }, app.config['SECRET_KEY'], algorithm='HS256')
         
         return jsonify({
@@ -815,7 +2162,7 @@ def get_profile():
             return jsonify({'error': 'Geçersiz token'}), 401
         
         # Kullanıcı bilgilerini getir
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -847,7 +2194,7 @@ def get_profile():
 def get_users():
     """Tüm kullanıcıları listele (admin için)"""
     try:
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -938,7 +2285,7 @@ def analyze_profile():
         
         # Profili veritabanına kaydet
         print("Saving profile to database...")
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -993,7 +2340,7 @@ def add_course_to_roadmap():
                 return jsonify({'error': f'{field} alanı gereklidir'}), 400
         
         # Veritabanı bağlantısını aç
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Kullanıcının profil bilgilerini al
@@ -1006,24 +2353,23 @@ def add_course_to_roadmap():
         skill = profile[0] if profile else None
         level = profile[1] if profile else None
         
-        # BTK Akademi'den kurs bölümlerini çek
-        print(f"BTK Akademi'den bölümler çekiliyor: {data['course_link']}")
-        sections = scrape_btk_course_sections(data['course_link'])
-        
-        # Dinamik yol haritası oluştur (proje kartı ile birlikte)
-        roadmap_steps = create_dynamic_roadmap(data['course_title'], data['course_link'], sections, skill, level)
-        
+        # Kursu hemen ekle; bölümler ve proje kartı arka planda hazırlanır
         cursor.execute('''
-            INSERT INTO user_courses (user_id, course_title, course_link, course_description, roadmap_sections)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (payload['user_id'], data['course_title'], data['course_link'], data['course_description'], json.dumps(roadmap_steps)))
+            INSERT INTO user_courses (user_id, course_title, course_link, course_description, roadmap_sections, build_status)
+            VALUES (?, ?, ?, ?, ?, 'building')
+        ''', (payload['user_id'], data['course_title'], data['course_link'], data['course_description'], json.dumps([])))
+        course_id = cursor.lastrowid
         
         conn.commit()
         conn.close()
         
+        build_status = submit_roadmap_build(course_id, data['course_title'], data['course_link'], skill, level)
+        
         return jsonify({
             'success': True,
-            'message': 'Kurs yol haritasına eklendi'
+            'message': 'Kurs yol haritasına eklendi',
+            'course_id': course_id,
+            'build_status': build_status
         }), 200
         
     except Exception as e:
@@ -1046,7 +2392,7 @@ def get_user_roadmap():
             return jsonify({'error': 'Geçersiz token'}), 401
         
         # Kullanıcının profili ve kurslarını getir
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Profil bilgileri
@@ -1059,7 +2405,7 @@ def get_user_roadmap():
         
         # Kurslar (sadece aktif olanlar)
         cursor.execute('''
-            SELECT course_title, course_link, course_description, roadmap_sections, added_at
+            SELECT course_title, course_link, course_description, roadmap_sections, added_at, id, build_status
             FROM user_courses WHERE user_id = ? AND status = 'active' ORDER BY added_at DESC
         ''', (payload['user_id'],))
         
@@ -1094,7 +2440,9 @@ def get_user_roadmap():
                 'link': course[1],
                 'description': course[2],
                 'roadmap_steps': roadmap_steps,
-                'added_at': course[4]
+                'added_at': course[4],
+                'id': course[5],
+                'build_status': effective_build_status(course[6], course[4])
             })
         
         return jsonify(roadmap_data), 200
@@ -1102,6 +2450,47 @@ def get_user_roadmap():
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
+@app.route('/api/roadmap-build-status/<int:course_id>', methods=['GET'])
+def get_roadmap_build_status(course_id):
+    """Arka planda hazırlanan yol haritasının durumunu getir"""
+    try:
+        # Token kontrolü
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Token gereklidir'}), 401
+        
+        token = auth_header.split(' ')[1]
+        
+        try:
+            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token süresi dolmuş'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'error': 'Geçersiz token'}), 401
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT build_status, added_at, roadmap_sections
+            FROM user_courses WHERE id = ? AND user_id = ?
+        ''', (course_id, payload['user_id']))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return jsonify({'error': 'Kurs bulunamadı'}), 404
+        
+        build_status = effective_build_status(row[0], row[1])
+        return jsonify({
+            'success': True,
+            'course_id': course_id,
+            'build_status': build_status,
+            'roadmap_steps': json.loads(row[2]) if build_status == 'ready' and row[2] else []
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
 @app.route('/api/update-user-progress', methods=['POST'])
 def update_user_progress():
     """Kullanıcının yol haritası ilerlemesini güncelle"""
@@ -1127,7 +2516,7 @@ def update_user_progress():
             return jsonify({'error': 'completed_step ve roadmap_steps alanları gereklidir'}), 400
         
         # Veritabanına kaydet
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Kullanıcının en son kursunu bul
@@ -1191,7 +2580,7 @@ def complete_course():
             return jsonify({'error': 'Geçersiz token'}), 401
         
         # Veritabanına kaydet
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Kullanıcının en son kursunu bul
@@ -1227,156 +2616,280 @@ def complete_course():
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
-def clean_and_fix_json(json_text):
-    """JSON metnini temizler ve eksik kapanan tırnak işaretlerini düzeltir"""
-    try:
-        # Önce normal JSON parse dene
-        json.loads(json_text)
-        return json_text
-    except json.JSONDecodeError as e:
-        print(f"JSON temizleme gerekli: {e}")
-        
-        # Markdown kod bloğu varsa temizle
-        if json_text.startswith('```'):
-            json_text = re.sub(r'^```(?:json)?\s*', '', json_text)
-            json_text = re.sub(r'\s*```$', '', json_text)
-        
-        # Eksik kapanan tırnak işaretlerini düzelt
-        lines = json_text.split('\n')
-        fixed_lines = []
-        
-        for i, line in enumerate(lines):
-            # Satırda açık tırnak işareti varsa ve kapanmamışsa
-            if '"' in line:
-                quote_count = line.count('"')
-                if quote_count % 2 != 0:  # Tek sayıda tırnak işareti varsa
-                    # Satırın sonuna tırnak işareti ekle
-                    if not line.strip().endswith('"'):
-                        line = line.rstrip() + '"'
-                    # Eğer satır virgülle bitmiyorsa ve sonraki satır yoksa virgül ekle
-                    if not line.strip().endswith(',') and not line.strip().endswith(']') and not line.strip().endswith('}'):
-                        line = line.rstrip() + ','
-            
-            fixed_lines.append(line)
-        
-        # Eksik kapanan parantezleri düzelt
-        fixed_text = '\n'.join(fixed_lines)
-        
-        # Eğer JSON hala tamamlanmamışsa, basit bir yapı oluştur
-        if not fixed_text.strip().endswith('}'):
-            # Son soruyu tamamla
-            if not fixed_text.strip().endswith(']'):
-                fixed_text = fixed_text.rstrip().rstrip(',') + ']'
-            if not fixed_text.strip().endswith('}'):
-                fixed_text = fixed_text.rstrip().rstrip(',') + '}'
-        
-        # Son bir deneme daha
-        try:
-            json.loads(fixed_text)
-            return fixed_text
-        except json.JSONDecodeError:
-            # Hala hata varsa, basit bir JSON yapısı oluştur
-            return '{"questions": []}'
-        
-    except Exception as e:
-        print(f"JSON temizleme hatası: {e}")
-        return '{"questions": []}'
-
-def extract_questions_from_text(text, topic, max_questions=15):
-    """AI yanıtından soruları manuel olarak çıkarır"""
-    try:
-        questions = []
-        lines = text.split('\n')
-        
-        current_question = None
-        current_options = []
-        option_count = 0
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Soru satırını bul
-            if '"question"' in line or 'question' in line.lower():
-                # Önceki soruyu kaydet
-                if current_question and len(current_options) == 4:
-                    questions.append({
-                        "question": current_question,
-                        "options": current_options,
-                        "correct_option": "A"  # Varsayılan
-                    })
-                
-                # Yeni soru başlat
-                current_question = extract_quoted_text(line)
-                current_options = []
-                option_count = 0
-                
-            # Seçenek satırını bul
-            elif '"options"' in line or 'options' in line.lower():
+def remove_trailing_commas(text):
+    """'} ' veya ']' öncesindeki fazla virgülleri sil; metin (string) içindekilere dokunma"""
+    result = []
+    in_string = False
+    escaped = False
+    pending_comma = None
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            result.append(char)
+            continue
+        if pending_comma is not None:
+            if char.isspace():
+                pending_comma.append(char)
                 continue
-            elif line.startswith('"') and ('"' in line[1:]) and option_count < 4:
-                option_text = extract_quoted_text(line)
-                if option_text:
-                    current_options.append(option_text)
-                    option_count += 1
-        
-        # Son soruyu ekle
-        if current_question and len(current_options) == 4:
-            questions.append({
-                "question": current_question,
-                "options": current_options,
-                "correct_option": "A"  # Varsayılan
-            })
-        
-        # Soru sayısını sınırla
-        if len(questions) > max_questions:
-            questions = questions[:max_questions]
-        
-        return questions
-        
-    except Exception as e:
-        print(f"Soru çıkarma hatası: {e}")
-        return []
+            if char not in '}]':
+                result.extend(pending_comma)
+            else:
+                # Virgül atılır, aradaki boşluklar korunur
+                result.extend(pending_comma[1:])
+            pending_comma = None
+        if char == ',':
+            pending_comma = [char]
+            continue
+        if char == '"':
+            in_string = True
+        result.append(char)
+    if pending_comma is not None:
+        result.extend(pending_comma)
+    return ''.join(result)
 
-def extract_quoted_text(line):
-    """Satırdan tırnak işaretleri arasındaki metni çıkarır"""
-    try:
-        # İlk tırnak işaretini bul
-        start = line.find('"')
-        if start == -1:
+class StreamingJSONObjectParser:
+    """LLM çıktısını parça parça okuyup kapanan her JSON nesnesini hemen döndüren toleranslı ayrıştırıcı
+    
+    Tırnak/kaçış durumu ve açık süslü parantezler takip edilir, her karakter bir kez taranır.
+    Sadece iç içe nesne içermeyen (yaprak) nesneler çözülür; kesik kalan son nesne hiç
+    döndürülmez ve önceki nesneleri bozmaz. Kod bloğu işaretleri ve nesne dışı metin yok sayılır.
+    Tamponda sadece henüz kapanmamış yaprak nesnenin metni tutulur; akış uzadıkça maliyet doğrusal kalır.
+    """
+    
+    def __init__(self, required_keys=()):
+        self.required_keys = tuple(required_keys)
+        self.buffer = ''
+        self.position = 0
+        self.in_string = False
+        self.escaped = False
+        # Açık nesneler: [başlangıç konumu, iç nesne içeriyor mu]
+        self.open_objects = []
+    
+    def feed(self, chunk):
+        """Yeni metin parçasını işle, bu parçayla tamamlanan nesneleri döndür"""
+        self.buffer += chunk
+        buffer = self.buffer
+        completed = []
+        
+        for index in range(self.position, len(buffer)):
+            char = buffer[index]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                # Nesne dışındaki tırnaklar (açıklama metni) dikkate alınmaz
+                self.in_string = bool(self.open_objects)
+            elif char == '{':
+                if self.open_objects:
+                    self.open_objects[-1][1] = True
+                self.open_objects.append([index, False])
+            elif char == '}' and self.open_objects:
+                object_start, has_children = self.open_objects.pop()
+                if not has_children:
+                    decoded = self.decode(buffer[object_start:index + 1])
+                    if decoded is not None:
+                        completed.append(decoded)
+        
+        # İç nesne içeren (dış) nesneler hiç çözülmez; sadece açık yaprak nesnenin metni gerekir
+        if self.open_objects and not self.open_objects[-1][1]:
+            keep_from = self.open_objects[-1][0]
+        else:
+            keep_from = len(buffer)
+        self.buffer = buffer[keep_from:]
+        self.position = len(self.buffer)
+        for open_object in self.open_objects:
+            open_object[0] -= keep_from
+        return completed
+    
+    def decode(self, text):
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            # LLM'lerin sık yaptığı sondaki virgül hatasını bir kez düzeltmeyi dene
+            try:
+                value = json.loads(remove_trailing_commas(text))
+            except json.JSONDecodeError:
+                return None
+        if not isinstance(value, dict):
             return None
-        
-        # İkinci tırnak işaretini bul
-        end = line.find('"', start + 1)
-        if end == -1:
+        if any(key not in value for key in self.required_keys):
             return None
-        
-        return line[start + 1:end]
-    except:
-        return None
+        return value
 
-# Turnuva API'leri
-def generate_questions_with_gemini(topic, question_count=15):
-    """Gemini API ile soru üret"""
-    try:
-        # Gemini API anahtarını kontrol et
-        if GEMINI_API_KEY == "your_gemini_api_key_here":
-            print("UYARI: Gemini API anahtarı ayarlanmamış. Lütfen GEMINI_API_KEY environment variable'ını ayarlayın.")
-            # Demo yerine basit hata mesajı döndür
-            return [{
-                "question": f"Gemini API anahtarı ayarlanmamış. {topic} için sorular üretilemedi.",
-                "options": ["API anahtarı gerekli", "Lütfen ayarlayın", "Environment variable", "GEMINI_API_KEY"],
-                "correct_option": "A"
-            }]
-        
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-{topic} konusu için {question_count} adet çoktan seçmeli soru üret.
+def iter_json_objects(chunks, required_keys=()):
+    """Metin parçalarından tamamlanan JSON nesnelerini geldikçe üret"""
+    parser = StreamingJSONObjectParser(required_keys)
+    for chunk in chunks:
+        for decoded in parser.feed(chunk):
+            yield decoded
+
+# Soru üretimi için değiştirilebilir LLM arka ucu
+# Arka uç imzası: backend(prompt, topic, question_count) -> yanıt metni parçaları (veya tek metin)
+# QUESTION_LLM_BACKEND=fake ile ağ çağrısı yapmayan sahte arka uç kullanılır (test/geliştirme)
+QUESTION_LLM_BACKEND = os.getenv("QUESTION_LLM_BACKEND", "gemini")
+QUESTION_MODEL_NAME = 'gemini-2.5-flash'
+FAKE_LLM_DELAY_SECONDS = float(os.getenv("FAKE_LLM_DELAY_SECONDS", "0"))
+
+def gemini_question_backend(prompt, topic, question_count):
+    """Gemini modeline istemi gönder ve yanıtı geldikçe parça parça döndür"""
+    model = get_genai().GenerativeModel(QUESTION_MODEL_NAME)
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            yield chunk.text
+        except ValueError:
+            # Metin içermeyen parça (ör. güvenlik filtresi)
+            continue
+
+def fake_question_backend(prompt, topic, question_count):
+    """Konu, sayı ve isteme göre deterministik sorular döndüren sahte LLM"""
+    if FAKE_LLM_DELAY_SECONDS > 0:
+        time.sleep(FAKE_LLM_DELAY_SECONDS)
+    prompt_key = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:6]
+    questions = [{
+        "question": f"{topic} ile ilgili örnek soru {prompt_key}-{index + 1}?",
+        "options": [f"Seçenek {letter}{index + 1}" for letter in "ABCD"],
+        "correct_option": "ABCD"[index % 4]
+    } for index in range(question_count)]
+    text = json.dumps({"questions": questions}, ensure_ascii=False)
+    return [text[offset:offset + 64] for offset in range(0, len(text), 64)]
+
+question_llm_backends = {
+    'gemini': gemini_question_backend,
+    'fake': fake_question_backend,
+}
+
+def register_question_backend(name, backend):
+    """Yeni bir soru üretim arka ucu kaydet (ör. testlerde özel sahte yanıtlar için)"""
+    question_llm_backends[name] = backend
+
+def get_question_backend():
+    if QUESTION_LLM_BACKEND not in question_llm_backends:
+        raise ValueError(f"Bilinmeyen LLM arka ucu: {QUESTION_LLM_BACKEND}")
+    return question_llm_backends[QUESTION_LLM_BACKEND]
+
+# Kalıcı LLM yanıt önbelleği: (model, istem şablonu versiyonu, normalize konu, sayı/seviye) anahtarıyla
+# İstem şablonu değişince versiyonu artırın; eski kayıtlar kendiliğinden kullanılmaz hale gelir
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+# Boyut sınırı her yazımda değil, bu kadar yazımda bir uygulanır (silme sorgusu indeksi baştan sona dolaşır)
+LLM_CACHE_EVICT_EVERY = 50
+QUESTION_PROMPT_VERSION = 2
+PROJECT_PROMPT_VERSION = 1
+llm_cache_metrics = {'hits': 0, 'misses': 0, 'stores': 0, 'bypassed': 0}
+llm_cache_metrics_lock = threading.Lock()
+
+def count_llm_cache(metric):
+    with llm_cache_metrics_lock:
+        llm_cache_metrics[metric] += 1
+
+def normalize_cache_text(text):
+    """Büyük/küçük harf ve boşluk farklarını önbellek anahtarı için eşitle"""
+    return re.sub(r'\s+', ' ', str(text)).strip().casefold()
+
+def llm_cache_key(kind, model, prompt_version, subject, variant):
+    """İçerik adresli önbellek anahtarı"""
+    key_source = json.dumps(
+        [kind, model, prompt_version, normalize_cache_text(subject), normalize_cache_text(variant)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+def llm_cache_get(cache_key):
+    """Önbellekteki yanıtı getir (yoksa veya süresi dolmuşsa None)"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute(
+        'SELECT response FROM llm_cache WHERE cache_key = ? AND created_at >= ?',
+        (cache_key, utc_timestamp(-LLM_CACHE_TTL_SECONDS))
+    )
+    row = cursor.fetchone()
+    if row:
+        # LRU için son kullanım zamanını güncelle
+        cursor.execute('UPDATE llm_cache SET last_used_at = ? WHERE cache_key = ?', (utc_timestamp(), cache_key))
+        conn.commit()
+    conn.close()
+    
+    count_llm_cache('hits' if row else 'misses')
+    return json.loads(row[0]) if row else None
+
+def llm_cache_put(cache_key, kind, value):
+    """Yanıtı önbelleğe yaz; belirli aralıklarla boyut sınırını aşan en eski kayıtları sil"""
+    now = utc_timestamp()
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO llm_cache (cache_key, kind, response, created_at, last_used_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (cache_key) DO UPDATE SET
+            response = excluded.response,
+            created_at = excluded.created_at,
+            last_used_at = excluded.last_used_at
+    ''', (cache_key, kind, json.dumps(value, ensure_ascii=False), now, now))
+    conn.commit()
+    
+    count_llm_cache('stores')
+    if llm_cache_metrics['stores'] % LLM_CACHE_EVICT_EVERY == 1:
+        evict_llm_cache(cursor)
+        conn.commit()
+    conn.close()
+
+def evict_llm_cache(cursor):
+    """En son kullanılan LLM_CACHE_MAX_ENTRIES kaydı tut, gerisini sil"""
+    cursor.execute('''
+        DELETE FROM llm_cache WHERE cache_key IN (
+            SELECT cache_key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+        )
+    ''', (LLM_CACHE_MAX_ENTRIES,))
 
+def question_cache_key(topic, question_count, difficulty='medium'):
+    return llm_cache_key('questions', f"{QUESTION_LLM_BACKEND}:{QUESTION_MODEL_NAME}",
+                         QUESTION_PROMPT_VERSION, topic, f"{question_count}:{difficulty}")
+
+# Büyük soru sayıları parçalara bölünüp eşzamanlı üretilir; tek istemde çok soru istemek kesik JSON'a yol açar
+QUESTION_BATCH_SIZE = int(os.getenv("QUESTION_BATCH_SIZE", "5"))
+QUESTION_BATCH_CONCURRENCY = int(os.getenv("QUESTION_BATCH_CONCURRENCY", "20"))
+QUESTION_BATCH_RETRIES = 2
+question_batch_executor = None
+question_batch_executor_pid = None
+question_batch_lock = threading.Lock()
+
+def get_question_batch_executor():
+    """Parça üretim havuzunu süreç başına ilk kullanımda oluştur"""
+    global question_batch_executor, question_batch_executor_pid
+    if question_batch_executor_pid != os.getpid():
+        with question_batch_lock:
+            if question_batch_executor_pid != os.getpid():
+                question_batch_executor = ThreadPoolExecutor(
+                    max_workers=QUESTION_BATCH_CONCURRENCY, thread_name_prefix='question-batch')
+                question_batch_executor_pid = os.getpid()
+    return question_batch_executor
+
+QUESTION_DIFFICULTY_LABELS = {'easy': 'kolay', 'medium': 'orta', 'hard': 'zor'}
+
+def build_question_prompt(topic, question_count, batch_index=0, batch_total=1, difficulty='medium'):
+    """Soru üretim istemini oluştur"""
+    difficulty_label = QUESTION_DIFFICULTY_LABELS.get(difficulty, 'orta')
+    batch_note = ''
+    if batch_total > 1:
+        batch_note = (f"\nBu istek {batch_total} parçalık bir soru setinin {batch_index + 1}. parçasıdır; "
+                      f"diğer parçalarla çakışmaması için konunun farklı alt başlıklarına odaklan.\n")
+    return f"""
+{topic} konusu için {question_count} adet çoktan seçmeli soru üret.
+{batch_note}
 KURALLAR:
 - Sorular Türkçe olmalı ve tamamen "{topic}" konusu ile ilgili olmalı
 - Her soru için 4 şık olmalı (A, B, C, D) ve sadece bir doğru cevap olmalı
-- Soruların zorluk seviyesi orta düzeyde olsun
+- Soruların zorluk seviyesi {difficulty_label} düzeyde olsun
 - Her soru net, anlaşılır ve tek doğru cevabı olsun
 - correct_option değeri A, B, C veya D olmalı
 
@@ -1398,83 +2911,287 @@ YANIT FORMATI - SADECE JSON:
 - JSON formatının tam ve geçerli olduğundan emin ol
 - Her soru için tam 4 seçenek olmalı
 """
-        
-        response = model.generate_content(prompt)
-        
-        # JSON parse et
-        import json
-        import re
-        
-        try:
-            response_text = response.text.strip()
-            
-            # Markdown kod bloğu varsa temizle
-            if response_text.startswith('```json'):
-                # ```json ile başlayıp ``` ile bitenleri bul
-                json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1).strip()
-                else:
-                    # ```json varsa ama ``` yoksa, ```json'dan sonrasını al
-                    response_text = response_text[7:].strip()  # ```json kısmını çıkar
-            elif response_text.startswith('```'):
-                # Sadece ``` ile başlıyorsa
-                json_match = re.search(r'```\s*(.*?)\s*```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1).strip()
-                else:
-                    response_text = response_text[3:].strip()  # ``` kısmını çıkar
-            
-            # JSON'u temizle ve tamamla
-            response_text = clean_and_fix_json(response_text)
-            
-            # JSON parse et
-            result = json.loads(response_text)
-            questions = result.get("questions", [])
-            
-            # Soru sayısını kontrol et ve gerekirse kırp veya tamamla
-            if len(questions) > question_count:
-                questions = questions[:question_count]
-            elif len(questions) < question_count:
-                print(f"Uyarı: İstenen {question_count} soru yerine {len(questions)} soru üretildi")
-            
-            return questions
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON parse hatası: {e}")
-            print(f"Temizlenmiş AI yanıtı: {response_text[:500]}...")
-            print(f"Orijinal AI yanıtı: {response.text[:500]}...")
-            
-            # Son bir deneme: Manuel JSON oluştur
+
+def is_valid_question(question):
+    """Soru, 4 seçenek ve geçerli doğru cevap içeriyor mu"""
+    return (
+        isinstance(question, dict)
+        and isinstance(question.get('question'), str) and question['question'].strip() != ''
+        and isinstance(question.get('options'), list) and len(question['options']) == 4
+        and question.get('correct_option') in ('A', 'B', 'C', 'D')
+    )
+
+def question_fingerprint(question):
+    """Tekrar tespiti için normalize edilmiş soru metninin özeti"""
+    text = re.sub(r'[^\w\s]', '', question['question'].lower())
+    text = re.sub(r'\s+', ' ', text).strip()
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def generate_question_batch(topic, question_count, batch_index=0, batch_total=1, difficulty='medium'):
+    """Tek bir parça soru üret; geçerli soru çıkmazsa hata fırlat"""
+    prompt = build_question_prompt(topic, question_count, batch_index, batch_total, difficulty)
+    chunks = get_question_backend()(prompt, topic, question_count)
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    
+    # Sorular yanıt akarken tek tek alınır; yeterli soru gelince akışın kalanı okunmaz
+    questions = []
+    for question in iter_json_objects(chunks, ('question', 'options', 'correct_option')):
+        if is_valid_question(question):
+            questions.append(question)
+            if len(questions) >= question_count:
+                break
+    
+    if not questions:
+        raise ValueError('Yanıttan geçerli soru çıkarılamadı')
+    return questions
+
+def generate_question_set(topic, question_count, on_progress=None, use_cache=True, difficulty='medium'):
+    """Soruları eşzamanlı parçalar halinde üret; hiç soru üretilemezse hata fırlat
+    
+    use_cache=False önbelleği atlar ve taze sorular üretir (sonuç yine önbelleğe yazılır).
+    """
+    # Gemini API anahtarını kontrol et
+    if QUESTION_LLM_BACKEND == 'gemini' and GEMINI_API_KEY == "your_gemini_api_key_here":
+        raise ValueError('Gemini API anahtarı ayarlanmamış')
+    
+    cache_key = question_cache_key(topic, question_count, difficulty)
+    if LLM_CACHE_ENABLED and use_cache:
+        cached_questions = llm_cache_get(cache_key)
+        if cached_questions:
+            if on_progress:
+                on_progress(len(cached_questions))
+            return cached_questions
+    elif LLM_CACHE_ENABLED:
+        count_llm_cache('bypassed')
+    
+    batch_sizes = [min(QUESTION_BATCH_SIZE, question_count - offset)
+                   for offset in range(0, question_count, QUESTION_BATCH_SIZE)]
+    batch_results = [None] * len(batch_sizes)
+    pending = list(range(len(batch_sizes)))
+    last_error = None
+    executor = get_question_batch_executor()
+    
+    # Tüm parçalar aynı anda gönderilir; sadece başarısız olanlar tekrar denenir
+    for attempt in range(QUESTION_BATCH_RETRIES + 1):
+        futures = {
+            executor.submit(generate_question_batch, topic, batch_sizes[index], index, len(batch_sizes), difficulty): index
+            for index in pending
+        }
+        failed = []
+        for future in as_completed(futures):
+            index = futures[future]
             try:
-                # AI yanıtından soruları çıkarmaya çalış
-                questions = extract_questions_from_text(response.text, topic, question_count)
-                if questions:
-                    print(f"Manuel çıkarma başarılı: {len(questions)} soru bulundu")
-                    return questions
-            except Exception as extract_error:
-                print(f"Manuel çıkarma hatası: {extract_error}")
-            
-            # JSON parse edilemezse basit bir soru döndür
-            return [{
-                "question": f"{topic} konusunda JSON parse hatası oluştu. Lütfen tekrar deneyin.",
-                "options": ["API yanıtı hatalı", "JSON formatı bozuk", "Tekrar deneyin", "Sistem hatası"],
-                "correct_option": "C"
-            }]
-            
-    except Exception as e:
-        print(f"Gemini API hatası: {e}")
+                batch_results[index] = future.result()
+                if on_progress:
+                    on_progress(sum(len(batch) for batch in batch_results if batch))
+            except Exception as e:
+                print(f"Soru parçası {index + 1}/{len(batch_sizes)} başarısız (deneme {attempt + 1}): {e}")
+                last_error = e
+                failed.append(index)
+        pending = failed
+        if not pending:
+            break
+    
+    # Parçaları sırayla birleştir, normalize edilmiş metne göre tekrarları çıkar
+    questions = []
+    seen = set()
+    for batch in batch_results:
+        for question in batch or []:
+            fingerprint = question_fingerprint(question)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                questions.append(question)
+    
+    if not questions:
+        raise last_error or ValueError('Soru üretilemedi')
+    
+    if len(questions) < question_count:
+        print(f"Uyarı: İstenen {question_count} soru yerine {len(questions)} soru üretildi")
+    elif LLM_CACHE_ENABLED:
+        # Sadece eksiksiz sonuçlar önbelleğe alınır
+        llm_cache_put(cache_key, 'questions', questions[:question_count])
+    
+    return questions[:question_count]
+
+def question_generation_error(topic, error):
+    """Soru üretilemediğinde kullanıcıya gösterilecek bilgilendirme sorusu"""
+    if QUESTION_LLM_BACKEND == 'gemini' and GEMINI_API_KEY == "your_gemini_api_key_here":
+        print("UYARI: Gemini API anahtarı ayarlanmamış. Lütfen GEMINI_API_KEY environment variable'ını ayarlayın.")
+        # Demo yerine basit hata mesajı döndür
         return [{
-            "question": f"{topic} için soru üretilirken hata oluştu: {str(e)}",
-            "options": ["API hatası", "Bağlantı sorunu", "Tekrar deneyin", "Sistem hatası"],
-            "correct_option": "C"
+            "question": f"Gemini API anahtarı ayarlanmamış. {topic} için sorular üretilemedi.",
+            "options": ["API anahtarı gerekli", "Lütfen ayarlayın", "Environment variable", "GEMINI_API_KEY"],
+            "correct_option": "A"
         }]
+    
+    print(f"Gemini API hatası: {error}")
+    return [{
+        "question": f"{topic} için soru üretilirken hata oluştu: {str(error)}",
+        "options": ["API hatası", "Bağlantı sorunu", "Tekrar deneyin", "Sistem hatası"],
+        "correct_option": "C"
+    }]
+
+# Turnuva API'leri
+def generate_questions_with_gemini(topic, question_count=15, on_progress=None, use_cache=True, difficulty='medium'):
+    """Gemini API ile soru üret; hata durumunda bilgilendirme sorusu döndür"""
+    try:
+        return generate_question_set(topic, question_count, on_progress, use_cache, difficulty)
+    except Exception as e:
+        return question_generation_error(topic, e)
+
+# Soru üretim işleri: uzun LLM çağrıları WSGI worker'larını değil, sınırlı bir iş havuzunu meşgul eder
+# İş durumu question_jobs tablosunda tutulur; böylece durum/sonuç istekleri herhangi bir worker'a düşebilir
+QUESTION_JOB_WORKERS = int(os.getenv("QUESTION_JOB_WORKERS", "2"))
+# İstekle gelen soru sayısı bu aralığa sıkıştırılır
+QUESTION_COUNT_MIN = 1
+QUESTION_COUNT_MAX = int(os.getenv("QUESTION_COUNT_MAX", "50"))
+QUESTION_JOB_QUEUE_LIMIT = int(os.getenv("QUESTION_JOB_QUEUE_LIMIT", "20"))
+QUESTION_JOB_TIMEOUT_SECONDS = 600
+QUESTION_JOB_RETENTION_HOURS = 24
+
+def parse_question_count(value):
+    """İstekteki soru sayısını tam sayıya çevir, QUESTION_COUNT_MAX ile sınırla; geçersizse None"""
+    if isinstance(value, bool):
+        return None
+    try:
+        return min(int(value), QUESTION_COUNT_MAX)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+question_job_executor = None
+question_job_executor_pid = None
+question_job_pending = 0
+question_job_lock = threading.Lock()
+
+def get_question_job_executor():
+    """İş havuzunu süreç başına ilk kullanımda oluştur"""
+    global question_job_executor, question_job_executor_pid, question_job_pending
+    if question_job_executor_pid != os.getpid():
+        with question_job_lock:
+            if question_job_executor_pid != os.getpid():
+                question_job_executor = ThreadPoolExecutor(
+                    max_workers=QUESTION_JOB_WORKERS, thread_name_prefix='question-job')
+                question_job_executor_pid = os.getpid()
+                question_job_pending = 0
+    return question_job_executor
+
+def utc_timestamp(offset_seconds=0):
+    """CURRENT_TIMESTAMP biçiminde UTC zaman damgası"""
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+
+def expire_question_jobs(cursor):
+    """Süresi aşılan işleri başarısız say, eski işleri temizle"""
+    cursor.execute('''
+        UPDATE question_jobs
+        SET status = 'failed', error = 'İş zaman aşımına uğradı', finished_at = ?
+        WHERE status IN ('queued', 'running') AND created_at < ?
+    ''', (utc_timestamp(), utc_timestamp(-QUESTION_JOB_TIMEOUT_SECONDS)))
+    cursor.execute('''
+        DELETE FROM question_jobs
+        WHERE status IN ('done', 'failed') AND created_at < ?
+    ''', (utc_timestamp(-QUESTION_JOB_RETENTION_HOURS * 3600),))
+
+def update_question_job(job_id, **fields):
+    conn = get_db()
+    cursor = conn.cursor()
+    assignments = ', '.join(f"{name} = ?" for name in fields)
+    cursor.execute(f'UPDATE question_jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+    conn.commit()
+    conn.close()
+
+def run_question_job(job_id, topic, question_count, use_cache=True):
+    """İş havuzunda çalışır: soruları üretip sonucu işe yazar"""
+    global question_job_pending
+    try:
+        update_question_job(job_id, status='running', started_at=utc_timestamp())
+        # Hata bilgilendirme sorusuna çevrilmez; iş 'failed' olur ve hata istemciye iletilir
+        questions = generate_question_set(
+            topic, question_count,
+            on_progress=lambda generated: update_question_job(job_id, generated_count=generated),
+            use_cache=use_cache
+        )
+        update_question_job(
+            job_id,
+            status='done',
+            generated_count=len(questions),
+            questions=json.dumps(questions, ensure_ascii=False),
+            finished_at=utc_timestamp()
+        )
+    except Exception as e:
+        print(f"Soru üretim işi hatası ({job_id}): {e}")
+        try:
+            update_question_job(job_id, status='failed', error=str(e), finished_at=utc_timestamp())
+        except Exception as update_error:
+            print(f"Soru üretim işi güncellenemedi ({job_id}): {update_error}")
+    finally:
+        with question_job_lock:
+            question_job_pending -= 1
 
+def submit_question_job(user_id, topic, question_count, use_cache=True):
+    """Yeni iş oluştur ve havuza gönder; kuyruk doluysa None döndür"""
+    global question_job_pending
+    executor = get_question_job_executor()
+    with question_job_lock:
+        if question_job_pending >= QUESTION_JOB_QUEUE_LIMIT:
+            return None
+        question_job_pending += 1
+    
+    job_id = uuid.uuid4().hex
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        expire_question_jobs(cursor)
+        cursor.execute('''
+            INSERT INTO question_jobs (id, user_id, topic, question_count, status, created_at)
+            VALUES (?, ?, ?, ?, 'queued', ?)
+        ''', (job_id, user_id, topic, question_count, utc_timestamp()))
+        conn.commit()
+        conn.close()
+        executor.submit(run_question_job, job_id, topic, question_count, use_cache)
+    except Exception:
+        with question_job_lock:
+            question_job_pending -= 1
+        raise
+    return job_id
 
+def get_question_job(job_id, user_id):
+    """Kullanıcıya ait işi getir (yoksa None)"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, topic, question_count, status, generated_count, questions, error,
+               created_at, started_at, finished_at
+        FROM question_jobs
+        WHERE id = ? AND user_id = ?
+    ''', (job_id, user_id))
+    row = cursor.fetchone()
+    conn.close()
+    
+    if not row:
+        return None
+    
+    status, error = row[3], row[6]
+    if status in ('queued', 'running') and row[7] < utc_timestamp(-QUESTION_JOB_TIMEOUT_SECONDS):
+        # İşi çalıştıran süreç yeniden başlamış olabilir
+        status, error = 'failed', 'İş zaman aşımına uğradı'
+    
+    return {
+        'job_id': row[0],
+        'topic': row[1],
+        'question_count': row[2],
+        'status': status,
+        'generated_count': row[4],
+        'questions': json.loads(row[5]) if row[5] else None,
+        'error': error,
+        'created_at': row[7],
+        'started_at': row[8],
+        'finished_at': row[9]
+    }
 
 @app.route('/api/generate-questions', methods=['POST'])
 def generate_questions():
-    """AI ile soru üret"""
+    """AI ile soru üretim işi başlat (202 + job_id döner)"""
     try:
         # Token kontrolü
         auth_header = request.headers.get('Authorization')
@@ -1493,20 +3210,238 @@ def generate_questions():
         data = request.get_json()
         
         # Veri doğrulama
-        if not data.get('content'):
+        if not data or not data.get('content'):
             return jsonify({'error': 'Turnuva içeriği gereklidir'}), 400
         
-        # Soruları üret
-        questions = generate_questions_with_gemini(data['content'], data.get('question_count', 15))
+        question_count = parse_question_count(data.get('question_count', 15))
+        if question_count is None:
+            return jsonify({'error': 'question_count bir tam sayı olmalıdır'}), 400
+        question_count = max(QUESTION_COUNT_MIN, question_count)
+        
+        # Soruları arka planda üret
+        # fresh=true ile önbellek atlanır ve yeni sorular üretilir
+        job_id = submit_question_job(
+            payload['user_id'], data['content'], question_count,
+            use_cache=not data.get('fresh', False)
+        )
+        if job_id is None:
+            return jsonify({'error': 'Soru üretim kuyruğu dolu, lütfen biraz sonra tekrar deneyin'}), 429
         
         return jsonify({
             'success': True,
-            'questions': questions
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/generate-questions/{job_id}',
+            'result_url': f'/api/generate-questions/{job_id}/result'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+@app.route('/api/generate-questions/<job_id>', methods=['GET'])
+def get_generate_questions_status(job_id):
+    """Soru üretim işinin durumunu getir"""
+    try:
+        # Token kontrolü
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Token gereklidir'}), 401
+        
+        token = auth_header.split(' ')[1]
+        
+        try:
+            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token süresi dolmuş'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'error': 'Geçersiz token'}), 401
+        
+        job = get_question_job(job_id, payload['user_id'])
+        if not job:
+            return jsonify({'error': 'İş bulunamadı'}), 404
+        
+        job.pop('questions')
+        return jsonify({'success': True, **job}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+@app.route('/api/generate-questions/<job_id>/result', methods=['GET'])
+def get_generate_questions_result(job_id):
+    """Tamamlanan soru üretim işinin sorularını getir"""
+    try:
+        # Token kontrolü
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Token gereklidir'}), 401
+        
+        token = auth_header.split(' ')[1]
+        
+        try:
+            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token süresi dolmuş'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'error': 'Geçersiz token'}), 401
+        
+        job = get_question_job(job_id, payload['user_id'])
+        if not job:
+            return jsonify({'error': 'İş bulunamadı'}), 404
+        
+        if job['status'] == 'failed':
+            return jsonify({'error': f"Soru üretimi başarısız: {job['error']}", 'status': 'failed'}), 500
+        
+        if job['status'] != 'done':
+            return jsonify({'success': False, 'job_id': job_id, 'status': job['status']}), 202
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'done',
+            'questions': job['questions']
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
+# Alıştırma testleri için soru bankası: sorular arka planda üretilip saklanır,
+# her kullanıcıya aynı soru bir kez sunulur; banka yetersizse canlı üretime düşülür
+QUESTION_BANK_FILL_SIZE = int(os.getenv("QUESTION_BANK_FILL_SIZE", "20"))
+QUESTION_BANK_MAX_PER_TOPIC = int(os.getenv("QUESTION_BANK_MAX_PER_TOPIC", "500"))
+QUESTION_BANK_LOW_WATERMARK = 10
+# Arka plan doldurması sadece bu listedeki (virgülle ayrılmış) veya daha önce sunulmuş konular için yapılır
+QUESTION_BANK_TOPICS = {normalize_cache_text(topic) for topic in os.getenv("QUESTION_BANK_TOPICS", "").split(',') if topic.strip()}
+# Doldurmalar soru üretim işleriyle aynı sayacı kullanır; yönetici işlerine yer kalsın diye daha düşük sınırla kabul edilir
+QUESTION_BANK_FILL_MAX_PENDING = int(os.getenv("QUESTION_BANK_FILL_MAX_PENDING", str(max(1, QUESTION_JOB_WORKERS - 1))))
+question_bank_filling = set()
+question_bank_lock = threading.Lock()
+
+def add_to_question_bank(cursor, topic, difficulty, questions):
+    """Soruları bankaya ekle (tekrarlar atlanır), bankadaki id'leriyle döndür"""
+    topic = normalize_cache_text(topic)
+    stored = []
+    for question in questions:
+        if not is_valid_question(question):
+            continue
+        fingerprint = question_fingerprint(question)
+        cursor.execute('''
+            INSERT INTO question_bank (topic, difficulty, fingerprint, question,
+                                       option_a, option_b, option_c, option_d, correct_option)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (topic, difficulty, fingerprint) DO NOTHING
+        ''', (topic, difficulty, fingerprint, question['question'], *question['options'], question['correct_option']))
+        cursor.execute('''
+            SELECT id FROM question_bank WHERE topic = ? AND difficulty = ? AND fingerprint = ?
+        ''', (topic, difficulty, fingerprint))
+        stored.append((cursor.fetchone()[0], question))
+    return stored
+
+def sample_question_bank(cursor, user_id, topic, difficulty, count):
+    """Kullanıcının daha önce görmediği sorulardan rastgele seç
+    
+    Dönen ikinci değer, bu seçimden sonra kullanıcı için kalan görülmemiş soru sayısının
+    (QUESTION_BANK_LOW_WATERMARK ile sınırlı) tahminidir.
+    """
+    cursor.execute('''
+        SELECT qb.id, qb.question, qb.option_a, qb.option_b, qb.option_c, qb.option_d, qb.correct_option
+        FROM question_bank qb
+        WHERE qb.topic = ? AND qb.difficulty = ?
+          AND NOT EXISTS (SELECT 1 FROM question_bank_served s WHERE s.user_id = ? AND s.question_id = qb.id)
+        ORDER BY RANDOM() LIMIT ?
+    ''', (normalize_cache_text(topic), difficulty, user_id, count + QUESTION_BANK_LOW_WATERMARK))
+    rows = cursor.fetchall()
+    
+    questions = [(row[0], {
+        'question': row[1],
+        'options': [row[2], row[3], row[4], row[5]],
+        'correct_option': row[6]
+    }) for row in rows[:count]]
+    return questions, max(0, len(rows) - count)
+
+def mark_questions_served(cursor, user_id, question_ids):
+    cursor.executemany('''
+        INSERT INTO question_bank_served (user_id, question_id) VALUES (?, ?)
+        ON CONFLICT (user_id, question_id) DO NOTHING
+    ''', [(user_id, question_id) for question_id in question_ids])
+
+def count_question_bank(topic, difficulty):
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute(
+        'SELECT COUNT(*) FROM question_bank WHERE topic = ? AND difficulty = ?',
+        (normalize_cache_text(topic), difficulty)
+    )
+    bank_size = cursor.fetchone()[0]
+    conn.close()
+    return bank_size
+
+def fill_question_bank(topic, difficulty, count=None):
+    """Konu için yeni sorular üretip bankaya ekle, eklenen soru sayısını döndür"""
+    try:
+        bank_size = count_question_bank(topic, difficulty)
+        if bank_size >= QUESTION_BANK_MAX_PER_TOPIC:
+            return 0
+        
+        questions = generate_question_set(topic, count or QUESTION_BANK_FILL_SIZE, use_cache=False, difficulty=difficulty)
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        add_to_question_bank(cursor, topic, difficulty, questions)
+        conn.commit()
+        conn.close()
+        added = count_question_bank(topic, difficulty) - bank_size
+        print(f"Soru bankası dolduruldu: {topic} ({difficulty}) +{added}")
+        return added
+    except Exception as e:
+        print(f"Soru bankası doldurma hatası ({topic}): {e}")
+        return 0
+    finally:
+        with question_bank_lock:
+            question_bank_filling.discard((normalize_cache_text(topic), difficulty))
+
+def run_question_bank_fill(topic, difficulty):
+    """İş havuzunda çalışır: bankayı doldurup iş sayacını serbest bırakır"""
+    global question_job_pending
+    try:
+        fill_question_bank(topic, difficulty)
+    finally:
+        with question_job_lock:
+            question_job_pending -= 1
+
+def schedule_question_bank_fill(topic, difficulty, served_before=False):
+    """Konu için arka planda banka doldurmayı başlat; başlatılamazsa False döndür
+    
+    served_before: bu istekten önce bankada konunun sorusu var mıydı. Serbest metin konularla
+    sınırsız LLM işi açılmasın diye sadece izinli veya daha önce sunulmuş konular doldurulur.
+    Aynı konu için tek seferde bir iş çalışır. Kuyrukta QUESTION_BANK_FILL_MAX_PENDING iş varsa
+    doldurma atlanır (bir sonraki düşük stok isteğinde yeniden denenir).
+    """
+    global question_job_pending
+    fill_key = (normalize_cache_text(topic), difficulty)
+    if fill_key[0] not in QUESTION_BANK_TOPICS and not served_before:
+        return False
+    
+    # LLM işleri aynı sınırlı havuzu ve bekleyen iş sayacını paylaşır
+    executor = get_question_job_executor()
+    with question_bank_lock:
+        if fill_key in question_bank_filling:
+            return False
+        with question_job_lock:
+            if question_job_pending >= min(QUESTION_JOB_QUEUE_LIMIT, QUESTION_BANK_FILL_MAX_PENDING):
+                return False
+            question_job_pending += 1
+        question_bank_filling.add(fill_key)
+    
+    try:
+        executor.submit(run_question_bank_fill, topic, difficulty)
+    except Exception:
+        with question_job_lock:
+            question_job_pending -= 1
+        with question_bank_lock:
+            question_bank_filling.discard(fill_key)
+        raise
+    return True
+
 @app.route('/api/generate-test-questions', methods=['POST'])
 def generate_test_questions():
     """Test için soru üret"""
@@ -1533,10 +3468,58 @@ def generate_test_questions():
         
         topic = data['topic']
         difficulty = data.get('difficulty', 'medium')
-        count = data.get('count', 5)
+        if difficulty not in QUESTION_DIFFICULTY_LABELS:
+            difficulty = 'medium'
+        # Canlı üretim count/5 paralel LLM çağrısına yayılır; sayı sınırlanır
+        count = parse_question_count(data.get('count', 5))
+        if count is None or count < QUESTION_COUNT_MIN:
+            return jsonify({'error': 'count pozitif bir tam sayı olmalıdır'}), 400
+        user_id = payload['user_id']
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Önce bankadan kullanıcının görmediği soruları seç
+        source = 'bank'
+        generation_error = None
+        sampled, remaining = sample_question_bank(cursor, user_id, topic, difficulty, count)
+        
+        served_before = bool(sampled)
+        if len(sampled) < count:
+            # Banka yetersiz: sadece eksik kalan kadarını canlı üret, bankaya ekle
+            source = 'live'
+            conn.close()
+            served_before = served_before or count_question_bank(topic, difficulty) > 0
+            try:
+                generated = generate_question_set(topic, count - len(sampled), use_cache=False, difficulty=difficulty)
+            except Exception as e:
+                print(f"Test soruları üretilemedi ({topic}): {e}")
+                generated = None
+                generation_error = e
+            
+            conn = get_db()
+            cursor = conn.cursor()
+            if generated:
+                sampled_ids = {question_id for question_id, _ in sampled}
+                for question_id, question in add_to_question_bank(cursor, topic, difficulty, generated):
+                    if question_id not in sampled_ids:
+                        sampled.append((question_id, question))
+                        sampled_ids.add(question_id)
+            if sampled or generation_error is None:
+                questions = [question for _, question in sampled]
+            else:
+                questions = question_generation_error(topic, generation_error)
+            remaining = 0
+        else:
+            questions = [question for _, question in sampled]
+        
+        mark_questions_served(cursor, user_id, [question_id for question_id, _ in sampled])
+        conn.commit()
+        conn.close()
         
-        # Gemini ile test soruları üret
-        questions = generate_questions_with_gemini(topic, count)
+        # Üretim az önce başarısız olduysa aynı konu için hemen yeni LLM işi açma
+        if remaining < QUESTION_BANK_LOW_WATERMARK and generation_error is None:
+            schedule_question_bank_fill(topic, difficulty, served_before)
         
         # Soruları test formatına dönüştür
         test_questions = []
@@ -1552,7 +3535,8 @@ def generate_test_questions():
             'questions': test_questions,
             'topic': topic,
             'difficulty': difficulty,
-            'count': len(test_questions)
+            'count': len(test_questions),
+            'source': source
         }), 200
         
     except Exception as e:
@@ -1560,6 +3544,283 @@ def generate_test_questions():
 
 
 
+# Süreç içi turnuva önbelleği (LRU): meta veriler, soru listesi ve cevap anahtarı
+# Turnuva kaydedilince, güncellenince veya silinince açıkça geçersiz kılınır. Geçersiz kılma
+# sadece o süreçte olur; diğer worker'lar değişikliği en geç TOURNAMENT_CACHE_MAX_AGE_SECONDS sonra görür
+TOURNAMENT_CACHE_SIZE = int(os.getenv("TOURNAMENT_CACHE_SIZE", "256"))
+TOURNAMENT_CACHE_MAX_AGE_SECONDS = int(os.getenv("TOURNAMENT_CACHE_MAX_AGE_SECONDS", "30"))
+tournament_cache = OrderedDict()
+tournament_cache_lock = threading.Lock()
+tournament_cache_generation = 0
+
+def parse_tournament_time(value):
+    """Turnuva zamanını yerel saatte naive datetime'a çevir, çevrilemezse None döndür"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def load_tournament(tournament_id):
+    """Turnuvayı ve sorularını veritabanından okuyup önbellek kaydı oluştur"""
+    conn = get_db()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT title, content, question_count, duration_minutes, start_time, end_time, status
+        FROM tournaments WHERE id = ?
+    ''', (tournament_id,))
+    tournament = cursor.fetchone()
+    if not tournament:
+        conn.close()
+        return None
+    
+    cursor.execute('''
+        SELECT id, question, option_a, option_b, option_c, option_d, correct_option
+        FROM questions WHERE tournament_id = ?
+        ORDER BY id
+    ''', (tournament_id,))
+    question_rows = cursor.fetchall()
+    conn.close()
+    
+    title, content, question_count, duration_minutes, start_time, end_time, status = tournament
+    return {
+        'id': tournament_id,
+        'title': title,
+        'content': content,
+        'question_count': question_count,
+        'duration_minutes': duration_minutes,
+        'start_time': start_time,
+        'end_time': end_time,
+        'status': status,
+        'start_dt': parse_tournament_time(start_time),
+        'end_dt': parse_tournament_time(end_time),
+        'questions': [{
+            'id': row[0],
+            'question': row[1],
+            'options': [row[2], row[3], row[4], row[5]]
+        } for row in question_rows],
+        'answer_key': {row[0]: row[6] for row in question_rows}
+    }
+
+def build_questions_payload(tournament):
+    """Katılımcılara giden soru yanıtını (correct_option olmadan) bir kez serileştir"""
+    body = json.dumps({
+        'success': True,
+        'tournament': {
+            'id': tournament['id'],
+            'title': tournament['title'],
+            'content': tournament['content'],
+            'start_time': tournament['start_time'],
+            'end_time': tournament['end_time'],
+            'status': tournament['status']
+        },
+        'questions': tournament['questions']
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    return {
+        'body': body,
+        'gzip_body': gzip.compress(body, compresslevel=6, mtime=0),
+        'etag': hashlib.sha256(body).hexdigest()[:32]
+    }
+
+def precomputed_json_response(payload):
+    """Önceden serileştirilmiş JSON'u ETag ve gzip desteğiyle döndür"""
+    if request.if_none_match.contains(payload['etag']):
+        response = app.response_class(status=304)
+    elif request.accept_encodings['gzip']:
+        response = app.response_class(payload['gzip_body'], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(payload['body'], mimetype='application/json')
+    
+    response.set_etag(payload['etag'])
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def get_cached_tournament(tournament_id):
+    """Turnuva kaydını önbellekten getir, yoksa yükle (dönen sözlük değiştirilmemeli)"""
+    with tournament_cache_lock:
+        entry = tournament_cache.get(tournament_id)
+        if entry is not None:
+            if time.monotonic() - entry['loaded_at'] < TOURNAMENT_CACHE_MAX_AGE_SECONDS:
+                tournament_cache.move_to_end(tournament_id)
+                return entry
+            # Süresi dolmuş: başka bir worker turnuvayı güncellemiş olabilir
+            del tournament_cache[tournament_id]
+        generation = tournament_cache_generation
+    
+    loaded_at = time.monotonic()
+    entry = load_tournament(tournament_id)
+    if entry is None:
+        return None
+    entry['questions_payload'] = build_questions_payload(entry)
+    entry['loaded_at'] = loaded_at
+    
+    with tournament_cache_lock:
+        # Yükleme sırasında geçersiz kılma olduysa eski veriyi saklama
+        if generation == tournament_cache_generation:
+            tournament_cache[tournament_id] = entry
+            tournament_cache.move_to_end(tournament_id)
+            while len(tournament_cache) > TOURNAMENT_CACHE_SIZE:
+                tournament_cache.popitem(last=False)
+    return entry
+
+def invalidate_tournament_cache(tournament_id=None):
+    """Turnuva düzenlendiğinde veya silindiğinde önbelleği temizle (None ise tamamı)"""
+    global tournament_cache_generation
+    with tournament_cache_lock:
+        tournament_cache_generation += 1
+        if tournament_id is None:
+            tournament_cache.clear()
+        else:
+            tournament_cache.pop(tournament_id, None)
+    invalidate_weekly_calendar()
+
+# Süreç içi turnuva sıralamaları: complete_tournament ile artımlı güncellenir,
+# ilk erişimde (ve LEADERBOARD_MAX_AGE_SECONDS sonra) SQLite'tan yeniden kurulur.
+# Süre sınırı, birden çok worker çalışırken diğer süreçlerdeki tamamlamaları da yakalar.
+LEADERBOARD_MAX_AGE_SECONDS = int(os.getenv("LEADERBOARD_MAX_AGE_SECONDS", "60"))
+tournament_leaderboards = {}
+tournament_leaderboards_lock = threading.Lock()
+# Yeniden kurulum sürerken gelen tamamlamalar: {turnuva_id: [kurulum başına kayıt listesi]}
+leaderboard_rebuilds = {}
+
+class TournamentLeaderboard:
+    """(-correct_answers, completed_at, user_id) anahtarına göre sıralı turnuva sıralaması"""
+    
+    def __init__(self, tournament_id):
+        self.tournament_id = tournament_id
+        self.keys = []
+        self.entries = {}
+        self.loaded_at = time.time()
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def sort_key(entry):
+        return (-entry['correct_answers'], entry['completed_at'] or '', entry['user_id'])
+    
+    def upsert(self, entry):
+        """Katılımcıyı ekle veya sırasını güncelle
+        
+        Konum O(log n) ile bulunur; listeye ekleme/silme O(n) kaydırmadır (tek bir memmove,
+        turnuva başına binlerce katılımcıda ihmal edilebilir)
+        """
+        with self.lock:
+            previous = self.entries.get(entry['user_id'])
+            if previous is not None:
+                index = bisect.bisect_left(self.keys, self.sort_key(previous))
+                del self.keys[index]
+            self.entries[entry['user_id']] = entry
+            bisect.insort(self.keys, self.sort_key(entry))
+    
+    def top(self, limit):
+        """İlk `limit` katılımcıyı sırasıyla döndür"""
+        with self.lock:
+            return [(rank, self.entries[key[2]]) for rank, key in enumerate(self.keys[:limit], 1)]
+    
+    def rank_of(self, user_id):
+        """Kullanıcının sırasını ve kaydını döndür, tamamlamamışsa None"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            return bisect.bisect_left(self.keys, self.sort_key(entry)) + 1, entry
+    
+    def __len__(self):
+        return len(self.keys)
+
+def load_tournament_leaderboard(tournament_id):
+    """Turnuvayı tamamlayanlardan sıralamayı SQLite'tan yeniden kur"""
+    board = TournamentLeaderboard(tournament_id)
+    
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT tp.user_id, u.first_name, u.last_name, tp.correct_answers,
+               tp.total_questions, tp.total_score, tp.completed_at
+        FROM tournament_participants tp
+        JOIN users u ON tp.user_id = u.id
+        WHERE tp.tournament_id = ? AND tp.completed_at IS NOT NULL
+    ''', (tournament_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    
+    for user_id, first_name, last_name, correct_answers, total_questions, total_score, completed_at in rows:
+        board.upsert({
+            'user_id': user_id,
+            'username': f"{first_name} {last_name}",
+            'correct_answers': correct_answers,
+            'total_questions': total_questions,
+            'total_score': total_score,
+            'completed_at': completed_at
+        })
+    return board
+
+def get_tournament_leaderboard(tournament_id):
+    """Turnuva sıralamasını bellekten getir, yoksa veya eskiyse yeniden kur"""
+    board = tournament_leaderboards.get(tournament_id)
+    if board is not None and time.time() - board.loaded_at < LEADERBOARD_MAX_AGE_SECONDS:
+        return board
+    
+    # Okuma ile değiştirme arasında gelen tamamlamalar kaybolmasın diye kaydedilip yeni sıralamaya işlenir
+    replay = []
+    with tournament_leaderboards_lock:
+        leaderboard_rebuilds.setdefault(tournament_id, []).append(replay)
+    board = None
+    try:
+        board = load_tournament_leaderboard(tournament_id)
+    finally:
+        # Kayıt listesinin kaldırılması ve değiştirme aynı kilit altında yapılır
+        with tournament_leaderboards_lock:
+            rebuilds = leaderboard_rebuilds[tournament_id]
+            rebuilds.remove(replay)
+            if not rebuilds:
+                del leaderboard_rebuilds[tournament_id]
+            if board is not None:
+                for entry in replay:
+                    board.upsert(entry)
+                tournament_leaderboards[tournament_id] = board
+    return board
+
+def record_leaderboard_completion(tournament_id, entry):
+    """Tamamlanan katılımı yüklü sıralamaya işle (yüklü değilse ilk erişimde okunur)"""
+    with tournament_leaderboards_lock:
+        board = tournament_leaderboards.get(tournament_id)
+        for replay in leaderboard_rebuilds.get(tournament_id, ()):
+            replay.append(entry)
+    if board is not None:
+        board.upsert(entry)
+
+def warm_tournament_leaderboards():
+    """Başlangıçta devam eden turnuvaların sıralamalarını SQLite'tan kur"""
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id FROM tournaments WHERE status = 'active' AND end_time >= ?
+        ''', (datetime.now().strftime('%Y-%m-%d'),))
+        tournament_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        
+        for tournament_id in tournament_ids:
+            get_tournament_leaderboard(tournament_id)
+        if tournament_ids:
+            print(f"{len(tournament_ids)} turnuva sıralaması yüklendi")
+    except Exception as e:
+        print(f"Sıralama yükleme hatası: {e}")
+
+def drop_tournament_leaderboard(tournament_id):
+    """Silinen turnuvanın sıralamasını bellekten kaldır"""
+    with tournament_leaderboards_lock:
+        tournament_leaderboards.pop(tournament_id, None)
+
+# Devam eden turnuvaların sıralamalarını başlangıçta hazırla
+warm_tournament_leaderboards()
+
 @app.route('/api/save-tournament', methods=['POST'])
 def save_tournament():
     """Turnuvayı kaydet"""
@@ -1587,7 +3848,7 @@ def save_tournament():
                 return jsonify({'error': f'{field} alanı gereklidir'}), 400
         
         # Veritabanına kaydet
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Turnuvayı kaydet
@@ -1615,6 +3876,7 @@ def save_tournament():
         
         conn.commit()
         conn.close()
+        invalidate_tournament_cache(tournament_id)
         
         return jsonify({
             'success': True,
@@ -1629,7 +3891,7 @@ def save_tournament():
 def get_tournaments():
     """Aktif turnuvaları listele"""
     try:
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Önce status'u NULL olan turnuvaları 'active' yap
@@ -1638,7 +3900,10 @@ def get_tournaments():
             SET status = 'active' 
             WHERE status IS NULL OR status = ''
         ''')
+        normalized_count = cursor.rowcount
         conn.commit()
+        if normalized_count:
+            invalidate_tournament_cache()
         
         cursor.execute('''
             SELECT id, title, content, question_count, duration_minutes, start_time, end_time, status, created_at
@@ -1695,52 +3960,36 @@ def join_tournament():
         if not data.get('tournament_id'):
             return jsonify({'error': 'Turnuva ID gereklidir'}), 400
         
-        # Veritabanına kaydet
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Turnuva zaman kontrolü
-        cursor.execute('''
-            SELECT start_time, end_time, status FROM tournaments WHERE id = ?
-        ''', (data['tournament_id'],))
+        try:
+            tournament_id = int(data['tournament_id'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Geçersiz turnuva ID'}), 400
         
-        tournament = cursor.fetchone()
+        tournament = get_cached_tournament(tournament_id)
         if not tournament:
-            conn.close()
             return jsonify({'error': 'Turnuva bulunamadı'}), 404
         
-        # Zaman kontrolü (daha esnek)
-        try:
-            start_time = datetime.fromisoformat(tournament[0].replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(tournament[1].replace('Z', '+00:00'))
-            current_time = datetime.now()
-            
-            # Turnuva bitmişse katılıma izin verme
-            if current_time > end_time:
-                conn.close()
-                return jsonify({'error': 'Turnuva süresi dolmuş'}), 400
-        except:
-            # Zaman formatı sorunluysa katılıma izin ver
-            pass
-        
-        # Daha önce katılmış mı kontrol et
-        cursor.execute('''
-            SELECT id FROM tournament_participants 
-            WHERE user_id = ? AND tournament_id = ?
-        ''', (payload['user_id'], data['tournament_id']))
+        # Turnuva bitmişse katılıma izin verme (zaman formatı sorunluysa izin ver)
+        if tournament['end_dt'] and datetime.now() > tournament['end_dt']:
+            return jsonify({'error': 'Turnuva süresi dolmuş'}), 400
         
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'error': 'Bu turnuvaya zaten katıldınız'}), 400
+        # Katılımı kaydet - mükerrer katılımı UNIQUE indeks engeller
+        conn = get_db()
+        cursor = conn.cursor()
         
-        # Katılımı kaydet
         cursor.execute('''
             INSERT INTO tournament_participants (user_id, tournament_id, total_questions, correct_answers)
             VALUES (?, ?, 0, 0)
-        ''', (payload['user_id'], data['tournament_id']))
+            ON CONFLICT (user_id, tournament_id) DO NOTHING
+        ''', (payload['user_id'], tournament_id))
+        
+        if cursor.rowcount == 0:
+            conn.close()
+            return jsonify({'error': 'Bu turnuvaya zaten katıldınız'}), 400
         
         conn.commit()
         conn.close()
+        tournament_event_hub.mark_stats_dirty(tournament_id)
         
         return jsonify({
             'success': True,
@@ -1768,50 +4017,12 @@ def get_tournament_questions(tournament_id):
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Turnuva bilgilerini al
-        cursor.execute('''
-            SELECT title, content, start_time, end_time, status
-            FROM tournaments WHERE id = ?
-        ''', (tournament_id,))
-        
-        tournament = cursor.fetchone()
+        tournament = get_cached_tournament(tournament_id)
         if not tournament:
-            conn.close()
             return jsonify({'error': 'Turnuva bulunamadı'}), 404
         
-        # Soruları al
-        cursor.execute('''
-            SELECT id, question, option_a, option_b, option_c, option_d
-            FROM questions WHERE tournament_id = ?
-            ORDER BY id
-        ''', (tournament_id,))
-        
-        questions = cursor.fetchall()
-        conn.close()
-        
-        question_list = []
-        for question in questions:
-            question_list.append({
-                'id': question[0],
-                'question': question[1],
-                'options': [question[2], question[3], question[4], question[5]]
-            })
-        
-        return jsonify({
-            'success': True,
-            'tournament': {
-                'id': tournament_id,
-                'title': tournament[0],
-                'content': tournament[1],
-                'start_time': tournament[2],
-                'end_time': tournament[3],
-                'status': tournament[4]
-            },
-            'questions': question_list
-        }), 200
+        # Aynı turnuvayı açan herkes aynı hazır byte dizisini alır
+        return precomputed_json_response(tournament['questions_payload'])
         
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
@@ -1841,62 +4052,55 @@ def answer_question():
             if not data.get(field):
                 return jsonify({'error': f'{field} alanı gereklidir'}), 400
         
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Turnuva zaman kontrolü
-        cursor.execute('''
-            SELECT end_time FROM tournaments WHERE id = ?
-        ''', (data['tournament_id'],))
+        try:
+            tournament_id = int(data['tournament_id'])
+            question_id = int(data['question_id'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Geçersiz turnuva veya soru ID'}), 400
         
-        tournament = cursor.fetchone()
+        # Bitiş zamanı ve cevap anahtarı bellekten gelir
+        tournament = get_cached_tournament(tournament_id)
         if not tournament:
-            conn.close()
             return jsonify({'error': 'Turnuva bulunamadı'}), 404
         
-        end_time = datetime.fromisoformat(tournament[0].replace('Z', '+00:00'))
-        current_time = datetime.now()
-        
         # Turnuva bitmişse cevap vermeye izin verme
-        if current_time > end_time:
-            conn.close()
+        end_time = tournament['end_dt']
+        if end_time and datetime.now() > end_time:
             return jsonify({'error': 'Turnuva süresi dolmuş'}), 400
         
-        # Daha önce bu soruyu cevaplamış mı kontrol et
-        cursor.execute('''
-            SELECT id FROM user_answers 
-            WHERE user_id = ? AND tournament_id = ? AND question_id = ?
-        ''', (payload['user_id'], data['tournament_id'], data['question_id']))
-        
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'error': 'Bu soruyu zaten cevapladınız'}), 400
-        
-        # Doğru cevabı kontrol et
-        cursor.execute('''
-            SELECT correct_option FROM questions WHERE id = ?
-        ''', (data['question_id'],))
-        
-        question = cursor.fetchone()
-        if not question:
-            conn.close()
+        correct_option = tournament['answer_key'].get(question_id)
+        if correct_option is None:
             return jsonify({'error': 'Soru bulunamadı'}), 404
         
-        is_correct = data['selected_option'] == question[0]
+        is_correct = data['selected_option'] == correct_option
+        
+        conn = get_db()
+        cursor = conn.cursor()
         
-        # Cevabı kaydet
+        # Cevabı kaydet - mükerrer cevabı UNIQUE indeks engeller
         cursor.execute('''
             INSERT INTO user_answers (user_id, tournament_id, question_id, selected_option, is_correct)
             VALUES (?, ?, ?, ?, ?)
-        ''', (payload['user_id'], data['tournament_id'], data['question_id'], data['selected_option'], is_correct))
+            ON CONFLICT (user_id, tournament_id, question_id) DO NOTHING
+        ''', (payload['user_id'], tournament_id, question_id, data['selected_option'], is_correct))
         
-        # Skoru güncelle
+        if cursor.rowcount == 0:
+            conn.close()
+            return jsonify({'error': 'Bu soruyu zaten cevapladınız'}), 400
+        
+        # Skoru güncelle (aynı transaction içinde). Tamamlanmış katılımın skoru değişmez:
+        # user_stats, tournament_summary ve bellekteki sıralama tamamlamada bir kez güncellenir
         cursor.execute('''
             UPDATE tournament_participants 
             SET total_questions = total_questions + 1,
                 correct_answers = correct_answers + ?
-            WHERE user_id = ? AND tournament_id = ?
-        ''', (1 if is_correct else 0, payload['user_id'], data['tournament_id']))
+            WHERE user_id = ? AND tournament_id = ? AND completed_at IS NULL
+        ''', (1 if is_correct else 0, payload['user_id'], tournament_id))
+        
+        if cursor.rowcount == 0:
+            conn.rollback()
+            conn.close()
+            return jsonify({'error': 'Turnuvaya katılmadınız veya turnuvayı zaten tamamladınız'}), 400
         
         conn.commit()
         conn.close()
@@ -1904,7 +4108,7 @@ def answer_question():
         return jsonify({
             'success': True,
             'is_correct': is_correct,
-            'correct_answer': question[0]
+            'correct_answer': correct_option
         }), 200
         
     except Exception as e:
@@ -1933,15 +4137,21 @@ def complete_tournament():
         if not data.get('tournament_id'):
             return jsonify({'error': 'Turnuva ID gereklidir'}), 400
         
-        conn = sqlite3.connect('database.db')
+        try:
+            tournament_id = int(data['tournament_id'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Geçersiz turnuva ID'}), 400
+        
+        conn = get_db()
         cursor = conn.cursor()
         
         # Katılım bilgilerini al
         cursor.execute('''
-            SELECT total_questions, correct_answers, completed_at
-            FROM tournament_participants 
-            WHERE user_id = ? AND tournament_id = ?
-        ''', (payload['user_id'], data['tournament_id']))
+            SELECT tp.total_questions, tp.correct_answers, tp.completed_at, u.first_name, u.last_name
+            FROM tournament_participants tp
+            JOIN users u ON tp.user_id = u.id
+            WHERE tp.user_id = ? AND tp.tournament_id = ?
+        ''', (payload['user_id'], tournament_id))
         
         participant = cursor.fetchone()
         if not participant:
@@ -1961,18 +4171,59 @@ def complete_tournament():
             return jsonify({'error': 'Hiç soru cevaplanmamış'}), 400
         
         final_score = round((correct_answers / total_questions) * 100)
+        # CURRENT_TIMESTAMP ile aynı biçim (UTC), sıralamaya da aynı değer yazılır
+        completed_at = utc_timestamp()
         
         # Turnuvayı tamamla
         cursor.execute('''
             UPDATE tournament_participants 
-            SET completed_at = CURRENT_TIMESTAMP,
+            SET completed_at = ?,
                 total_score = ?
-            WHERE user_id = ? AND tournament_id = ?
-        ''', (final_score, payload['user_id'], data['tournament_id']))
+            WHERE user_id = ? AND tournament_id = ? AND completed_at IS NULL
+        ''', (completed_at, final_score, payload['user_id'], tournament_id))
+        
+        if cursor.rowcount == 0:
+            conn.close()
+            return jsonify({'error': 'Bu turnuvayı zaten tamamladınız'}), 400
+        
+        # Genel sıralama özetini aynı transaction içinde artımlı güncelle
+        cursor.execute('''
+            INSERT INTO user_stats (user_id, total_correct, total_questions, total_score_sum,
+                                    tournaments_completed, avg_score, updated_at)
+            VALUES (?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_correct = total_correct + excluded.total_correct,
+                total_questions = total_questions + excluded.total_questions,
+                total_score_sum = total_score_sum + excluded.total_score_sum,
+                tournaments_completed = tournaments_completed + 1,
+                avg_score = CAST(total_score_sum + excluded.total_score_sum AS REAL) / (tournaments_completed + 1),
+                updated_at = CURRENT_TIMESTAMP
+        ''', (payload['user_id'], correct_answers, total_questions, final_score, final_score))
+        
+        # Turnuvanın en iyi skorunu ve tamamlayan sayısını güncelle
+        cursor.execute('''
+            INSERT INTO tournament_summary (tournament_id, best_correct, completed_count, updated_at)
+            VALUES (?, ?, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (tournament_id) DO UPDATE SET
+                best_correct = MAX(best_correct, excluded.best_correct),
+                completed_count = completed_count + 1,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (tournament_id, correct_answers))
         
         conn.commit()
         conn.close()
         
+        invalidate_weekly_calendar()
+        record_leaderboard_completion(tournament_id, {
+            'user_id': payload['user_id'],
+            'username': f"{participant[3]} {participant[4]}",
+            'correct_answers': correct_answers,
+            'total_questions': total_questions,
+            'total_score': final_score,
+            'completed_at': completed_at
+        })
+        publish_tournament_completion(tournament_id, payload['user_id'])
+        
         return jsonify({
             'success': True,
             'final_score': final_score,
@@ -1987,7 +4238,7 @@ def complete_tournament():
 def get_tournament_results(tournament_id):
     """Turnuva sonuçlarını getir"""
     try:
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Turnuva bilgileri
@@ -2068,20 +4319,13 @@ def get_user_tournament_status(tournament_id):
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Turnuva bilgileri
-        cursor.execute('''
-            SELECT title, start_time, end_time, status
-            FROM tournaments WHERE id = ?
-        ''', (tournament_id,))
-        
-        tournament = cursor.fetchone()
+        tournament = get_cached_tournament(tournament_id)
         if not tournament:
-            conn.close()
             return jsonify({'error': 'Turnuva bulunamadı'}), 404
         
+        conn = get_db()
+        cursor = conn.cursor()
+        
         # Kullanıcı katılım durumu
         cursor.execute('''
             SELECT total_score, total_questions, correct_answers, completed_at, joined_at
@@ -2093,38 +4337,29 @@ def get_user_tournament_status(tournament_id):
         conn.close()
         
         current_time = datetime.now()
+        start_time = tournament['start_dt']
+        end_time = tournament['end_dt']
+        
+        status = {
+            'tournament_id': tournament_id,
+            'title': tournament['title'],
+            'start_time': tournament['start_time'],
+            'end_time': tournament['end_time'],
+            'status': tournament['status'],
+            'current_time': current_time.isoformat(),
+            'has_joined': participant is not None,
+            'is_completed': participant and participant[3] is not None
+        }
         
-        # Zaman kontrolü (daha esnek)
-        try:
-            start_time = datetime.fromisoformat(tournament[1].replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(tournament[2].replace('Z', '+00:00'))
-            
-            status = {
-                'tournament_id': tournament_id,
-                'title': tournament[0],
-                'start_time': tournament[1],
-                'end_time': tournament[2],
-                'status': tournament[3],
-                'current_time': current_time.isoformat(),
-                'has_joined': participant is not None,
-                'can_join': start_time <= current_time <= end_time,  # Hem başlangıç hem bitiş zamanını kontrol et
-                'can_participate': participant is not None and start_time <= current_time <= end_time,
-                'is_completed': participant and participant[3] is not None
-            }
-        except:
-            # Zaman formatı sorunluysa varsayılan değerler
-            status = {
-                'tournament_id': tournament_id,
-                'title': tournament[0],
-                'start_time': tournament[1],
-                'end_time': tournament[2],
-                'status': tournament[3],
-                'current_time': current_time.isoformat(),
-                'has_joined': participant is not None,
-                'can_join': True,  # Varsayılan olarak katılıma izin ver
-                'can_participate': participant is not None,
-                'is_completed': participant and participant[3] is not None
-            }
+        if start_time and end_time:
+            # Hem başlangıç hem bitiş zamanını kontrol et
+            in_window = start_time <= current_time <= end_time
+            status['can_join'] = in_window
+            status['can_participate'] = participant is not None and in_window
+        else:
+            # Zaman formatı sorunluysa varsayılan olarak katılıma izin ver
+            status['can_join'] = True
+            status['can_participate'] = participant is not None
         
         if participant:
             status.update({
@@ -2161,7 +4396,7 @@ def get_tournament(tournament_id):
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Turnuva bilgileri
@@ -2237,7 +4472,7 @@ def update_tournament(tournament_id):
             if not data.get(field):
                 return jsonify({'error': f'{field} alanı gereklidir'}), 400
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Turnuvayı güncelle
@@ -2264,6 +4499,7 @@ def update_tournament(tournament_id):
         
         conn.commit()
         conn.close()
+        invalidate_tournament_cache(tournament_id)
         
         return jsonify({
             'success': True,
@@ -2291,7 +4527,7 @@ def delete_tournament(tournament_id):
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Turnuvayı sil
@@ -2304,14 +4540,20 @@ def delete_tournament(tournament_id):
         # İlgili soruları da sil
         cursor.execute('DELETE FROM questions WHERE tournament_id = ?', (tournament_id,))
         
-        # İlgili katılımları da sil
+        # İlgili katılımları da sil (etkilenen kullanıcıların özetleri yeniden hesaplanır)
+        cursor.execute('SELECT user_id FROM tournament_participants WHERE tournament_id = ?', (tournament_id,))
+        affected_user_ids = [row[0] for row in cursor.fetchall()]
         cursor.execute('DELETE FROM tournament_participants WHERE tournament_id = ?', (tournament_id,))
+        refresh_user_stats(cursor, affected_user_ids)
+        cursor.execute('DELETE FROM tournament_summary WHERE tournament_id = ?', (tournament_id,))
         
         # İlgili cevapları da sil
         cursor.execute('DELETE FROM user_answers WHERE tournament_id = ?', (tournament_id,))
         
         conn.commit()
         conn.close()
+        invalidate_tournament_cache(tournament_id)
+        drop_tournament_leaderboard(tournament_id)
         
         return jsonify({'success': True, 'message': 'Turnuva başarıyla silindi'}), 200
         
@@ -2322,7 +4564,7 @@ def delete_tournament(tournament_id):
 def get_tournament_participant_count(tournament_id):
     """Turnuvayı tamamlayan kişi sayısını döndür"""
     try:
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Turnuvayı tamamlayan kişi sayısını al (completed_at NULL değil)
@@ -2360,57 +4602,42 @@ def get_leaderboard(tournament_id):
             except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
                 pass  # Token geçersizse sadece genel sıralama göster
         
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Turnuvayı tamamlayan kullanıcıları doğru cevap sayısına göre sırala
-        cursor.execute('''
-            SELECT 
-                tp.user_id,
-                u.first_name,
-                u.last_name,
-                tp.correct_answers,
-                tp.total_questions,
-                tp.total_score,
-                tp.completed_at
-            FROM tournament_participants tp
-            JOIN users u ON tp.user_id = u.id
-            WHERE tp.tournament_id = ? AND tp.completed_at IS NOT NULL
-            ORDER BY tp.correct_answers DESC, tp.completed_at ASC
-            LIMIT 10
-        ''', (tournament_id,))
-        
-        participants = cursor.fetchall()
+        board = get_tournament_leaderboard(tournament_id)
         
         leaderboard = []
-        for i, participant in enumerate(participants):
-            user_id, first_name, last_name, correct_answers, total_questions, total_score, completed_at = participant
-            
-            # Kullanıcı adını oluştur
-            username = f"{first_name} {last_name}"
-            
-            # Sıralama pozisyonu
-            rank = i + 1
-            
-            # Mevcut kullanıcı mı kontrol et
-            is_current_user = current_user_id == user_id
-            
+        for rank, entry in board.top(10):
             leaderboard.append({
                 'rank': rank,
-                'user_id': user_id,
-                'username': username,
-                'correct_answers': correct_answers,
-                'total_questions': total_questions,
-                'total_score': total_score,
-                'completion_time': completed_at,
-                'is_current_user': is_current_user
+                'user_id': entry['user_id'],
+                'username': entry['username'],
+                'correct_answers': entry['correct_answers'],
+                'total_questions': entry['total_questions'],
+                'total_score': entry['total_score'],
+                'completion_time': entry['completed_at'],
+                'is_current_user': current_user_id == entry['user_id']
             })
         
-        conn.close()
+        # İlk 10'da olmasa bile kullanıcının kendi sırası (ek sorgu yok)
+        current_user = None
+        if current_user_id is not None:
+            ranked = board.rank_of(current_user_id)
+            if ranked:
+                rank, entry = ranked
+                current_user = {
+                    'rank': rank,
+                    'user_id': entry['user_id'],
+                    'username': entry['username'],
+                    'correct_answers': entry['correct_answers'],
+                    'total_questions': entry['total_questions'],
+                    'total_score': entry['total_score'],
+                    'completion_time': entry['completed_at']
+                }
         
         return jsonify({
             'success': True,
             'leaderboard': leaderboard,
+            'current_user': current_user,
+            'total_participants': len(board),
             'tournament_id': tournament_id
         }), 200
         
@@ -2433,25 +4660,23 @@ def get_global_leaderboard():
             except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
                 pass
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
-        # Tüm turnuvalardaki toplam performansı hesapla
+        # Toplam performans user_stats özet tablosundan okunur
         cursor.execute('''
             SELECT 
-                u.id,
+                us.user_id,
                 u.first_name,
                 u.last_name,
-                SUM(tp.correct_answers) as total_correct,
-                SUM(tp.total_questions) as total_questions,
-                AVG(tp.total_score) as avg_score,
-                COUNT(tp.id) as tournaments_completed
-            FROM users u
-            JOIN tournament_participants tp ON u.id = tp.user_id
-            WHERE tp.completed_at IS NOT NULL
-            GROUP BY u.id, u.first_name, u.last_name
-            HAVING total_correct > 0
-            ORDER BY total_correct DESC, avg_score DESC
+                us.total_correct,
+                us.total_questions,
+                us.avg_score,
+                us.tournaments_completed
+            FROM user_stats us
+            JOIN users u ON us.user_id = u.id
+            WHERE us.total_correct > 0
+            ORDER BY us.total_correct DESC, us.avg_score DESC
             LIMIT 10
         ''')
         
@@ -2486,198 +4711,372 @@ def get_global_leaderboard():
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
+def compute_tournament_stats(tournament_id):
+    """Turnuva istatistiklerini tek sorguyla hesapla, turnuva yoksa None döndür"""
+    tournament = get_cached_tournament(tournament_id)
+    if not tournament:
+        return None
+    
+    conn = get_db()
+    cursor = conn.cursor()
+    
+    # Katılımcı sayısı ve tamamlananların istatistikleri (katılım user/turnuva başına tekildir)
+    cursor.execute('''
+        SELECT 
+            COUNT(*) as total_participants,
+            COUNT(completed_at) as completed_count,
+            AVG(CASE WHEN completed_at IS NOT NULL THEN total_score END) as avg_score,
+            MAX(CASE WHEN completed_at IS NOT NULL THEN total_score END) as max_score,
+            AVG(CASE WHEN completed_at IS NOT NULL THEN correct_answers END) as avg_correct,
+            MAX(CASE WHEN completed_at IS NOT NULL THEN correct_answers END) as max_correct
+        FROM tournament_participants
+        WHERE tournament_id = ?
+    ''', (tournament_id,))
+    
+    total_participants, completed_count, avg_score, max_score, avg_correct, max_correct = cursor.fetchone()
+    conn.close()
+    
+    # Ortalama skor hesapla
+    average_score = round(avg_score, 1) if avg_score else 0
+    highest_score = round(max_score, 1) if max_score else 0
+    
+    # Kalan süre hesapla
+    now = datetime.now()
+    end_datetime = tournament['end_dt']
+    
+    if end_datetime and end_datetime > now:
+        time_left = end_datetime - now
+        hours = int(time_left.total_seconds() // 3600)
+        minutes = int((time_left.total_seconds() % 3600) // 60)
+        seconds = int(time_left.total_seconds() % 60)
+        remaining_time = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    else:
+        remaining_time = "00:00:00"
+    
+    return {
+        'total_participants': total_participants,
+        'completed_participants': completed_count,
+        'average_score': average_score,
+        'highest_score': highest_score,
+        'average_correct_answers': round(avg_correct, 1) if avg_correct else 0,
+        'max_correct_answers': max_correct if max_correct else 0,
+        'remaining_time': remaining_time,
+        'tournament_status': tournament['status']
+    }
+
 @app.route('/api/tournament-stats/<int:tournament_id>', methods=['GET'])
 def get_tournament_stats(tournament_id):
     """Turnuva istatistiklerini döndür"""
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Turnuva bilgilerini al
-        cursor.execute('''
-            SELECT start_time, end_time, status
-            FROM tournaments
-            WHERE id = ?
-        ''', (tournament_id,))
-        
-        tournament = cursor.fetchone()
-        if not tournament:
-            conn.close()
+        stats = compute_tournament_stats(tournament_id)
+        if stats is None:
             return jsonify({'error': 'Turnuva bulunamadı'}), 404
         
-        start_time, end_time, status = tournament
-        
-        # Toplam katılımcı sayısı
-        cursor.execute('''
-            SELECT COUNT(DISTINCT user_id)
-            FROM tournament_participants
-            WHERE tournament_id = ?
-        ''', (tournament_id,))
-        
-        total_participants = cursor.fetchone()[0]
-        
-        # Tamamlanan turnuvaların istatistikleri
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as completed_count,
-                AVG(total_score) as avg_score,
-                MAX(total_score) as max_score,
-                AVG(correct_answers) as avg_correct,
-                MAX(correct_answers) as max_correct
-            FROM tournament_participants
-            WHERE tournament_id = ? AND completed_at IS NOT NULL
-        ''', (tournament_id,))
-        
-        stats = cursor.fetchone()
-        completed_count, avg_score, max_score, avg_correct, max_correct = stats
-        
-        # Ortalama skor hesapla
-        average_score = round(avg_score, 1) if avg_score else 0
-        highest_score = round(max_score, 1) if max_score else 0
-        
-        # Kalan süre hesapla
-        now = datetime.now()
-        end_datetime = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-        
-        if end_datetime > now:
-            time_left = end_datetime - now
-            hours = int(time_left.total_seconds() // 3600)
-            minutes = int((time_left.total_seconds() % 3600) // 60)
-            seconds = int(time_left.total_seconds() % 60)
-            remaining_time = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        else:
-            remaining_time = "00:00:00"
-        
-        conn.close()
-        
         return jsonify({
             'success': True,
-            'stats': {
-                'total_participants': total_participants,
-                'completed_participants': completed_count,
-                'average_score': average_score,
-                'highest_score': highest_score,
-                'average_correct_answers': round(avg_correct, 1) if avg_correct else 0,
-                'max_correct_answers': max_correct if max_correct else 0,
-                'remaining_time': remaining_time,
-                'tournament_status': status
-            },
+            'stats': stats,
             'tournament_id': tournament_id
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
+# Canlı turnuva kanalı (Server-Sent Events)
+# Durum sadece join/complete ile değiştiğinde olay yayınlanır; boşta iken veritabanı sorgusu yapılmaz.
+# İstatistik olayları birleştirilir: saniyede en fazla bir hesaplama, abonesi olan turnuvalar için.
+SSE_HEARTBEAT_SECONDS = 15
+SSE_STATS_FLUSH_SECONDS = 1.0
+SSE_SUBSCRIBER_QUEUE_SIZE = 100
+
+class TournamentEventHub:
+    """Turnuva başına abonelere olay dağıtan (fan-out) merkez"""
+    
+    def __init__(self):
+        self.subscribers = {}
+        self.dirty_stats = set()
+        self.lock = threading.Lock()
+        self.flusher_pid = None
+    
+    def subscribe(self, tournament_id):
+        subscriber = queue.Queue(maxsize=SSE_SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.setdefault(tournament_id, set()).add(subscriber)
+            self.ensure_flusher()
+        return subscriber
+    
+    def unsubscribe(self, tournament_id, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(tournament_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[tournament_id]
+    
+    def has_subscribers(self, tournament_id):
+        return bool(self.subscribers.get(tournament_id))
+    
+    def subscriber_count(self, tournament_id=None):
+        with self.lock:
+            if tournament_id is not None:
+                return len(self.subscribers.get(tournament_id, ()))
+            return sum(len(subscribers) for subscribers in self.subscribers.values())
+    
+    def publish(self, tournament_id, event, data):
+        """Olayı turnuvanın tüm abonelerine gönder; kuyruğu dolu (yavaş) istemci olayı kaçırır"""
+        with self.lock:
+            subscribers = list(self.subscribers.get(tournament_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                pass
+    
+    def mark_stats_dirty(self, tournament_id):
+        """İstatistikleri bir sonraki birleştirme turunda yeniden hesaplat"""
+        if self.has_subscribers(tournament_id):
+            with self.lock:
+                self.dirty_stats.add(tournament_id)
+    
+    def ensure_flusher(self):
+        # self.lock tutulurken çağrılır; fork sonrası süreç başına yeniden başlatılır
+        if self.flusher_pid != os.getpid():
+            self.flusher_pid = os.getpid()
+            threading.Thread(target=self.flush_loop, name='tournament-events', daemon=True).start()
+    
+    def flush_loop(self):
+        while True:
+            time.sleep(SSE_STATS_FLUSH_SECONDS)
+            with self.lock:
+                dirty, self.dirty_stats = self.dirty_stats, set()
+            for tournament_id in dirty:
+                if not self.has_subscribers(tournament_id):
+                    continue
+                try:
+                    stats = compute_tournament_stats(tournament_id)
+                except Exception as e:
+                    print(f"Turnuva istatistik olayı hatası: {e}")
+                    continue
+                if stats is not None:
+                    self.publish(tournament_id, 'stats', stats)
+
+tournament_event_hub = TournamentEventHub()
+
+def format_sse(event, data):
+    """Olayı text/event-stream biçimine çevir"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def event_stream_response(events):
+    """Üreteçten gelen SSE metnini tamponlanmadan gönderen yanıt"""
+    response = app.response_class(events, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def leaderboard_event_payload(board, changed_user_id=None):
+    """Bellekteki sıralamadan (sorgusuz) leaderboard olayı oluştur"""
+    payload = {
+        'leaderboard': [{
+            'rank': rank,
+            'user_id': entry['user_id'],
+            'username': entry['username'],
+            'correct_answers': entry['correct_answers'],
+            'total_questions': entry['total_questions'],
+            'total_score': entry['total_score'],
+            'completion_time': entry['completed_at']
+        } for rank, entry in board.top(10)],
+        'total_participants': len(board),
+        'changed': None
+    }
+    if changed_user_id is not None:
+        ranked = board.rank_of(changed_user_id)
+        if ranked:
+            rank, entry = ranked
+            payload['changed'] = {
+                'rank': rank,
+                'user_id': entry['user_id'],
+                'username': entry['username'],
+                'correct_answers': entry['correct_answers'],
+                'total_questions': entry['total_questions'],
+                'total_score': entry['total_score'],
+                'completion_time': entry['completed_at']
+            }
+    return payload
+
+def publish_tournament_completion(tournament_id, user_id):
+    """Tamamlama sonrası sayım, sıralama ve istatistik olaylarını yayınla"""
+    if not tournament_event_hub.has_subscribers(tournament_id):
+        return
+    board = get_tournament_leaderboard(tournament_id)
+    tournament_event_hub.publish(tournament_id, 'participant-count', {'participant_count': len(board)})
+    tournament_event_hub.publish(tournament_id, 'leaderboard', leaderboard_event_payload(board, user_id))
+    tournament_event_hub.publish(tournament_id, 'calendar', {})
+    tournament_event_hub.mark_stats_dirty(tournament_id)
+
+@app.route('/api/tournament-events/<int:tournament_id>', methods=['GET'])
+def tournament_events(tournament_id):
+    """Canlı turnuva olay akışı (SSE): participant-count, leaderboard, stats, calendar"""
+    if not get_cached_tournament(tournament_id):
+        return jsonify({'error': 'Turnuva bulunamadı'}), 404
+    
+    def stream():
+        subscriber = tournament_event_hub.subscribe(tournament_id)
+        try:
+            # Bağlanınca tek seferlik anlık görüntü
+            board = get_tournament_leaderboard(tournament_id)
+            yield "retry: 5000\n\n"
+            yield format_sse('participant-count', {'participant_count': len(board)})
+            yield format_sse('leaderboard', leaderboard_event_payload(board))
+            stats = compute_tournament_stats(tournament_id)
+            if stats is not None:
+                yield format_sse('stats', stats)
+            
+            while True:
+                try:
+                    event, data = subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            tournament_event_hub.unsubscribe(tournament_id, subscriber)
+    
+    return event_stream_response(stream())
+
+# Haftalık takvim önbelleği: gün değişince, turnuva tamamlanınca/düzenlenince veya
+# WEEKLY_CALENDAR_MAX_AGE_SECONDS dolunca (diğer worker'lardaki değişiklikler için) yenilenir
+WEEKLY_CALENDAR_MAX_AGE_SECONDS = int(os.getenv("WEEKLY_CALENDAR_MAX_AGE_SECONDS", "30"))
+weekly_calendar_cache = {}
+weekly_calendar_lock = threading.Lock()
+
+def invalidate_weekly_calendar():
+    """Haftalık takvim önbelleğini geçersiz kıl"""
+    with weekly_calendar_lock:
+        weekly_calendar_cache['generation'] = weekly_calendar_cache.get('generation', 0) + 1
+        weekly_calendar_cache.pop('payload', None)
+
+def build_weekly_tournament_calendar(now):
+    """Haftalık takvimi tek aralık sorgusu ve tek kazanan sorgusuyla oluştur"""
+    # Bu haftanın başlangıç ve bitiş tarihlerini hesapla
+    start_of_week = now - timedelta(days=now.weekday())
+    start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_week = start_of_week + timedelta(days=7)
+    
+    conn = get_db()
+    cursor = conn.cursor()
+    
+    # Haftanın turnuvaları - start_time üzerindeki indeksle aralık taraması
+    cursor.execute('''
+        SELECT id, title, status, start_time
+        FROM tournaments
+        WHERE start_time >= ? AND start_time < ?
+        ORDER BY start_time ASC
+    ''', (start_of_week.strftime('%Y-%m-%d'), end_of_week.strftime('%Y-%m-%d')))
+    
+    # Her gün için o günün ilk turnuvası
+    tournaments_by_date = {}
+    for tournament_id, title, status, start_time in cursor.fetchall():
+        tournaments_by_date.setdefault(start_time[:10], (tournament_id, title, status))
+    
+    # Tüm turnuvaların kazananları tek pencere fonksiyonu sorgusuyla
+    winners = {}
+    tournament_ids = [t[0] for t in tournaments_by_date.values()]
+    if tournament_ids:
+        placeholders = ','.join('?' * len(tournament_ids))
+        cursor.execute(f'''
+            SELECT tournament_id, first_name, last_name
+            FROM (
+                SELECT tp.tournament_id, u.first_name, u.last_name,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY tp.tournament_id
+                           ORDER BY tp.correct_answers DESC, tp.completed_at ASC
+                       ) AS position
+                FROM tournament_participants tp
+                JOIN users u ON tp.user_id = u.id
+                WHERE tp.tournament_id IN ({placeholders}) AND tp.completed_at IS NOT NULL
+            )
+            WHERE position = 1
+        ''', tournament_ids)
+        winners = {row[0]: f"{row[1]} {row[2]}" for row in cursor.fetchall()}
+    
+    conn.close()
+    
+    # Haftalık günler
+    days_of_week = ['Pzt', 'Sal', 'Çar', 'Per', 'Cum', 'Cmt', 'Paz']
+    weekly_calendar = []
+    
+    for i in range(7):
+        current_date = start_of_week + timedelta(days=i)
+        date_key = current_date.strftime('%Y-%m-%d')
+        tournament = tournaments_by_date.get(date_key)
+        
+        # Gün durumunu belirle
+        if current_date.date() == now.date():
+            day_status = "today"
+            day_icon = "🔥" if tournament else "📅"
+        elif current_date.date() < now.date():
+            day_status = "completed"
+            day_icon = "✓"
+        else:
+            day_status = "upcoming"
+            day_icon = "🔒"
+        
+        if tournament:
+            tournament_id, tournament_title, tournament_status = tournament
+            weekly_calendar.append({
+                'day_name': days_of_week[i],
+                'day_status': day_status,
+                'day_icon': day_icon,
+                'tournament_title': tournament_title,
+                'tournament_status': tournament_status,
+                'winner_name': winners.get(tournament_id, "Henüz kazanan yok"),
+                'winner_score': "",
+                'date': date_key
+            })
+        else:
+            # Bu gün için turnuva yok
+            weekly_calendar.append({
+                'day_name': days_of_week[i],
+                'day_status': day_status,
+                'day_icon': day_icon,
+                'tournament_title': "Turnuva yok",
+                'tournament_status': "none",
+                'winner_name': "",
+                'winner_score': "",
+                'date': date_key
+            })
+    
+    return {
+        'success': True,
+        'weekly_calendar': weekly_calendar,
+        'current_week': {
+            'start_date': start_of_week.strftime('%Y-%m-%d'),
+            'end_date': end_of_week.strftime('%Y-%m-%d')
+        }
+    }
+
 @app.route('/api/weekly-tournament-calendar', methods=['GET'])
 def get_weekly_tournament_calendar():
     """Haftalık turnuva takvimini döndür"""
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        # Bu haftanın başlangıç ve bitiş tarihlerini hesapla
         now = datetime.now()
-        start_of_week = now - timedelta(days=now.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_week = start_of_week + timedelta(days=7)
+        today = now.strftime('%Y-%m-%d')
         
-        # Haftalık günler
-        days_of_week = ['Pzt', 'Sal', 'Çar', 'Per', 'Cum', 'Cmt', 'Paz']
+        # Hafta, bir turnuva tamamlanana/düzenlenene, gün değişene veya süre dolana kadar önbellekten gelir
+        with weekly_calendar_lock:
+            cached = weekly_calendar_cache.get('payload')
+            if (cached is not None and weekly_calendar_cache.get('date') == today
+                    and time.monotonic() - weekly_calendar_cache['loaded_at'] < WEEKLY_CALENDAR_MAX_AGE_SECONDS):
+                return jsonify(cached), 200
+            generation = weekly_calendar_cache.get('generation', 0)
         
-        weekly_calendar = []
-        
-        for i in range(7):
-            current_date = start_of_week + timedelta(days=i)
-            day_name = days_of_week[i]
-            
-            # Bu gün için turnuva var mı kontrol et
-            cursor.execute('''
-                SELECT id, title, status
-                FROM tournaments
-                WHERE DATE(start_time) = DATE(?)
-                ORDER BY start_time ASC
-                LIMIT 1
-            ''', (current_date.strftime('%Y-%m-%d'),))
-            
-            tournament = cursor.fetchone()
-            
-            if tournament:
-                tournament_id, tournament_title, tournament_status = tournament
-                
-                # Bu turnuvanın kazananını bul
-                cursor.execute('''
-                    SELECT u.first_name, u.last_name, tp.correct_answers, tp.total_score
-                    FROM tournament_participants tp
-                    JOIN users u ON tp.user_id = u.id
-                    WHERE tp.tournament_id = ? AND tp.completed_at IS NOT NULL
-                    ORDER BY tp.correct_answers DESC, tp.completed_at ASC
-                    LIMIT 1
-                ''', (tournament_id,))
-                
-                winner = cursor.fetchone()
-                
-                if winner:
-                    winner_name, winner_lastname, correct_answers, total_score = winner
-                    winner_display = f"{winner_name} {winner_lastname}"
-                    winner_score = ""
-                else:
-                    winner_display = "Henüz kazanan yok"
-                    winner_score = ""
-                
-                # Gün durumunu belirle
-                if current_date.date() == now.date():
-                    day_status = "today"
-                    day_icon = "🔥"
-                elif current_date.date() < now.date():
-                    day_status = "completed"
-                    day_icon = "✓"
-                else:
-                    day_status = "upcoming"
-                    day_icon = "🔒"
-                
-                weekly_calendar.append({
-                    'day_name': day_name,
-                    'day_status': day_status,
-                    'day_icon': day_icon,
-                    'tournament_title': tournament_title,
-                    'tournament_status': tournament_status,
-                    'winner_name': winner_display,
-                    'winner_score': winner_score,
-                    'date': current_date.strftime('%Y-%m-%d')
-                })
-            else:
-                # Bu gün için turnuva yok
-                if current_date.date() == now.date():
-                    day_status = "today"
-                    day_icon = "📅"
-                elif current_date.date() < now.date():
-                    day_status = "completed"
-                    day_icon = "✓"
-                else:
-                    day_status = "upcoming"
-                    day_icon = "🔒"
-                
-                weekly_calendar.append({
-                    'day_name': day_name,
-                    'day_status': day_status,
-                    'day_icon': day_icon,
-                    'tournament_title': "Turnuva yok",
-                    'tournament_status': "none",
-                    'winner_name': "",
-                    'winner_score': "",
-                    'date': current_date.strftime('%Y-%m-%d')
-                })
+        loaded_at = time.monotonic()
+        payload = build_weekly_tournament_calendar(now)
         
-        conn.close()
+        with weekly_calendar_lock:
+            if weekly_calendar_cache.get('generation', 0) == generation:
+                weekly_calendar_cache.update({'date': today, 'payload': payload, 'loaded_at': loaded_at})
         
-        return jsonify({
-            'success': True,
-            'weekly_calendar': weekly_calendar,
-            'current_week': {
-                'start_date': start_of_week.strftime('%Y-%m-%d'),
-                'end_date': end_of_week.strftime('%Y-%m-%d')
-            }
-        }), 200
+        return jsonify(payload), 200
         
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
@@ -2691,15 +5090,38 @@ def chat_with_rag():
         if not data.get('message'):
             return jsonify({'error': 'Mesaj gereklidir'}), 400
         
+        ensure_rag_warmup()
+        if rag_status == 'warming_up':
+            return jsonify({
+                'response': 'AI asistan hazırlanıyor, lütfen birkaç saniye sonra tekrar deneyin.',
+                'status': 'warming_up',
+                'timestamp': datetime.now().isoformat()
+            }), 503
+        
         if not rag_chain:
             return jsonify({
                 'response': 'Üzgünüm, AI asistan şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin.',
+                'status': rag_status,
                 'timestamp': datetime.now().isoformat()
             }), 200
         
+        # Aynı veya anlamca çok yakın soru daha önce yanıtlandıysa LLM'e gitme
+        vector = None
+        if CHAT_CACHE_ENABLED:
+            cached_answer, vector = lookup_chat_cache(data['message'])
+            if cached_answer is not None:
+                return jsonify({
+                    'response': cached_answer,
+                    'cached': True,
+                    'timestamp': datetime.now().isoformat()
+                }), 200
+        
         # RAG sistemi ile yanıt al
         response = rag_chain.invoke({"input": data['message']})
         
+        if CHAT_CACHE_ENABLED:
+            store_chat_cache(data['message'], vector, response["answer"])
+        
         return jsonify({
             'response': response["answer"],
             'timestamp': datetime.now().isoformat()
@@ -2711,6 +5133,122 @@ def chat_with_rag():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_with_rag_stream():
+    """RAG sistemi ile sohbet - yanıt parçaları üretildikçe SSE olarak gönderilir (token, done, error)"""
+    try:
+        data = request.get_json()
+        
+        if not data.get('message'):
+            return jsonify({'error': 'Mesaj gereklidir'}), 400
+        
+        ensure_rag_warmup()
+        if rag_status == 'warming_up':
+            return jsonify({
+                'response': 'AI asistan hazırlanıyor, lütfen birkaç saniye sonra tekrar deneyin.',
+                'status': 'warming_up',
+                'timestamp': datetime.now().isoformat()
+            }), 503
+        
+        if not rag_chain:
+            return jsonify({
+                'response': 'Üzgünüm, AI asistan şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin.',
+                'status': rag_status,
+                'timestamp': datetime.now().isoformat()
+            }), 200
+        
+        message = data['message']
+        vector = None
+        if CHAT_CACHE_ENABLED:
+            cached_answer, vector = lookup_chat_cache(message)
+            if cached_answer is not None:
+                def cached_stream():
+                    yield format_sse('token', {'text': cached_answer})
+                    yield format_sse('done', {'cached': True, 'timestamp': datetime.now().isoformat()})
+                return event_stream_response(cached_stream())
+        
+        def stream():
+            answer_parts = []
+            try:
+                # create_retrieval_chain önce bağlamı, sonra yanıtı parça parça üretir
+                for chunk in rag_chain.stream({"input": message}):
+                    text = chunk.get('answer')
+                    if text:
+                        answer_parts.append(text)
+                        yield format_sse('token', {'text': text})
+            except Exception as e:
+                yield format_sse('error', {'response': f'Sorry, bir hata oluştu: {str(e)}'})
+                return
+            
+            answer = ''.join(answer_parts)
+            if CHAT_CACHE_ENABLED and answer:
+                store_chat_cache(message, vector, answer)
+            yield format_sse('done', {'cached': False, 'timestamp': datetime.now().isoformat()})
+        
+        return event_stream_response(stream())
+        
+    except Exception as e:
+        return jsonify({
+            'response': f'Sorry, bir hata oluştu: {str(e)}',
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/health/rag', methods=['GET'])
+def rag_health():
+    """RAG sistemi hazır olma kontrolü (readiness probe)"""
+    ensure_rag_warmup()
+    return jsonify({
+        'status': rag_status,
+        'ready': rag_status == 'ready',
+        'error': rag_error,
+        'since': rag_status_changed_at.isoformat() if rag_status_changed_at else None
+    }), 200 if rag_status == 'ready' else 503
+
+@app.route('/api/health/llm-cache', methods=['GET'])
+def llm_cache_health():
+    """LLM yanıt önbelleği isabet/ıskalama sayaçları (süreç başına) ve kayıt sayıları"""
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('SELECT kind, COUNT(*) FROM llm_cache GROUP BY kind')
+        entries = {kind: count for kind, count in cursor.fetchall()}
+        conn.close()
+        
+        with llm_cache_metrics_lock:
+            metrics = dict(llm_cache_metrics)
+        lookups = metrics['hits'] + metrics['misses']
+        
+        return jsonify({
+            'enabled': LLM_CACHE_ENABLED,
+            'metrics': metrics,
+            'hit_ratio': round(metrics['hits'] / lookups, 3) if lookups else None,
+            'entries': entries,
+            'max_entries': LLM_CACHE_MAX_ENTRIES,
+            'ttl_seconds': LLM_CACHE_TTL_SECONDS,
+            'chat_cache': {
+                'enabled': CHAT_CACHE_ENABLED,
+                'threshold': CHAT_CACHE_THRESHOLD,
+                **chat_cache.stats()
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+@app.route('/api/health/http', methods=['GET'])
+def http_client_health():
+    """Dış HTTP çağrılarının host başına gecikme metrikleri ve devre kesici durumu (süreç başına)"""
+    try:
+        return jsonify({
+            'connect_timeout_seconds': HTTP_CONNECT_TIMEOUT_SECONDS,
+            'read_timeout_seconds': HTTP_READ_TIMEOUT_SECONDS,
+            'max_retries': HTTP_MAX_RETRIES,
+            'hosts': http_client.stats()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
 @app.route('/api/user-tournament-wins', methods=['GET'])
 def get_user_tournament_wins():
     """Kullanıcının kazandığı turnuvaları getir"""
@@ -2729,10 +5267,10 @@ def get_user_tournament_wins():
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
-        # Kullanıcının 1. olduğu turnuvaları bul - daha basit sorgu
+        # Kullanıcının 1. olduğu turnuvaları bul - en iyi skor tournament_summary'den gelir
         cursor.execute('''
             SELECT 
                 t.id as tournament_id,
@@ -2741,22 +5279,13 @@ def get_user_tournament_wins():
                 tp.correct_answers,
                 tp.total_questions,
                 tp.completed_at,
-                (
-                    SELECT COUNT(*) 
-                    FROM tournament_participants tp2 
-                    WHERE tp2.tournament_id = t.id 
-                        AND tp2.completed_at IS NOT NULL
-                ) as total_participants
+                ts.completed_count as total_participants
             FROM tournament_participants tp
+            JOIN tournament_summary ts ON ts.tournament_id = tp.tournament_id
             JOIN tournaments t ON tp.tournament_id = t.id
             WHERE tp.user_id = ? 
                 AND tp.completed_at IS NOT NULL
-                AND tp.correct_answers = (
-                    SELECT MAX(correct_answers) 
-                    FROM tournament_participants tp2 
-                    WHERE tp2.tournament_id = tp.tournament_id 
-                        AND tp2.completed_at IS NOT NULL
-                )
+                AND tp.correct_answers = ts.best_correct
             ORDER BY tp.completed_at DESC
             LIMIT 4
         ''', (payload['user_id'],))
@@ -2813,7 +5342,7 @@ def debug_tournament_data():
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Kullanıcının tüm turnuva katılımlarını getir
@@ -2885,7 +5414,7 @@ def debug_tournament_data():
 def test_db():
     """Veritabanındaki turnuva verilerini test et"""
     try:
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Tüm turnuvaları listele
@@ -2934,7 +5463,7 @@ def get_completed_courses():
             return jsonify({'error': 'Geçersiz token'}), 401
         
         # Veritabanından tamamlanan kursları getir
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -3021,7 +5550,7 @@ def get_active_course():
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Geçersiz token'}), 401
         
-        conn = sqlite3.connect('database.db')
+        conn = get_db()
         cursor = conn.cursor()
         
         # Kullanıcının en son eklediği aktif kursu bul
@@ -3098,5 +5627,61 @@ def get_active_course():
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
+@app.cli.command('rebuild-user-stats')
+def rebuild_user_stats_command():
+    """Genel sıralama özet tablosunu (user_stats) baştan oluştur"""
+    conn = get_db()
+    cursor = conn.cursor()
+    refresh_user_stats(cursor)
+    conn.commit()
+    cursor.execute('SELECT COUNT(*) FROM user_stats')
+    print(f"user_stats yeniden oluşturuldu: {cursor.fetchone()[0]} kullanıcı")
+    conn.close()
+
+@app.cli.command('rebuild-tournament-summary')
+def rebuild_tournament_summary_command():
+    """Kazanan tespiti özet tablosunu (tournament_summary) baştan oluştur"""
+    conn = get_db()
+    cursor = conn.cursor()
+    refresh_tournament_summary(cursor)
+    conn.commit()
+    cursor.execute('SELECT COUNT(*) FROM tournament_summary')
+    print(f"tournament_summary yeniden oluşturuldu: {cursor.fetchone()[0]} turnuva")
+    conn.close()
+
+@app.cli.command('fill-question-bank')
+@click.argument('topic')
+@click.option('--difficulty', default='medium', type=click.Choice(list(QUESTION_DIFFICULTY_LABELS)))
+@click.option('--count', default=QUESTION_BANK_FILL_SIZE, show_default=True)
+def fill_question_bank_command(topic, difficulty, count):
+    """Soru bankasını bir konu için önceden doldur"""
+    added = fill_question_bank(topic, difficulty, count)
+    print(f"{topic} ({difficulty}) için bankaya {added} soru eklendi")
+
+@app.cli.command('resolve-chromedriver')
+def resolve_chromedriver_command():
+    """chromedriver'ı dağıtım sırasında indirip yolunu yazdır (worker'lar önbellekteki sürücüyü kullanır)"""
+    print(f"chromedriver: {get_chromedriver_path()}")
+
+@app.cli.command('warm-course-sections')
+@click.argument('urls', nargs=-1)
+@click.option('--limit', default=50, show_default=True, help='URL verilmezse en çok eklenen kurs sayısı')
+def warm_course_sections_command(urls, limit):
+    """Kurs bölümleri önbelleğini verilen (veya en çok eklenen) kurslar için doldur"""
+    if not urls:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT course_link FROM user_courses
+            GROUP BY course_link ORDER BY COUNT(*) DESC LIMIT ?
+        ''', (limit,))
+        urls = [row[0] for row in cursor.fetchall()]
+        conn.close()
+    
+    for course_url in urls:
+        sections = refresh_course_sections(course_url)
+        print(f"{course_url}: {len(sections)} bölüm")
+    print(f"{len(urls)} kurs önbelleğe alındı")
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000) 
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""Başlangıç maliyeti ölçümü: app.py import süresi ve bellek (RSS) kullanımı
+
+Her ölçüm temiz bir Python sürecinde, varsayılan ayarlarla (RAG_WARMUP_ON_START dahil) yapılır:
+- lazy:  app.py'nin şu anki hali (ağır modüller ilk kullanımda yüklenir)
+- eager: ağır modüller eskisi gibi import anında yüklenirse oluşacak maliyet
+
+Import anında başlayan arka plan thread'leri de raporlanır; bir ısınma thread'i ağır
+modülleri ölçümden hemen sonra yükleyeceği için lazy sonucunda boş olmalıdır.
+
+Kullanım: python bench_startup.py [--runs 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "selenium.webdriver",
+    "webdriver_manager.chrome",
+    "bs4",
+    "google.generativeai",
+    "langchain_community.document_loaders",
+    "langchain_text_splitters",
+    "langchain_google_genai",
+    "langchain_chroma",
+    "langchain.chains",
+    "langchain_core.prompts",
+]
+
+PROBE = r'''
+import importlib, json, sys, threading, time
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+heavy = %(heavy)r
+mode = %(mode)r
+
+# Import sırasında başlatılan thread'leri kaydet (hemen bitenler dahil)
+started_threads = []
+thread_start = threading.Thread.start
+def recording_start(thread):
+    started_threads.append(thread.name)
+    thread_start(thread)
+threading.Thread.start = recording_start
+
+rss_before = rss_kb()
+started = time.perf_counter()
+if mode == "eager":
+    for name in heavy:
+        importlib.import_module(name)
+import app
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "import_seconds": elapsed,
+    "rss_before_kb": rss_before,
+    "rss_after_kb": rss_kb(),
+    "heavy_loaded": [name for name in heavy if name in sys.modules],
+    "threads": started_threads,
+}))
+'''
+
+
+def run_probe(mode):
+    """Ölçümü ayrı bir süreçte çalıştır ve sonucunu döndür"""
+    # Kabuktaki ayarlar değil, uygulamanın varsayılanları ölçülür
+    env = {name: value for name, value in os.environ.items()
+           if not name.endswith("_WARMUP_ON_START") and not name.endswith("_RESOLVE_ON_START")}
+    code = PROBE % {"heavy": HEAVY_MODULES, "mode": mode}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for mode in ("eager", "lazy"):
+        try:
+            samples = [run_probe(mode) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{mode:>5}: ölçülemedi ({e})")
+            continue
+
+        best = min(samples, key=lambda sample: sample["import_seconds"])
+        rss_mb = best["rss_after_kb"] / 1024
+        delta_mb = (best["rss_after_kb"] - best["rss_before_kb"]) / 1024
+        print(
+            f"{mode:>5}: import {best['import_seconds'] * 1000:8.1f} ms | "
+            f"RSS {rss_mb:7.1f} MB (+{delta_mb:.1f} MB) | "
+            f"yüklenen ağır modül: {len(best['heavy_loaded'])}/{len(HEAVY_MODULES)} | "
+            f"import anında başlayan thread: {', '.join(best['threads']) or 'yok'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
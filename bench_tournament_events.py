@@ -0,0 +1,198 @@
+"""Canlı turnuva kanalı yük testi: bağlı istemci başına SQLite sorgu sayısı
+
+Geçici bir veritabanı ve yerel bir sunucu üzerinde:
+- polling: eski sayfa zamanlayıcılarının (30 s sayım, 60 s sıralama, 60 s istatistik,
+  5 dk takvim) bir istemci için dakikada yaptığı sorgu sayısı
+- sse:     N istemci /api/tournament-events akışına bağlıyken boşta geçen sürede
+  ve tek bir tamamlama olayında yapılan sorgu sayısı
+
+Kullanım: python bench_tournament_events.py [--clients 50] [--idle 5]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class QueryCounter:
+    """sqlite3 trace callback ile çalıştırılan SQL ifadelerini say (PRAGMA hariç)"""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, statement):
+        if not statement.lstrip().upper().startswith(('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK')):
+            with self.lock:
+                self.count += 1
+
+    def value(self):
+        with self.lock:
+            return self.count
+
+
+def install_counter(app, counter):
+    """Havuzdaki bağlantıları kapat; yeni açılanlara sayacı bağla"""
+    while True:
+        try:
+            app.db_pool.get_nowait().close()
+        except Exception:
+            break
+
+    open_connection = app.open_db_connection
+
+    def counted_connection():
+        conn = open_connection()
+        conn.set_trace_callback(counter)
+        return conn
+
+    app.open_db_connection = counted_connection
+
+
+def seed(client, participants):
+    """Yönetici, katılımcılar ve devam eden bir turnuva oluştur"""
+    def register(index):
+        response = client.post('/api/register', json={
+            'first_name': f'Y{index}', 'last_name': 'Test',
+            'email': f'bench{index}@test.com', 'password': '123456'
+        })
+        return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    admin = register(0)
+    now = datetime.now()
+    questions = [{'question': f'Soru {i}', 'options': ['a', 'b', 'c', 'd'], 'correct_option': 'A'} for i in range(3)]
+    response = client.post('/api/save-tournament', headers=admin, json={
+        'title': 'Yük Testi', 'content': 'Python', 'question_count': 3, 'duration_minutes': 10,
+        'start_time': (now - timedelta(hours=1)).isoformat(),
+        'end_time': (now + timedelta(hours=1)).isoformat(),
+        'questions': questions
+    })
+    tournament_id = response.get_json()['tournament_id']
+    users = [register(index) for index in range(1, participants + 1)]
+    return tournament_id, admin, users
+
+
+def finish(client, tournament_id, headers):
+    """Katılımcıyı turnuvaya sokup tüm soruları cevaplat ve tamamla"""
+    client.post('/api/join-tournament', headers=headers, json={'tournament_id': tournament_id})
+    questions = client.get(f'/api/tournament-questions/{tournament_id}', headers=headers).get_json()['questions']
+    for question in questions:
+        client.post('/api/answer-question', headers=headers, json={
+            'tournament_id': tournament_id, 'question_id': question['id'], 'selected_option': 'A'
+        })
+    client.post('/api/complete-tournament', headers=headers, json={'tournament_id': tournament_id})
+
+
+def measure_polling(app, client, counter, tournament_id, headers):
+    """Eski zamanlayıcıların bir istemci için dakikadaki sorgu sayısı"""
+    app.invalidate_weekly_calendar()
+    per_call = {}
+    for name, path in (
+        ('participant-count', f'/api/tournament-participant-count/{tournament_id}'),
+        ('leaderboard', f'/api/leaderboard/{tournament_id}'),
+        ('stats', f'/api/tournament-stats/{tournament_id}'),
+        ('calendar', '/api/weekly-tournament-calendar'),
+    ):
+        before = counter.value()
+        client.get(path, headers=headers)
+        per_call[name] = counter.value() - before
+
+    # Dakikadaki çağrı sayısı: 30 s, 60 s, 60 s, 5 dk
+    polling = (per_call['participant-count'] * 2 + per_call['leaderboard'] + per_call['stats']
+               + per_call['calendar'] / 5)
+    # Bağlıyken 2 dakikada bir yapılan yedek güncelleme (sayım, sıralama, istatistik)
+    fallback = (per_call['participant-count'] + per_call['leaderboard'] + per_call['stats']) / 2
+    return polling, fallback
+
+
+def open_streams(base_url, tournament_id, clients):
+    """N SSE istemcisi bağla; ilk anlık görüntü gelene kadar bekle"""
+    import requests
+
+    ready = threading.Barrier(clients + 1, timeout=60)
+    stop = threading.Event()
+    received = []
+    lock = threading.Lock()
+
+    def listen():
+        with requests.get(f'{base_url}/api/tournament-events/{tournament_id}', stream=True, timeout=60) as response:
+            snapshot_seen = False
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith('event:'):
+                    with lock:
+                        received.append(line)
+                    if not snapshot_seen and line == 'event: leaderboard':
+                        snapshot_seen = True
+                        ready.wait()
+                if stop.is_set():
+                    break
+
+    threads = [threading.Thread(target=listen, daemon=True) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    return stop, received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--idle', type=float, default=5.0, help='Boşta ölçüm süresi (saniye)')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_PATH'] = os.path.join(tmp_dir.name, 'bench.db')
+    os.environ['RAG_WARMUP_ON_START'] = '0'
+    os.environ['CHROMEDRIVER_RESOLVE_ON_START'] = '0'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import app
+    from werkzeug.serving import make_server
+
+    counter = QueryCounter()
+    install_counter(app, counter)
+    client = app.app.test_client()
+    tournament_id, admin, users = seed(client, participants=2)
+
+    polling_per_minute, fallback_per_minute = measure_polling(app, client, counter, tournament_id, admin)
+    print(f"polling: istemci başına dakikada {polling_per_minute:.1f} sorgu "
+          f"({args.clients} istemci: {polling_per_minute * args.clients:.0f} sorgu/dk)")
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    before_connect = counter.value()
+    stop, received = open_streams(base_url, tournament_id, args.clients)
+    connect_queries = counter.value() - before_connect
+
+    before_idle = counter.value()
+    time.sleep(args.idle)
+    idle_queries = counter.value() - before_idle
+    idle_per_minute = idle_queries / args.clients * 60 / args.idle
+
+    events_before = len(received)
+    before_completion = counter.value()
+    finish(client, tournament_id, users[0])
+    time.sleep(app.SSE_STATS_FLUSH_SECONDS * 2)
+    completion_queries = counter.value() - before_completion
+    delivered = len(received) - events_before
+
+    print(f"    sse: bağlanırken istemci başına {connect_queries / args.clients:.1f} sorgu (tek seferlik)")
+    print(f"    sse: boşta istemci başına dakikada {idle_per_minute:.2f} sorgu ({idle_queries} sorgu / {args.idle:.0f} s)")
+    print(f"    sse: yedek güncelleme ile istemci başına dakikada {fallback_per_minute:.1f} sorgu")
+    print(f"    sse: bir tamamlama {completion_queries} sorgu, {delivered} olay "
+          f"({args.clients} istemciye; istemci sayısından bağımsız)")
+
+    stop.set()
+    server.shutdown()
+    tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
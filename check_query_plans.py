@@ -0,0 +1,44 @@
+"""Sıcak yol sorgularının EXPLAIN QUERY PLAN regresyon kontrolü
+
+Boş bir geçici veritabanında şema ve migrasyonlar uygulanır, ardından
+app.HOT_QUERIES içindeki her sorgunun planı kontrol edilir. Herhangi bir
+sorgu tam tablo taramasına (SCAN) düşerse çıkış kodu 1 olur.
+
+Kullanım: python check_query_plans.py [--db mevcut.db]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Kontrol edilecek veritabanı (varsayılan: geçici boş veritabanı)")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.db:
+        os.environ["DATABASE_PATH"] = args.db
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(tmp_dir.name, "plan_check.db")
+    os.environ["RAG_WARMUP_ON_START"] = "0"
+
+    import app
+
+    failed = False
+    for result in app.explain_hot_queries():
+        status = "SCAN" if result["full_scans"] else "OK"
+        failed = failed or bool(result["full_scans"])
+        print(f"[{status:>4}] {result['name']}")
+        for detail in result["plan"]:
+            print(f"         {detail}")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,7 +29,91 @@ document.addEventListener("DOMContentLoaded", function () {
         // Loading mesajı göster
         const loadingId = addLoadingMessage();
 
-        // API'ye gönder
+        // Akış desteklenmiyorsa tek parça yanıt bekle
+        if (!window.ReadableStream || !window.TextDecoder) {
+          sendMessageWithoutStreaming(message, loadingId);
+          return;
+        }
+
+        // API'ye gönder, yanıtı geldikçe göster
+        fetch("/api/chat/stream", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({ message: message }),
+        })
+          .then((response) => {
+            const contentType = response.headers.get("Content-Type") || "";
+            if (!contentType.startsWith("text/event-stream")) {
+              // Hazırlanıyor / kullanılamıyor gibi durumlar normal JSON döner
+              return response.json().then((data) => {
+                removeLoadingMessage(loadingId);
+                addMessageToChat("bot", data.response);
+              });
+            }
+            return readChatStream(response, loadingId);
+          })
+          .catch((error) => {
+            console.error("Chat hatası:", error);
+            removeLoadingMessage(loadingId);
+            addMessageToChat("bot", "Üzgünüm, bir hata oluştu. Lütfen tekrar deneyin.");
+          });
+      }
+
+      // SSE yanıtını okuyup bot mesajını parça parça güncelle
+      async function readChatStream(response, loadingId) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let botMessage = null;
+
+        const appendText = (text) => {
+          if (!botMessage) {
+            removeLoadingMessage(loadingId);
+            botMessage = addMessageToChat("bot", "");
+          }
+          botMessage.text.textContent += text;
+          botMessage.entry.message += text;
+          chatArea.scrollTop = chatArea.scrollHeight;
+        };
+
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          // Olaylar boş satırla ayrılır
+          let separator;
+          while ((separator = buffer.indexOf("\n\n")) !== -1) {
+            const rawEvent = buffer.slice(0, separator);
+            buffer = buffer.slice(separator + 2);
+
+            let eventName = "message";
+            let eventData = "";
+            rawEvent.split("\n").forEach((line) => {
+              if (line.startsWith("event: ")) eventName = line.slice(7);
+              else if (line.startsWith("data: ")) eventData += line.slice(6);
+            });
+            if (!eventData) continue;
+
+            const payload = JSON.parse(eventData);
+            if (eventName === "token") {
+              appendText(payload.text);
+            } else if (eventName === "error") {
+              appendText(payload.response);
+            }
+          }
+        }
+
+        if (!botMessage) {
+          removeLoadingMessage(loadingId);
+          addMessageToChat("bot", "Üzgünüm, bir hata oluştu. Lütfen tekrar deneyin.");
+        }
+      }
+
+      // Tek parça yanıt (eski tarayıcılar için)
+      function sendMessageWithoutStreaming(message, loadingId) {
         fetch("/api/chat", {
           method: "POST",
           headers: {
@@ -89,7 +173,11 @@ document.addEventListener("DOMContentLoaded", function () {
         chatArea.scrollTop = chatArea.scrollHeight;
         
         // Chat geçmişine ekle
-        chatHistory.push({ sender, message, timestamp });
+        const entry = { sender, message, timestamp };
+        chatHistory.push(entry);
+
+        // Akış sırasında metni güncelleyebilmek için
+        return { text: messageDiv.querySelector("p"), entry };
       }
 
       // Loading mesajı ekle
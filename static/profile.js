@@ -72,18 +72,27 @@ function logout() {
     window.location.href = '/';
 }
 
-// Turnuva kazanımlarını yükle
-async function loadTournamentWins() {
-    try {
+// Turnuva kazanımları sayfa başına bir kez istenir, iki bölüm aynı yanıtı kullanır
+let tournamentWinsPromise = null;
+
+function fetchTournamentWins() {
+    if (!tournamentWinsPromise) {
         const token = localStorage.getItem('authToken');
-        const response = await fetch('/api/user-tournament-wins', {
+        tournamentWinsPromise = fetch('/api/user-tournament-wins', {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
-        });
+        }).then(response => response.ok ? response.json() : null);
+    }
+    return tournamentWinsPromise;
+}
 
-        if (response.ok) {
-            const data = await response.json();
+// Turnuva kazanımlarını yükle
+async function loadTournamentWins() {
+    try {
+        const data = await fetchTournamentWins();
+
+        if (data) {
             console.log('API Response:', data);
             const container = document.getElementById('tournamentWinsContainer');
             const noWinsMessage = document.getElementById('noWinsMessage');
@@ -206,14 +215,9 @@ async function loadCompletedCourses() {
                     const remainingSlots = 4 - data.completed_courses.length;
                     
                     // Turnuva kazanımları varsa ekle
-                    const tournamentWinsResponse = await fetch('/api/user-tournament-wins', {
-                        headers: {
-                            'Authorization': `Bearer ${token}`
-                        }
-                    });
+                    const winsData = await fetchTournamentWins();
                     
-                    if (tournamentWinsResponse.ok) {
-                        const winsData = await tournamentWinsResponse.json();
+                    if (winsData) {
                         if (winsData.tournament_wins && winsData.tournament_wins.length > 0) {
                             winsData.tournament_wins.slice(0, remainingSlots).forEach((win, index) => {
                                 const activityItem = document.createElement('div');
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+# app.py içe aktarılırken veritabanını kurar; testler geçici bir veritabanı kullanır
+TEST_DIR = tempfile.mkdtemp(prefix='app-tests-')
+os.environ['DATABASE_PATH'] = os.path.join(TEST_DIR, 'test.db')
+os.environ['RAG_WARMUP_ON_START'] = '0'
+os.environ['CHROMEDRIVER_RESOLVE_ON_START'] = '0'
+os.environ.setdefault('QUESTION_LLM_BACKEND', 'fake')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    return app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def register_user(client):
+    """Yeni bir kullanıcı kaydedip (user_id, Authorization başlığı) döndür"""
+    def register():
+        email = f"{uuid.uuid4().hex[:10]}@test.com"
+        response = client.post('/api/register', json={
+            'first_name': 'Test', 'last_name': 'User', 'email': email, 'password': '123456'
+        })
+        body = response.get_json()
+        return body['user']['id'], {'Authorization': f"Bearer {body['token']}"}
+    return register
+
+
+@pytest.fixture
+def create_tournament(client, register_user):
+    """Devam eden, doğru cevabı hep 'A' olan bir turnuva oluşturup id'sini döndür"""
+    def create(question_count=3):
+        _, headers = register_user()
+        now = datetime.now()
+        response = client.post('/api/save-tournament', headers=headers, json={
+            'title': 'Test Turnuvası', 'content': 'Python', 'question_count': question_count,
+            'duration_minutes': 10,
+            'start_time': (now - timedelta(hours=1)).isoformat(),
+            'end_time': (now + timedelta(hours=1)).isoformat(),
+            'questions': [{'question': f'Soru {index}', 'options': ['a', 'b', 'c', 'd'], 'correct_option': 'A'}
+                          for index in range(question_count)]
+        })
+        return response.get_json()['tournament_id']
+    return create
@@ -0,0 +1,95 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def execute_script(self, script):
+        if self.closed:
+            raise RuntimeError('kapalı')
+        return 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(app, monkeypatch):
+    monkeypatch.setattr(app, 'create_chrome_driver', FakeDriver)
+    return app.BrowserPool(size=1, max_pages=50)
+
+
+def test_session_is_reused(pool):
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second
+    assert pool.created == 1
+
+
+def test_discard_wakes_waiter(pool):
+    entry = pool.acquire()
+    acquired = {}
+
+    def wait_for_session():
+        started = time.monotonic()
+        acquired['entry'] = pool.acquire()
+        acquired['waited'] = time.monotonic() - started
+
+    waiter = threading.Thread(target=wait_for_session)
+    waiter.start()
+    time.sleep(0.1)
+    # Hatalı oturum kapatılır; bekleyen 15 s beklemeden yeni oturum açmalı
+    pool.release(entry, healthy=False)
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert acquired['entry']['driver'] is not entry['driver']
+    assert acquired['waited'] < 2
+    assert pool.created == 1
+
+
+def test_wakeup_marker_without_waiter_is_skipped(pool):
+    pool.release(pool.acquire(), healthy=False)
+    entry = pool.acquire()
+    assert entry['driver'].closed is False
+    assert pool.created == 1
+    pool.release(entry)
+    pool.close()
+    assert entry['driver'].closed is True
+
+
+def test_first_scrape_waits_for_background_resolve(app, monkeypatch):
+    installs = []
+
+    class FakeChromeDriverManager:
+        def install(self):
+            installs.append(threading.current_thread().name)
+            time.sleep(0.2)
+            return '/opt/chromedriver'
+
+    fake_module = types.ModuleType('webdriver_manager.chrome')
+    fake_module.ChromeDriverManager = FakeChromeDriverManager
+    monkeypatch.setitem(sys.modules, 'webdriver_manager', types.ModuleType('webdriver_manager'))
+    monkeypatch.setitem(sys.modules, 'webdriver_manager.chrome', fake_module)
+    monkeypatch.delenv('CHROMEDRIVER_PATH', raising=False)
+    monkeypatch.setattr(app, 'chromedriver_path', None)
+    monkeypatch.setattr(app, 'chromedriver_resolve_pid', None)
+
+    app.ensure_chromedriver_resolve()
+    # Çözüm sürerken gelen ilk scrape aynı kilitte bekler, ikinci indirme yapmaz
+    assert app.get_chromedriver_path() == '/opt/chromedriver'
+    for thread in threading.enumerate():
+        if thread.name == 'chromedriver-resolve':
+            thread.join(5)
+    assert len(installs) == 1
@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+import pytest
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def angled(cosine):
+    """[1, 0] ile kosinüs benzerliği verilen değer olan birim vektör"""
+    return unit(cosine, math.sqrt(1 - cosine ** 2))
+
+
+@pytest.fixture
+def cache(app):
+    return app.SemanticChatCache(max_entries=3, ttl_seconds=60, threshold=0.9)
+
+
+def test_similarity_threshold(cache):
+    cache.put('python nedir', unit(1, 0), 'Bir programlama dili')
+
+    assert cache.get_similar(angled(0.95)) == 'Bir programlama dili'
+    assert cache.get_similar(angled(0.85)) is None
+    assert cache.stats()['semantic_hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_closest_entry_wins(cache):
+    cache.put('a', unit(1, 0), 'A')
+    cache.put('b', angled(0.92), 'B')
+
+    assert cache.get_similar(angled(0.99)) == 'A'
+    assert cache.get_similar(angled(0.93)) == 'B'
+
+
+def test_expired_entries_are_not_served(cache):
+    cache.put('python nedir', unit(1, 0), 'eski')
+    cache.entries['python nedir']['created_at'] -= 61
+
+    assert cache.get_exact('python nedir') is None
+    assert cache.get_similar(unit(1, 0)) is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for key in ('a', 'b', 'c'):
+        cache.put(key, None, key.upper())
+    cache.get_exact('a')
+
+    cache.put('d', None, 'D')
+
+    assert list(cache.entries) == ['c', 'a', 'd']
+
+
+def test_index_change_clears_entries(cache):
+    cache.reset('v1')
+    cache.put('a', unit(1, 0), 'A')
+    cache.reset('v1')
+    assert cache.get_exact('a') == 'A'
+
+    cache.reset('v2')
+    assert cache.get_exact('a') is None
+
+
+def test_lookup_uses_exact_match_before_embedding(app, monkeypatch):
+    class Embeddings:
+        calls = []
+
+        def embed_query(self, message):
+            self.calls.append(message)
+            return [1.0, 0.0] if 'python' in message.lower() else [0.0, 1.0]
+
+    embeddings = Embeddings()
+    monkeypatch.setattr(app, 'rag_embeddings', embeddings)
+    monkeypatch.setattr(app, 'chat_cache', app.SemanticChatCache(10, 60, 0.9))
+
+    answer, vector = app.lookup_chat_cache('Python nedir?')
+    assert answer is None
+    app.store_chat_cache('Python nedir?', vector, 'Bir programlama dili')
+
+    # Büyük/küçük harf ve boşluk farkı: embedding çağrılmadan birebir eşleşir
+    assert app.lookup_chat_cache('  python nedir? ') == ('Bir programlama dili', None)
+    assert len(embeddings.calls) == 1
+    # Farklı ama benzer soru embedding ile eşleşir, alakasız soru eşleşmez
+    assert app.lookup_chat_cache('Python ne işe yarar?')[0] == 'Bir programlama dili'
+    assert app.lookup_chat_cache('Git nedir?')[0] is None
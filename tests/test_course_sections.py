@@ -0,0 +1,140 @@
+import uuid
+
+import pytest
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append((function, args))
+
+    def run_all(self):
+        for function, args in self.submitted:
+            function(*args)
+        self.submitted = []
+
+
+@pytest.fixture
+def fetches(app, monkeypatch):
+    """fetch_course_sections çağrılarını kaydeden ve sıradaki sonucu döndüren sahte kazıyıcı"""
+    calls = []
+    results = []
+
+    def fake_fetch(course_url, etag=None, last_modified=None):
+        calls.append({'url': course_url, 'etag': etag, 'last_modified': last_modified})
+        result = {'sections': [], 'source': 'demo', 'etag': None, 'last_modified': None, 'not_modified': False}
+        result.update(results.pop(0))
+        return result
+
+    monkeypatch.setattr(app, 'fetch_course_sections', fake_fetch)
+    return calls, results
+
+
+@pytest.fixture
+def executor(app, monkeypatch):
+    recording = RecordingExecutor()
+    monkeypatch.setattr(app, 'get_course_sections_executor', lambda: recording)
+    yield recording
+    app.course_sections_refreshing.clear()
+
+
+def course_url():
+    return f'https://example.com/kurs/{uuid.uuid4().hex[:8]}'
+
+
+def age_entry(app, url, seconds):
+    conn = app.get_db()
+    conn.execute('UPDATE course_sections SET checked_at = ? WHERE url = ?', (app.utc_timestamp(-seconds), url))
+    conn.commit()
+    conn.close()
+
+
+def scraped(sections, etag='"v1"'):
+    return {'sections': sections, 'source': 'requests', 'etag': etag, 'last_modified': None}
+
+
+def test_miss_scrapes_once_then_serves_fresh_entry(app, fetches, executor):
+    calls, results = fetches
+    url = course_url()
+    results.append(scraped(['1. Giriş']))
+
+    assert app.get_course_sections(url) == ['1. Giriş']
+    assert app.get_course_sections(url) == ['1. Giriş']
+    assert len(calls) == 1
+    assert executor.submitted == []
+
+
+def test_stale_entry_is_served_and_revalidated_in_background(app, fetches, executor):
+    calls, results = fetches
+    url = course_url()
+    results.append(scraped(['1. Giriş']))
+    app.get_course_sections(url)
+    age_entry(app, url, app.COURSE_SECTIONS_FRESH_SECONDS + 60)
+
+    # Bayat kayıt beklemeden döner; ikinci okuma ikinci bir yenileme açmaz
+    assert app.get_course_sections(url) == ['1. Giriş']
+    assert app.get_course_sections(url) == ['1. Giriş']
+    assert len(executor.submitted) == 1
+    assert len(calls) == 1
+
+    results.append({'not_modified': True})
+    executor.run_all()
+
+    # Koşullu GET kayıttaki ETag ile yapılır; 304 kaydı tazeler
+    assert calls[1]['etag'] == '"v1"'
+    assert url not in app.course_sections_refreshing
+    assert app.get_course_sections(url) == ['1. Giriş']
+    assert executor.submitted == []
+
+
+def test_background_refresh_stores_changed_sections(app, fetches, executor):
+    calls, results = fetches
+    url = course_url()
+    results.append(scraped(['1. Giriş']))
+    app.get_course_sections(url)
+    age_entry(app, url, app.COURSE_SECTIONS_FRESH_SECONDS + 60)
+
+    app.get_course_sections(url)
+    results.append(scraped(['1. Giriş', '2. Yeni Bölüm'], etag='"v2"'))
+    executor.run_all()
+
+    assert app.get_course_sections(url) == ['1. Giriş', '2. Yeni Bölüm']
+
+
+def test_too_old_entry_is_scraped_during_request(app, fetches, executor):
+    calls, results = fetches
+    url = course_url()
+    results.append(scraped(['1. Eski']))
+    app.get_course_sections(url)
+    age_entry(app, url, app.COURSE_SECTIONS_STALE_SECONDS + 60)
+
+    results.append(scraped(['1. Yeni'], etag='"v2"'))
+    assert app.get_course_sections(url) == ['1. Yeni']
+    assert len(calls) == 2
+    assert executor.submitted == []
+
+
+def test_unreachable_source_keeps_real_sections(app, fetches, executor):
+    calls, results = fetches
+    url = course_url()
+    results.append(scraped(['1. Giriş']))
+    app.get_course_sections(url)
+
+    results.append({'sections': ['1. Tanıtım'], 'source': 'demo'})
+    assert app.refresh_course_sections(url) == ['1. Giriş']
+    assert app.load_course_sections_row(url)[1] == 'requests'
+
+
+def test_demo_entry_expires_sooner(app, fetches, executor):
+    calls, results = fetches
+    url = course_url()
+    results.append({'sections': ['1. Tanıtım'], 'source': 'demo'})
+    app.get_course_sections(url)
+    age_entry(app, url, app.COURSE_SECTIONS_DEMO_SECONDS + 60)
+
+    app.get_course_sections(url)
+
+    # Demo kayıt bir saat sonra bayat sayılır ve yeniden denenir
+    assert len(executor.submitted) == 1
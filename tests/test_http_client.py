@@ -0,0 +1,92 @@
+import socket
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    hits = Counter()
+
+    def do_GET(self):
+        # Yol yanıt kodunu belirler: /503, /429, /200
+        status = int(self.path.strip('/').split('?')[0])
+        Handler.hits[status] += 1
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    Handler.hits.clear()
+    monkeypatch.setattr(app, 'HTTP_BACKOFF_FACTOR', 0)
+    monkeypatch.setattr(app, 'HTTP_MAX_RETRIES', 2)
+    monkeypatch.setattr(app, 'HTTP_CIRCUIT_FAILURE_THRESHOLD', 3)
+    return app.OutboundHTTPClient()
+
+
+def test_server_errors_are_retried(client, server):
+    response = client.get(f'{server}/503')
+    assert response.status_code == 503
+    assert Handler.hits[503] == 3
+
+
+def test_retries_can_be_disabled_per_call(client, server):
+    response = client.get(f'{server}/503', retries=0)
+    assert response.status_code == 503
+    assert Handler.hits[503] == 1
+
+
+def test_circuit_opens_after_consecutive_failures(app, client, server):
+    for _ in range(3):
+        client.get(f'{server}/503', retries=0)
+    assert client.is_open(server)
+
+    with pytest.raises(app.CircuitOpenError):
+        client.get(f'{server}/200')
+    assert Handler.hits[200] == 0
+    assert client.stats()[server.split('//')[1]]['rejected'] == 1
+
+
+def test_rate_limit_counts_as_failure(client, server):
+    for _ in range(3):
+        assert client.get(f'{server}/429', retries=0).status_code == 429
+    assert client.is_open(server)
+
+
+def test_half_open_probe_closes_circuit(app, client, server, monkeypatch):
+    monkeypatch.setattr(app, 'HTTP_CIRCUIT_RESET_SECONDS', 0)
+    for _ in range(3):
+        client.get(f'{server}/503', retries=0)
+    host = server.split('//')[1]
+    assert client.stats()[host]['circuit'] == 'half-open'
+
+    # Süre doldu: tek deneme isteği geçer, başarılıysa devre kapanır
+    assert client.get(f'{server}/200').status_code == 200
+    assert client.stats()[host]['circuit'] == 'closed'
+    assert client.stats()[host]['consecutive_failures'] == 0
+
+
+def test_connection_errors_count_as_failures(app, client):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        url = f'http://127.0.0.1:{sock.getsockname()[1]}/'
+    for _ in range(3):
+        with pytest.raises(app.requests.ConnectionError):
+            client.get(url, retries=0)
+    assert client.is_open(url)
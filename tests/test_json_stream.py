@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+QUESTIONS = [
+    {'question': 'Süslü { parantez } ve "tırnak" içeren soru?', 'options': ['a', 'b', 'c', 'd'], 'correct_option': 'A'},
+    {'question': 'Ters bölü \\ ile biten\\', 'options': ['a, }', 'b]', 'c', 'd'], 'correct_option': 'B'},
+    {'question': 'Üçüncü soru', 'options': ['a', 'b', 'c', 'd'], 'correct_option': 'C'},
+]
+REQUIRED = ('question', 'options', 'correct_option')
+
+
+def feed_in_chunks(app, text, size):
+    parser = app.StreamingJSONObjectParser(REQUIRED)
+    decoded = []
+    for offset in range(0, len(text), size):
+        decoded.extend(parser.feed(text[offset:offset + size]))
+    return parser, decoded
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 10000])
+def test_objects_survive_any_chunk_boundary(app, size):
+    text = '```json\n' + json.dumps({'questions': QUESTIONS}, ensure_ascii=False) + '\n```'
+
+    _, decoded = feed_in_chunks(app, text, size)
+
+    assert decoded == QUESTIONS
+
+
+def test_escaped_quotes_and_backslashes(app):
+    text = r'[{"question":"\"alıntı\" ve \\","options":["a","b","c","d"],"correct_option":"A"}]'
+
+    _, decoded = feed_in_chunks(app, text, 1)
+
+    assert decoded == [{'question': '"alıntı" ve \\', 'options': ['a', 'b', 'c', 'd'], 'correct_option': 'A'}]
+
+
+def test_truncated_tail_is_dropped_without_breaking_earlier_objects(app):
+    text = json.dumps({'questions': QUESTIONS}, ensure_ascii=False)
+    truncated = text[:text.index('Üçüncü') + 3]
+
+    _, decoded = feed_in_chunks(app, truncated, 5)
+
+    assert decoded == QUESTIONS[:2]
+
+
+def test_trailing_comma_repair_leaves_strings_untouched(app):
+    parser = app.StreamingJSONObjectParser(('title', 'description'))
+
+    decoded = parser.feed('{"title":"a, }","description":"x",}')
+
+    assert decoded == [{'title': 'a, }', 'description': 'x'}]
+
+
+def test_trailing_comma_in_array_is_repaired(app):
+    parser = app.StreamingJSONObjectParser(REQUIRED)
+
+    decoded = parser.feed('{"question":"q, ]","options":["a","b","c","d",],"correct_option":"A",}')
+
+    assert decoded == [{'question': 'q, ]', 'options': ['a', 'b', 'c', 'd'], 'correct_option': 'A'}]
+
+
+def test_remove_trailing_commas_only_outside_strings(app):
+    assert app.remove_trailing_commas('{"a": "x,}", "b": [1, 2, ] , }') == '{"a": "x,}", "b": [1, 2 ]  }'
+    assert app.remove_trailing_commas('{"a": "\\",}"}') == '{"a": "\\",}"}'
+
+
+def test_buffer_does_not_grow_with_stream_length(app):
+    question = json.dumps(QUESTIONS[0], ensure_ascii=False)
+    text = '{"questions": [' + ','.join([question] * 500) + ']}'
+
+    parser = app.StreamingJSONObjectParser(REQUIRED)
+    decoded = []
+    largest_buffer = 0
+    for offset in range(0, len(text), 50):
+        decoded.extend(parser.feed(text[offset:offset + 50]))
+        largest_buffer = max(largest_buffer, len(parser.buffer))
+
+    assert len(decoded) == 500
+    # Tüketilen önek atılır; tamponda en fazla bir nesne ve son parça kalır
+    assert largest_buffer <= len(question) + 50
@@ -0,0 +1,69 @@
+def make_entry(user_id, correct_answers, completed_at='2026-01-01 10:00:00'):
+    return {
+        'user_id': user_id,
+        'username': f'Kullanıcı {user_id}',
+        'correct_answers': correct_answers,
+        'total_questions': 10,
+        'total_score': correct_answers * 10,
+        'completed_at': completed_at
+    }
+
+
+def test_leaderboard_orders_by_correct_answers_then_time(app):
+    board = app.TournamentLeaderboard(1)
+    board.upsert(make_entry(1, 5, '2026-01-01 10:00:05'))
+    board.upsert(make_entry(2, 7))
+    board.upsert(make_entry(3, 5, '2026-01-01 10:00:01'))
+
+    assert [entry['user_id'] for _, entry in board.top(10)] == [2, 3, 1]
+    assert board.rank_of(1)[0] == 3
+    assert board.rank_of(99) is None
+
+
+def test_upsert_replaces_previous_position(app):
+    board = app.TournamentLeaderboard(1)
+    board.upsert(make_entry(1, 2))
+    board.upsert(make_entry(2, 5))
+    board.upsert(make_entry(1, 9))
+
+    assert len(board) == 2
+    assert [entry['user_id'] for _, entry in board.top(10)] == [1, 2]
+
+
+def test_completion_during_rebuild_is_replayed(app, monkeypatch):
+    tournament_id = 987654
+    original_load = app.load_tournament_leaderboard
+
+    def load_with_concurrent_completion(tid):
+        # SQLite okunduktan sonra, sıralama değiştirilmeden önce gelen tamamlama
+        board = original_load(tid)
+        app.record_leaderboard_completion(tid, make_entry(42, 8))
+        return board
+
+    monkeypatch.setattr(app, 'load_tournament_leaderboard', load_with_concurrent_completion)
+    board = app.get_tournament_leaderboard(tournament_id)
+
+    assert board.rank_of(42)[0] == 1
+    assert app.tournament_leaderboards[tournament_id] is board
+    assert tournament_id not in app.leaderboard_rebuilds
+    app.drop_tournament_leaderboard(tournament_id)
+
+
+def test_failed_rebuild_keeps_previous_board(app, monkeypatch):
+    tournament_id = 987655
+    previous = app.TournamentLeaderboard(tournament_id)
+    previous.loaded_at = 0
+    app.tournament_leaderboards[tournament_id] = previous
+
+    def failing_load(tid):
+        raise RuntimeError('veritabanı kilitli')
+
+    monkeypatch.setattr(app, 'load_tournament_leaderboard', failing_load)
+    try:
+        app.get_tournament_leaderboard(tournament_id)
+    except RuntimeError:
+        pass
+
+    assert app.tournament_leaderboards[tournament_id] is previous
+    assert tournament_id not in app.leaderboard_rebuilds
+    app.drop_tournament_leaderboard(tournament_id)
@@ -0,0 +1,107 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def cache_key(app):
+    return lambda: app.llm_cache_key('test', 'fake-model', 1, uuid.uuid4().hex, 'v')
+
+
+def set_times(app, key, created_at, last_used_at):
+    conn = app.get_db()
+    conn.execute('UPDATE llm_cache SET created_at = ?, last_used_at = ? WHERE cache_key = ?',
+                 (created_at, last_used_at, key))
+    conn.commit()
+    conn.close()
+
+
+def stored_keys(app, keys):
+    conn = app.get_db()
+    rows = conn.execute(f"SELECT cache_key FROM llm_cache WHERE cache_key IN ({','.join('?' * len(keys))})",
+                        keys).fetchall()
+    conn.close()
+    return {row[0] for row in rows}
+
+
+def test_key_normalizes_subject_and_variant(app):
+    assert app.llm_cache_key('project', 'm', 1, '  Python ', 'Orta') == app.llm_cache_key('project', 'm', 1, 'python', 'orta')
+    assert app.llm_cache_key('project', 'm', 1, 'python', 'orta') != app.llm_cache_key('project', 'm', 2, 'python', 'orta')
+
+
+def test_put_then_get_round_trips(app, cache_key):
+    key = cache_key()
+    app.llm_cache_put(key, 'test', {'title': 'Proje', 'items': [1, 2]})
+
+    assert app.llm_cache_get(key) == {'title': 'Proje', 'items': [1, 2]}
+
+
+def test_expired_entry_is_a_miss(app, cache_key):
+    key = cache_key()
+    app.llm_cache_put(key, 'test', ['eski'])
+    expired = app.utc_timestamp(-app.LLM_CACHE_TTL_SECONDS - 60)
+    set_times(app, key, expired, expired)
+
+    assert app.llm_cache_get(key) is None
+
+
+def test_hit_refreshes_last_used(app, cache_key):
+    key = cache_key()
+    app.llm_cache_put(key, 'test', ['değer'])
+    set_times(app, key, app.utc_timestamp(), '2000-01-01 00:00:00')
+
+    app.llm_cache_get(key)
+
+    conn = app.get_db()
+    last_used_at = conn.execute('SELECT last_used_at FROM llm_cache WHERE cache_key = ?', (key,)).fetchone()[0]
+    conn.close()
+    assert last_used_at > '2000-01-01 00:00:00'
+
+
+def test_eviction_keeps_most_recently_used(app, cache_key, monkeypatch):
+    keys = [cache_key() for _ in range(3)]
+    for index, key in enumerate(keys):
+        app.llm_cache_put(key, 'test', [index])
+        # Diğer testlerin kayıtlarından daha yeni görünsünler
+        set_times(app, key, app.utc_timestamp(), f'2999-01-0{index + 1} 00:00:00')
+    monkeypatch.setattr(app, 'LLM_CACHE_MAX_ENTRIES', 2)
+
+    conn = app.get_db()
+    app.evict_llm_cache(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    assert stored_keys(app, keys) == set(keys[1:])
+
+
+def test_put_runs_eviction_periodically(app, cache_key, monkeypatch):
+    keys = [cache_key() for _ in range(2)]
+    app.llm_cache_put(keys[0], 'test', [0])
+    set_times(app, keys[0], app.utc_timestamp(), '2999-02-01 00:00:00')
+    monkeypatch.setattr(app, 'LLM_CACHE_MAX_ENTRIES', 1)
+    # Bir sonraki yazım, LLM_CACHE_EVICT_EVERY yazımda bir yapılan temizliğe denk gelsin
+    monkeypatch.setitem(app.llm_cache_metrics, 'stores', 0)
+
+    app.llm_cache_put(keys[1], 'test', [1])
+
+    assert stored_keys(app, keys) == {keys[0]}
+
+
+def test_question_generation_is_served_from_cache(app, monkeypatch):
+    calls = []
+    fake_backend = app.question_llm_backends['fake']
+
+    def counting_backend(prompt, topic, question_count):
+        calls.append(question_count)
+        return fake_backend(prompt, topic, question_count)
+
+    monkeypatch.setitem(app.question_llm_backends, 'fake', counting_backend)
+    topic = f'Önbellek {uuid.uuid4().hex[:8]}'
+
+    first = app.generate_question_set(topic, 5)
+    assert app.generate_question_set(f'  {topic.upper()} ', 5) == first
+    assert calls == [5]
+
+    # use_cache=False LLM'e gider ve önbelleği tazeler
+    app.generate_question_set(topic, 5, use_cache=False)
+    assert calls == [5, 5]
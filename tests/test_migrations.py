@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def legacy_cursor(app):
+    """v1 şemasındaki tabloların (indekssiz) boş bir kopyası"""
+    conn = app.get_db()
+    tables = [row[0] for row in conn.execute('''
+        SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN
+        ('tournament_participants', 'user_answers', 'questions', 'user_courses', 'user_profiles')
+    ''')]
+    conn.close()
+
+    legacy = sqlite3.connect(':memory:')
+    for statement in tables:
+        legacy.execute(statement)
+    yield legacy.cursor()
+    legacy.close()
+
+
+def test_duplicate_participants_keep_completed_best_score(app, legacy_cursor, capsys):
+    legacy_cursor.executemany('''
+        INSERT INTO tournament_participants (user_id, tournament_id, completed_at, total_questions, correct_answers)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [
+        (1, 10, None, 0, 0),                     # boş ilk katılım
+        (1, 10, '2024-01-01 10:00:00', 5, 3),
+        (1, 10, '2024-01-01 10:05:00', 5, 4),    # korunmalı
+        (2, 10, None, 2, 1),                     # tek kayıt, dokunulmamalı
+    ])
+
+    app.migrate_hot_path_indexes(legacy_cursor)
+
+    rows = legacy_cursor.execute('''
+        SELECT user_id, completed_at, correct_answers FROM tournament_participants ORDER BY user_id
+    ''').fetchall()
+    assert rows == [(1, '2024-01-01 10:05:00', 4), (2, None, 1)]
+    assert 'v2: 2 mükerrer turnuva katılımı silindi' in capsys.readouterr().out
+
+
+def test_duplicate_answers_keep_first_answer(app, legacy_cursor, capsys):
+    legacy_cursor.executemany('''
+        INSERT INTO user_answers (user_id, tournament_id, question_id, selected_option, is_correct)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(1, 10, 100, 'A', 1), (1, 10, 100, 'B', 0), (1, 10, 101, 'C', 0)])
+
+    app.migrate_hot_path_indexes(legacy_cursor)
+
+    rows = legacy_cursor.execute('SELECT question_id, selected_option FROM user_answers ORDER BY question_id').fetchall()
+    assert rows == [(100, 'A'), (101, 'C')]
+    assert 'v2: 1 mükerrer cevap silindi' in capsys.readouterr().out
+    # Temizlikten sonra UNIQUE indeksler kurulmuş olmalı
+    with pytest.raises(sqlite3.IntegrityError):
+        legacy_cursor.execute('''
+            INSERT INTO user_answers (user_id, tournament_id, question_id, selected_option, is_correct)
+            VALUES (1, 10, 100, 'D', 0)
+        ''')
@@ -0,0 +1,176 @@
+import uuid
+
+import pytest
+
+
+class RecordingExecutor:
+    """Gönderilen işleri çalıştırmadan kaydeden havuz"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append((function, args))
+
+
+@pytest.fixture
+def executor(app, monkeypatch):
+    recording = RecordingExecutor()
+    monkeypatch.setattr(app, 'get_question_job_executor', lambda: recording)
+    monkeypatch.setattr(app, 'question_job_pending', 0)
+    yield recording
+    app.question_bank_filling.clear()
+
+
+def request_test(client, headers, topic, count=5):
+    response = client.post('/api/generate-test-questions', headers=headers, json={'topic': topic, 'count': count})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def unique_topic():
+    return f'Konu {uuid.uuid4().hex[:8]}'
+
+
+def test_new_free_text_topic_does_not_schedule_fill(client, register_user, executor):
+    _, headers = register_user()
+
+    assert request_test(client, headers, unique_topic())['source'] == 'live'
+    assert executor.submitted == []
+
+
+def test_topic_served_before_schedules_one_fill(app, client, register_user, executor):
+    _, first = register_user()
+    _, second = register_user()
+    topic = unique_topic()
+    request_test(client, first, topic)
+
+    request_test(client, second, topic)
+    request_test(client, second, topic)
+
+    assert [args for _, args in executor.submitted] == [(topic, 'medium')]
+    assert app.question_job_pending == 1
+
+
+def test_allowlisted_topic_is_filled_on_first_request(app, client, register_user, executor, monkeypatch):
+    topic = unique_topic()
+    monkeypatch.setattr(app, 'QUESTION_BANK_TOPICS', {app.normalize_cache_text(topic)})
+    _, headers = register_user()
+
+    request_test(client, headers, topic)
+
+    assert len(executor.submitted) == 1
+
+
+def test_fill_is_dropped_when_job_queue_is_busy(app, client, register_user, executor, monkeypatch):
+    topic = unique_topic()
+    monkeypatch.setattr(app, 'QUESTION_BANK_TOPICS', {app.normalize_cache_text(topic)})
+    monkeypatch.setattr(app, 'question_job_pending', app.QUESTION_BANK_FILL_MAX_PENDING)
+
+    assert app.schedule_question_bank_fill(topic, 'medium') is False
+    assert executor.submitted == []
+    assert app.question_job_pending == app.QUESTION_BANK_FILL_MAX_PENDING
+
+
+def test_failed_generation_does_not_schedule_fill(app, client, register_user, executor, monkeypatch):
+    topic = unique_topic()
+    monkeypatch.setattr(app, 'QUESTION_BANK_TOPICS', {app.normalize_cache_text(topic)})
+
+    def failing_generation(*args, **kwargs):
+        raise RuntimeError('LLM erişilemiyor')
+
+    monkeypatch.setattr(app, 'generate_question_set', failing_generation)
+    _, headers = register_user()
+
+    request_test(client, headers, topic)
+
+    assert executor.submitted == []
+
+
+def test_fill_releases_its_job_slot(app, executor, monkeypatch):
+    topic = unique_topic()
+    monkeypatch.setattr(app, 'QUESTION_BANK_TOPICS', {app.normalize_cache_text(topic)})
+    assert app.schedule_question_bank_fill(topic, 'medium') is True
+    assert app.question_job_pending == 1
+
+    function, args = executor.submitted[0]
+    function(*args)
+
+    assert app.question_job_pending == 0
+    assert app.count_question_bank(topic, 'medium') == app.QUESTION_BANK_FILL_SIZE
+
+
+def seed_bank(app, topic, size):
+    questions = [{
+        'question': f'{topic} banka sorusu {index}?',
+        'options': ['a', 'b', 'c', 'd'],
+        'correct_option': 'A'
+    } for index in range(size)]
+    conn = app.get_db()
+    stored = app.add_to_question_bank(conn.cursor(), app.normalize_cache_text(topic), 'medium', questions)
+    conn.commit()
+    conn.close()
+    return stored
+
+
+@pytest.mark.parametrize('count', ['abc', None, True, [5], 0, -3])
+def test_invalid_count_is_rejected(client, register_user, executor, count):
+    _, headers = register_user()
+
+    response = client.post('/api/generate-test-questions', headers=headers, json={'topic': unique_topic(), 'count': count})
+
+    assert response.status_code == 400
+
+
+def test_count_is_clamped(app, client, register_user, executor, monkeypatch):
+    monkeypatch.setattr(app, 'QUESTION_COUNT_MAX', 7)
+    _, headers = register_user()
+
+    assert request_test(client, headers, unique_topic(), count=100000)['count'] == 7
+
+
+def test_short_bank_generates_only_the_shortfall(app, client, register_user, executor, monkeypatch):
+    topic = unique_topic()
+    seed_bank(app, topic, 3)
+    requested = []
+    generate = app.generate_question_set
+
+    def recording_generation(topic, question_count, **kwargs):
+        requested.append(question_count)
+        return generate(topic, question_count, **kwargs)
+
+    monkeypatch.setattr(app, 'generate_question_set', recording_generation)
+    _, headers = register_user()
+
+    body = request_test(client, headers, topic, count=5)
+
+    assert requested == [2]
+    assert body['count'] == 5
+    assert sum('banka sorusu' in question['question'] for question in body['questions']) == 3
+
+
+def test_failed_shortfall_still_serves_bank_questions(app, client, register_user, executor, monkeypatch):
+    topic = unique_topic()
+    seed_bank(app, topic, 3)
+
+    def failing_generation(*args, **kwargs):
+        raise RuntimeError('LLM erişilemiyor')
+
+    monkeypatch.setattr(app, 'generate_question_set', failing_generation)
+    _, headers = register_user()
+
+    body = request_test(client, headers, topic, count=5)
+
+    assert body['count'] == 3
+    assert all('banka sorusu' in question['question'] for question in body['questions'])
+
+
+def test_fresh_flag_does_not_bypass_bank(app, client, register_user, executor):
+    topic = unique_topic()
+    seed_bank(app, topic, 10)
+    _, headers = register_user()
+
+    response = client.post('/api/generate-test-questions', headers=headers,
+                           json={'topic': topic, 'count': 5, 'fresh': True})
+
+    assert response.get_json()['source'] == 'bank'
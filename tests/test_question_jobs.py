@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+
+def wait_for_job(client, headers, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/generate-questions/{job_id}', headers=headers).get_json()
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'İş zamanında bitmedi: {job_id}')
+
+
+def start_job(client, headers, **body):
+    return client.post('/api/generate-questions', headers=headers, json={'content': 'Python', **body})
+
+
+def test_job_runs_to_done_on_fake_backend(app, client, register_user):
+    _, headers = register_user()
+
+    response = start_job(client, headers, question_count=7, fresh=True)
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'queued'
+
+    job = wait_for_job(client, headers, response.get_json()['job_id'])
+    assert job['status'] == 'done'
+    assert job['generated_count'] == 7
+
+    result = client.get(f"/api/generate-questions/{job['job_id']}/result", headers=headers)
+    assert result.status_code == 200
+    questions = result.get_json()['questions']
+    assert len(questions) == 7
+    assert all(app.is_valid_question(question) for question in questions)
+
+
+def test_job_failure_is_reported(app, client, register_user, monkeypatch):
+    def failing_backend(prompt, topic, question_count):
+        raise RuntimeError('LLM erişilemiyor')
+
+    app.register_question_backend('failing', failing_backend)
+    monkeypatch.setattr(app, 'QUESTION_LLM_BACKEND', 'failing')
+    _, headers = register_user()
+
+    job_id = start_job(client, headers, question_count=3, fresh=True).get_json()['job_id']
+
+    job = wait_for_job(client, headers, job_id)
+    assert job['status'] == 'failed'
+    assert job['error']
+    result = client.get(f'/api/generate-questions/{job_id}/result', headers=headers)
+    assert result.status_code == 500
+    assert result.get_json()['status'] == 'failed'
+
+
+def test_full_queue_is_rejected(app, client, register_user, monkeypatch):
+    monkeypatch.setattr(app, 'QUESTION_JOB_QUEUE_LIMIT', 0)
+    _, headers = register_user()
+
+    response = start_job(client, headers, question_count=3)
+
+    assert response.status_code == 429
+
+
+def test_job_is_only_visible_to_its_owner(client, register_user):
+    _, owner = register_user()
+    _, other = register_user()
+    job_id = start_job(client, owner, question_count=2).get_json()['job_id']
+    wait_for_job(client, owner, job_id)
+
+    assert client.get(f'/api/generate-questions/{job_id}', headers=other).status_code == 404
+    assert client.get(f'/api/generate-questions/{job_id}/result', headers=other).status_code == 404
+    assert client.get(f'/api/generate-questions/{job_id}/result', headers=owner).status_code == 200
+
+
+@pytest.mark.parametrize('question_count', ['abc', None, [3], True, '1.5'])
+def test_invalid_question_count_is_rejected(client, register_user, question_count):
+    _, headers = register_user()
+
+    response = start_job(client, headers, question_count=question_count)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('question_count, expected', [(100000, 50), (-5, 1), ('4', 4)])
+def test_question_count_is_clamped(app, client, register_user, question_count, expected):
+    _, headers = register_user()
+
+    job_id = start_job(client, headers, question_count=question_count).get_json()['job_id']
+
+    job = wait_for_job(client, headers, job_id)
+    assert job['question_count'] == expected == max(app.QUESTION_COUNT_MIN, min(expected, app.QUESTION_COUNT_MAX))
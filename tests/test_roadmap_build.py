@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+
+import pytest
+
+
+class RejectingExecutor:
+    def submit(self, *args, **kwargs):
+        raise RuntimeError('cannot schedule new futures after shutdown')
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append(args)
+
+
+def add_course(client, headers):
+    return client.post('/api/add-course-to-roadmap', headers=headers, json={
+        'course_title': 'Python', 'course_link': 'https://example.com/python',
+        'course_description': 'Giriş'
+    })
+
+
+@pytest.fixture
+def build_status(client):
+    def fetch(course_id, headers):
+        return client.get(f'/api/roadmap-build-status/{course_id}', headers=headers).get_json()['build_status']
+    return fetch
+
+
+def test_add_course_queues_build(app, client, register_user, build_status, monkeypatch):
+    executor = RecordingExecutor()
+    monkeypatch.setattr(app, 'get_roadmap_build_executor', lambda: executor)
+    monkeypatch.setattr(app, 'roadmap_build_pending', 0)
+    _, headers = register_user()
+
+    body = add_course(client, headers).get_json()
+
+    assert body['build_status'] == 'building'
+    assert executor.calls[0][0] == body['course_id']
+    assert build_status(body['course_id'], headers) == 'building'
+
+
+def test_submit_failure_marks_course_failed(app, client, register_user, build_status, monkeypatch):
+    monkeypatch.setattr(app, 'get_roadmap_build_executor', lambda: RejectingExecutor())
+    monkeypatch.setattr(app, 'roadmap_build_pending', 0)
+    user_id, headers = register_user()
+
+    response = add_course(client, headers)
+
+    assert response.status_code == 500
+    assert app.roadmap_build_pending == 0
+    conn = app.get_db()
+    course_id = conn.execute('SELECT id FROM user_courses WHERE user_id = ?', (user_id,)).fetchone()[0]
+    conn.close()
+    assert build_status(course_id, headers) == 'failed'
+
+
+@pytest.fixture
+def slow_sections(app, monkeypatch):
+    """Bırakılana kadar bekleyen bölüm görevi"""
+    release = threading.Event()
+
+    def blocking_sections(course_link):
+        release.wait(5)
+        return ['1. Geç Gelen Bölüm']
+
+    monkeypatch.setattr(app, 'get_course_sections', blocking_sections)
+    monkeypatch.setattr(app, 'ROADMAP_SECTIONS_TIMEOUT_SECONDS', 0.05)
+    yield release
+    release.set()
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_timed_out_task_is_counted_until_it_finishes(app, slow_sections):
+    roadmap = app.create_course_roadmap('Python', 'https://example.com/python')
+
+    assert app.demo_course_sections('https://example.com/python')[0] in json.dumps(roadmap, ensure_ascii=False)
+    assert app.roadmap_tasks_abandoned == 1
+
+    slow_sections.set()
+    assert wait_until(lambda: app.roadmap_tasks_abandoned == 0)
+
+
+def test_no_new_tasks_while_abandoned_tasks_fill_the_headroom(app, slow_sections, monkeypatch):
+    monkeypatch.setattr(app, 'ROADMAP_TASK_ABANDONED_LIMIT', 1)
+    app.create_course_roadmap('Python', 'https://example.com/python')
+    assert app.roadmap_tasks_abandoned == 1
+
+    assert app.submit_roadmap_task(app.get_course_sections, 'https://example.com/python') is None
+    started = time.monotonic()
+    app.create_course_roadmap('Python', 'https://example.com/python')
+    # Görev açılmadan yedeğe düşülür; bekleme yok
+    assert time.monotonic() - started < 0.05
+    assert app.roadmap_tasks_abandoned == 1
+
+    slow_sections.set()
+    assert wait_until(lambda: app.roadmap_tasks_abandoned == 0)
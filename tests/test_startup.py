@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+PROBE = r'''
+import json, sys, threading
+started = []
+thread_start = threading.Thread.start
+def recording_start(thread):
+    started.append(thread.name)
+    thread_start(thread)
+threading.Thread.start = recording_start
+import app
+print(json.dumps({'threads': started, 'langchain': any(name.startswith('langchain') for name in sys.modules)}))
+'''
+
+
+def test_import_starts_no_background_work_with_default_settings(tmp_path):
+    # Varsayılan ayarlar: ısınma ilk istekte başlar, import anında değil
+    env = {name: value for name, value in os.environ.items()
+           if not name.endswith('_WARMUP_ON_START') and not name.endswith('_RESOLVE_ON_START')}
+    env['DATABASE_PATH'] = str(tmp_path / 'startup.db')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe == {'threads': [], 'langchain': False}
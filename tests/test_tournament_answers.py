@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def participant(app, client, register_user, create_tournament):
+    """Turnuvaya katılmış bir kullanıcı: (user_id, başlık, turnuva id, soru id'leri)"""
+    tournament_id = create_tournament()
+    user_id, headers = register_user()
+    client.post('/api/join-tournament', headers=headers, json={'tournament_id': tournament_id})
+    questions = client.get(f'/api/tournament-questions/{tournament_id}', headers=headers).get_json()['questions']
+    return user_id, headers, tournament_id, [question['id'] for question in questions]
+
+
+def answer(client, headers, tournament_id, question_id, option='A'):
+    return client.post('/api/answer-question', headers=headers, json={
+        'tournament_id': tournament_id, 'question_id': question_id, 'selected_option': option
+    })
+
+
+def participation(app, user_id, tournament_id):
+    conn = app.get_db()
+    row = conn.execute('''
+        SELECT total_questions, correct_answers FROM tournament_participants
+        WHERE user_id = ? AND tournament_id = ?
+    ''', (user_id, tournament_id)).fetchone()
+    conn.close()
+    return row
+
+
+def answer_count(app, user_id, tournament_id):
+    conn = app.get_db()
+    count = conn.execute('SELECT COUNT(*) FROM user_answers WHERE user_id = ? AND tournament_id = ?',
+                         (user_id, tournament_id)).fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_answer_updates_score(app, client, participant):
+    user_id, headers, tournament_id, question_ids = participant
+
+    response = answer(client, headers, tournament_id, question_ids[0])
+
+    assert response.get_json()['is_correct'] is True
+    assert participation(app, user_id, tournament_id) == (1, 1)
+
+
+def test_answers_after_completion_are_rejected(app, client, participant):
+    user_id, headers, tournament_id, question_ids = participant
+    answer(client, headers, tournament_id, question_ids[0])
+    client.post('/api/complete-tournament', headers=headers, json={'tournament_id': tournament_id})
+
+    response = answer(client, headers, tournament_id, question_ids[1])
+
+    assert response.status_code == 400
+    # Skor ve cevaplar tamamlamadaki haliyle kalır
+    assert participation(app, user_id, tournament_id) == (1, 1)
+    assert answer_count(app, user_id, tournament_id) == 1
+
+
+def test_answer_without_joining_is_rejected(app, client, register_user, create_tournament):
+    tournament_id = create_tournament()
+    user_id, headers = register_user()
+    question_id = app.get_cached_tournament(tournament_id)['questions'][0]['id']
+
+    response = answer(client, headers, tournament_id, question_id)
+
+    assert response.status_code == 400
+    assert answer_count(app, user_id, tournament_id) == 0
+
+
+def test_second_join_is_rejected(app, client, participant):
+    user_id, headers, tournament_id, _ = participant
+
+    response = client.post('/api/join-tournament', headers=headers, json={'tournament_id': tournament_id})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Bu turnuvaya zaten katıldınız'
+    conn = app.get_db()
+    rows = conn.execute('SELECT COUNT(*) FROM tournament_participants WHERE user_id = ? AND tournament_id = ?',
+                        (user_id, tournament_id)).fetchone()[0]
+    conn.close()
+    assert rows == 1
+
+
+def test_duplicate_answer_keeps_first_answer_and_score(app, client, participant):
+    user_id, headers, tournament_id, question_ids = participant
+    answer(client, headers, tournament_id, question_ids[0], 'A')
+
+    response = answer(client, headers, tournament_id, question_ids[0], 'B')
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Bu soruyu zaten cevapladınız'
+    assert participation(app, user_id, tournament_id) == (1, 1)
+    assert answer_count(app, user_id, tournament_id) == 1
+
+
+def test_concurrent_duplicate_answers_count_once(app, participant):
+    user_id, headers, tournament_id, question_ids = participant
+    start = threading.Barrier(8)
+    statuses = []
+
+    def submit():
+        client = app.app.test_client()
+        start.wait()
+        statuses.append(answer(client, headers, tournament_id, question_ids[0]).status_code)
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [200] + [400] * 7
+    assert participation(app, user_id, tournament_id) == (1, 1)
+    assert answer_count(app, user_id, tournament_id) == 1
@@ -0,0 +1,30 @@
+from test_leaderboard import make_entry
+
+
+def test_leaderboard_event_carries_changed_entry_and_rank(app):
+    board = app.TournamentLeaderboard(1)
+    for user_id in range(1, 13):
+        board.upsert(make_entry(user_id, 20 - user_id))
+    board.upsert(make_entry(99, 1))
+
+    payload = app.leaderboard_event_payload(board, changed_user_id=99)
+
+    assert len(payload['leaderboard']) == 10
+    assert payload['total_participants'] == 13
+    # İlk 10 dışındaki istemciler kendi sıralarını bu kayıttan yerel olarak günceller
+    assert payload['changed']['user_id'] == 99
+    assert payload['changed']['rank'] == 13
+
+
+def test_hub_fans_out_to_every_subscriber(app):
+    hub = app.TournamentEventHub()
+    subscribers = [hub.subscribe(5) for _ in range(3)]
+
+    hub.publish(5, 'participant-count', {'participant_count': 1})
+
+    assert [subscriber.get_nowait() for subscriber in subscribers] == [
+        ('participant-count', {'participant_count': 1})
+    ] * 3
+    for subscriber in subscribers:
+        hub.unsubscribe(5, subscriber)
+    assert hub.subscriber_count() == 0
@@ -0,0 +1,19 @@
+def test_weekly_calendar_is_rebuilt_after_max_age(app, client, monkeypatch):
+    builds = []
+    original_build = app.build_weekly_tournament_calendar
+
+    def counting_build(now):
+        builds.append(now)
+        return original_build(now)
+
+    monkeypatch.setattr(app, 'build_weekly_tournament_calendar', counting_build)
+    app.invalidate_weekly_calendar()
+
+    assert client.get('/api/weekly-tournament-calendar').status_code == 200
+    assert client.get('/api/weekly-tournament-calendar').status_code == 200
+    assert len(builds) == 1
+
+    # Başka bir worker'daki değişiklik sadece süre dolunca görülür
+    monkeypatch.setattr(app, 'WEEKLY_CALENDAR_MAX_AGE_SECONDS', 0)
+    assert client.get('/api/weekly-tournament-calendar').status_code == 200
+    assert len(builds) == 2